@@ -2,7 +2,6 @@ import io
 import statistics
 from datetime import timedelta, timezone, datetime
 from html import escape
-from math import ceil
 from pathlib import Path
 
 from aiogram.enums import ContentType
@@ -15,21 +14,26 @@ from aiogram_dialog.widgets.input import TextInput, MessageInput
 
 from app.bot.dialogs.states import AdminSG, MainMenuSG
 from app.bot.utils.tg import get_source_emoji_html
+from app.bot.utils.pagination import load_keyset_page
 from app.core.settings import settings
 from app.repository.admin import (
     export_users_to_excel,
     export_users_tasks_to_excel,
     get_user_tasks_page,
+    count_user_tasks,
     export_single_user_tasks_to_excel,
     set_user_blocked,
     get_daily_completed_stats,
     get_top_5_users,
     export_available_tasks_to_excel,
     get_users_statistics,
-    get_user_weekly_approved_count,
 )
 from app.repository.admin_report import import_tasks_from_excel
-from app.repository.task import get_tasks_statistics, get_assigned_tasks_page
+from app.repository.task import (
+    get_tasks_statistics,
+    get_assigned_tasks_page,
+    count_assigned_tasks,
+)
 
 MSC_TZ = timezone(timedelta(hours=3))
 
@@ -66,19 +70,29 @@ def format_minutes(value: float) -> str:
 
 
 async def assigned_tasks_getter(dialog_manager: DialogManager, **kwargs):
-    page = int(dialog_manager.dialog_data.get("page", 0))
+    data = dialog_manager.dialog_data
+
+    # количество считается один раз при открытии окна (и по кнопке «Обновить»)
+    if "assigned_count" not in data:
+        data["assigned_count"] = await count_assigned_tasks()
+    total_count = data["assigned_count"]
+
+    async def fetch(direction, cursor, limit):
+        return await get_assigned_tasks_page(
+            direction=direction,
+            cursor=cursor,
+            page_size=limit,
+        )
 
-    total_count, items = await get_assigned_tasks_page(
-        page=page,
+    page, total_pages, items = await load_keyset_page(
+        data,
+        total_count=total_count,
         page_size=PAGE_SIZE,
+        fetch=fetch,
+        cursor_of=lambda a: (a.created_at, a.id),
     )
 
-    total_pages = max(1, ceil(total_count / PAGE_SIZE))
-    page = max(0, min(page, total_pages - 1))
-    dialog_manager.dialog_data["page"] = page
-    dialog_manager.dialog_data["last_page"] = total_pages - 1
-
-    if total_count == 0:
+    if total_count == 0 or not items:
         return {
             "assigned_text": "📭 Сейчас нет выданных заданий.",
             "page_str": "—",
@@ -305,6 +319,7 @@ async def page_first(c: CallbackQuery, w: Button, m: DialogManager):
         return
 
     m.dialog_data["page"] = 0
+    m.dialog_data["direction"] = "first"
     await c.answer()
 
 
@@ -317,6 +332,7 @@ async def page_last(c: CallbackQuery, w: Button, m: DialogManager):
         return
 
     m.dialog_data["page"] = last_page
+    m.dialog_data["direction"] = "last"
     await c.answer()
 
 
@@ -422,7 +438,7 @@ async def on_tg_id_input(
 
     manager.dialog_data["tg_id"] = tg_id
     manager.dialog_data["period"] = "all"
-    manager.dialog_data["page"] = 0
+    _reset_user_tasks_pages(manager.dialog_data)
 
     await manager.switch_to(AdminSG.user_tasks)
 
@@ -430,7 +446,6 @@ async def on_tg_id_input(
 async def user_tasks_getter(dialog_manager: DialogManager, **kwargs):
     tg_id = dialog_manager.dialog_data.get("tg_id")
     period = dialog_manager.dialog_data.get("period", "all")
-    page = int(dialog_manager.dialog_data.get("page", 0))
 
     base_ctx = {
         "is_blocked": False,
@@ -457,17 +472,49 @@ async def user_tasks_getter(dialog_manager: DialogManager, **kwargs):
         base_ctx["error"] = "Не указан tg_id."
         return base_ctx
 
-    user, total_count, items = await get_user_tasks_page(
-        tg_id=int(tg_id),
-        period=period,
-        page=page,
+    data = dialog_manager.dialog_data
+
+    # количество считается при смене пользователя/периода, а не на каждый клик
+    if "user_tasks_count" not in data:
+        data["user_tasks_count"] = await count_user_tasks(
+            tg_id=int(tg_id),
+            period=period,
+        )
+
+    found: dict = {}
+
+    async def fetch(direction, cursor, limit):
+        user, items = await get_user_tasks_page(
+            tg_id=int(tg_id),
+            period=period,
+            direction=direction,
+            cursor=cursor,
+            page_size=limit,
+        )
+        found["user"] = user
+        return items
+
+    page, total_pages, items = await load_keyset_page(
+        data,
+        total_count=data["user_tasks_count"],
         page_size=PAGE_SIZE,
+        fetch=fetch,
+        cursor_of=lambda it: (
+            it.processed_at,
+            it.submitted_at,
+            it.created_at,
+            it.assignment_id,
+        ),
     )
+    user = found.get("user")
 
     if not user:
         base_ctx["error"] = f"Пользователь с tg_id={tg_id} не найден."
         return base_ctx
 
+    total_count = data["user_tasks_count"]
+    last_page = total_pages - 1
+
     ref = (
         f"{user.referrer.full_name or '—'} ({user.referrer.tg_id})"
         if user.referrer
@@ -479,13 +526,6 @@ async def user_tasks_getter(dialog_manager: DialogManager, **kwargs):
     block_status = "🚫 Заблокирован" if is_blocked else "🟢 Активен"
     block_button_text = "🔓 Разблокировать" if is_blocked else "🚫 Заблокировать"
 
-    total_pages = max(1, ceil(total_count / PAGE_SIZE))
-    page = max(0, min(page, total_pages - 1))
-    dialog_manager.dialog_data["page"] = page
-
-    last_page = total_pages - 1
-    dialog_manager.dialog_data["last_page"] = last_page
-
     if total_count == 0:
         tasks_text = (
             "Пока нет подходящих заданий по выбранному периоду.\n\n"
@@ -554,21 +594,27 @@ async def user_tasks_getter(dialog_manager: DialogManager, **kwargs):
     }
 
 
+def _reset_user_tasks_pages(data: dict) -> None:
+    data["page"] = 0
+    data["direction"] = "first"
+    data.pop("user_tasks_count", None)
+
+
 async def set_period_day(c: CallbackQuery, w: Button, m: DialogManager):
     m.dialog_data["period"] = "day"
-    m.dialog_data["page"] = 0
+    _reset_user_tasks_pages(m.dialog_data)
     await c.answer("Период: Сегодня")
 
 
 async def set_period_week(c: CallbackQuery, w: Button, m: DialogManager):
     m.dialog_data["period"] = "week"
-    m.dialog_data["page"] = 0
+    _reset_user_tasks_pages(m.dialog_data)
     await c.answer("Период: Неделя")
 
 
 async def set_period_all(c: CallbackQuery, w: Button, m: DialogManager):
     m.dialog_data["period"] = "all"
-    m.dialog_data["page"] = 0
+    _reset_user_tasks_pages(m.dialog_data)
     await c.answer("Период: Всё время")
 
 
@@ -579,6 +625,7 @@ async def page_prev(c: CallbackQuery, w: Button, m: DialogManager):
         return
 
     m.dialog_data["page"] = page - 1
+    m.dialog_data["direction"] = "prev"
     await c.answer()
 
 
@@ -591,6 +638,7 @@ async def page_next(c: CallbackQuery, w: Button, m: DialogManager):
         return
 
     m.dialog_data["page"] = page + 1
+    m.dialog_data["direction"] = "next"
     await c.answer()
 
 
@@ -703,7 +751,7 @@ async def analytics_top_getter(dialog_manager: DialogManager, **kwargs):
         medal = medals[i] if i < 3 else f"{i + 1}."
 
         percent = percents[i]
-        weekly = await get_user_weekly_approved_count(user_id=user["id"])
+        weekly = user["weekly"]
 
         trend = f"📈 +{weekly}" if weekly > 0 else "➖ 0"
 
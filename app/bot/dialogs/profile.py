@@ -8,11 +8,13 @@ from aiogram_dialog.widgets.text import Const
 
 from app.bot.dialogs.info_pages import back_to_menu
 from app.bot.dialogs.states import ProfileSG, ReferralsSG
+from app.bot.utils.pagination import load_keyset_page
 from app.bot.utils.tg import get_source_emoji_html
 from app.repository.user import (
     get_profile_data,
     get_user_id_by_tg_id,
-    get_approved_tasks,
+    get_approved_tasks_page,
+    count_approved_tasks,
 )
 
 logger = logging.getLogger(__name__)
@@ -31,14 +33,28 @@ async def history_getter(dialog_manager: DialogManager, **_):
     tg_id = dialog_manager.event.from_user.id
     user_id = await get_user_id_by_tg_id(tg_id)
 
-    all_tasks = await get_approved_tasks(user_id)
+    data = dialog_manager.dialog_data
 
-    page = dialog_manager.dialog_data.get("page", 0)
-    start = page * TASKS_PER_PAGE
-    end = start + TASKS_PER_PAGE
+    # количество считается при открытии истории, а не на каждый клик
+    if "history_count" not in data:
+        data["history_count"] = await count_approved_tasks(user_id)
+    total = data["history_count"]
 
-    total_pages = max((len(all_tasks) - 1) // TASKS_PER_PAGE + 1, 1)
-    page_tasks = all_tasks[start:end]
+    async def fetch(direction, cursor, limit):
+        return await get_approved_tasks_page(
+            user_id,
+            direction=direction,
+            cursor=cursor,
+            page_size=limit,
+        )
+
+    page, total_pages, page_tasks = await load_keyset_page(
+        data,
+        total_count=total,
+        page_size=TASKS_PER_PAGE,
+        fetch=fetch,
+        cursor_of=lambda t: (t["processed_at"], t["assignment_id"]),
+    )
 
     sections = []
 
@@ -93,22 +109,26 @@ async def history_getter(dialog_manager: DialogManager, **_):
     return {
         "history_text": text,
         "has_prev": page > 0,
-        "has_next": end < len(all_tasks),
+        "has_next": page < total_pages - 1,
     }
 
 
 async def next_page(c, w, m: DialogManager):
     m.dialog_data["page"] = m.dialog_data.get("page", 0) + 1
+    m.dialog_data["direction"] = "next"
     await m.show()
 
 
 async def prev_page(c, w, m: DialogManager):
     m.dialog_data["page"] = max(m.dialog_data.get("page", 0) - 1, 0)
+    m.dialog_data["direction"] = "prev"
     await m.show()
 
 
 async def go_to_history(c, w, m: DialogManager):
     m.dialog_data["page"] = 0
+    m.dialog_data["direction"] = "first"
+    m.dialog_data.pop("history_count", None)
     await m.switch_to(ProfileSG.history)
 
 
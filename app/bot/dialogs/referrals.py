@@ -3,7 +3,12 @@ from aiogram_dialog.widgets.text import Format, Const
 from aiogram_dialog.widgets.kbd import Button, Row
 
 from app.bot.dialogs.states import ReferralsSG, ProfileSG
-from app.repository.user import get_referrals_with_stats, get_user_id_by_tg_id
+from app.bot.utils.pagination import load_keyset_page
+from app.repository.user import (
+    count_referrals,
+    get_referrals_page,
+    get_user_id_by_tg_id,
+)
 
 PAGE_SIZE = 5
 
@@ -12,15 +17,14 @@ async def referrals_getter(dialog_manager: DialogManager, **_):
     tg_id = dialog_manager.event.from_user.id
     user_id = await get_user_id_by_tg_id(tg_id)
 
-    page = dialog_manager.dialog_data.get("page", 0)
-    referrals = await get_referrals_with_stats(user_id)
+    data = dialog_manager.dialog_data
 
-    total = len(referrals)
-    start = page * PAGE_SIZE
-    end = start + PAGE_SIZE
-    page_items = referrals[start:end]
+    # количество считается при открытии окна, а не на каждый клик
+    if "referrals_count" not in data:
+        data["referrals_count"] = await count_referrals(user_id)
+    total = data["referrals_count"]
 
-    if not referrals:
+    if not total:
         return {
             "referrals_text": (
                 "👥 <b>Мои приглашённые</b>\n\nУ вас пока нет приглашённых."
@@ -28,6 +32,22 @@ async def referrals_getter(dialog_manager: DialogManager, **_):
             "has_referrals": False,
         }
 
+    async def fetch(direction, cursor, limit):
+        return await get_referrals_page(
+            user_id,
+            direction=direction,
+            cursor=cursor,
+            page_size=limit,
+        )
+
+    page, total_pages, page_items = await load_keyset_page(
+        data,
+        total_count=total,
+        page_size=PAGE_SIZE,
+        fetch=fetch,
+        cursor_of=lambda r: (r["approval_at"], r["id"]),
+    )
+
     lines = []
     for r in page_items:
         name = r["full_name"] or "—"
@@ -41,10 +61,6 @@ async def referrals_getter(dialog_manager: DialogManager, **_):
             f"📦 Принято заданий: <b>{r['approved_tasks']}</b>"
         )
 
-    total_pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
-
-    dialog_manager.dialog_data["page"] = page
-
     return {
         "referrals_text": "👥 <b>Мои приглашённые</b>\n\n" + "\n\n".join(lines),
         "page_str": f"{page + 1}/{total_pages}",
@@ -56,11 +72,13 @@ async def referrals_getter(dialog_manager: DialogManager, **_):
 
 async def page_prev(c, w, m: DialogManager):
     m.dialog_data["page"] -= 1
+    m.dialog_data["direction"] = "prev"
     await c.answer()
 
 
 async def page_next(c, w, m: DialogManager):
     m.dialog_data["page"] += 1
+    m.dialog_data["direction"] = "next"
     await c.answer()
 
 
@@ -26,7 +26,7 @@ from aiogram_dialog.widgets.kbd import (
 from app.bot.dialogs.states import RegistrationSG, MainMenuSG
 from app.bot.utils.tg import notify_admins_user_registered
 from app.core.settings import settings
-from app.repository.city import get_all_cities
+from app.repository.city import city_registry, get_all_cities
 from app.repository.user import (
     get_user_by_tg_id,
     update_user_profile,
@@ -137,18 +137,14 @@ async def on_gender_selected(
 
 
 async def confirm_getter(dialog_manager: DialogManager, **kwargs: Any) -> dict:
-    cities = await get_all_cities()
-
     city_id_str = dialog_manager.dialog_data.get("city_id")
     city_name = "Не выбран"
 
     if city_id_str:
         try:
-            city_uuid = uuid.UUID(city_id_str)
-            city_name = next(
-                (c.name for c in cities if c.id == city_uuid),
-                "Не выбран",
-            )
+            city = await city_registry.get(uuid.UUID(city_id_str))
+            if city:
+                city_name = city.name
         except Exception:
             logger.exception("Ошибка при определении города")
 
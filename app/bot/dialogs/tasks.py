@@ -14,7 +14,8 @@ from aiogram_dialog.widgets.input import TextInput, MessageInput
 from app.bot.dialogs.states import TasksSG, MainMenuSG
 from app.bot.ui.widgets.custom_button import CustomEmojiButton
 from app.bot.utils.tg import notify_admins_about_report
-from app.consts.source_task import SOURCE_MAP
+from app.bot.utils.tg import get_source_emoji_html
+from app.consts.source_task import source_registry
 from app.core.settings import settings
 from app.repository.task import (
     assign_random_task,
@@ -33,13 +34,6 @@ def user_ctx(user) -> str:
     return f"tg_id={user.tg_id} user_id={user.id}"
 
 
-def get_source_emoji_html(source: str) -> str:
-    for _, (title, _, emoji_id) in SOURCE_MAP.items():
-        if title == source:
-            return f'<tg-emoji emoji-id="{emoji_id}">🗺</tg-emoji>'
-    return "🗺"
-
-
 async def load_user(dialog_manager: DialogManager):
     tg_id = dialog_manager.event.from_user.id
     return await get_user_by_tg_id(tg_id)
@@ -93,7 +87,8 @@ async def choose_source(
     user = await load_user(dialog_manager)
 
     source_key = button.widget_id
-    source_title, source_value, _ = SOURCE_MAP[source_key]
+    source = source_registry.by_key[source_key]
+    source_title, source_value = source.title, source.value
 
     has_tasks = await has_available_tasks_for_source(user, source=source_value)
     if not has_tasks:
@@ -114,7 +109,7 @@ async def choose_gender(
     user = await load_user(dialog_manager)
 
     source_key = dialog_manager.dialog_data["source"]
-    source_value = SOURCE_MAP[source_key][1]
+    source_value = source_registry.by_key[source_key].value
 
     gender = {"male": "M", "female": "F", "any": None}[button.widget_id]
 
@@ -384,12 +379,12 @@ tasks_dialog = Dialog(
         Const("📦 <b>Откуда хотите взять задание?</b>"),
         *[
             CustomEmojiButton(
-                Const(title),
-                id=key,
+                Const(source.title),
+                id=source.key,
                 on_click=choose_source,
-                icon_custom_emoji_id=emoji_id,
+                icon_custom_emoji_id=source.emoji_id,
             )
-            for key, (title, _, emoji_id) in SOURCE_MAP.items()
+            for source in source_registry.sources
         ],
         Button(Const("⬅️ Назад"), id="back", on_click=back_to_tasks_empty),
         state=TasksSG.choose_source,
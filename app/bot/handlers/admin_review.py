@@ -6,10 +6,7 @@ from aiogram.enums import ParseMode
 
 import logging
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-
 from app.bot.callbacks.admin import AdminReviewCB
-from app.bot.service.rejected_cleanup import archive_rejected_later
 
 from app.bot.utils.tg import notify_user_about_review
 from app.repository.task import review_assignment
@@ -40,17 +37,6 @@ async def admin_review_handler(
         admin_tg_id=callback.from_user.id,
         approve=approve,
     )
-    if not approve:
-        scheduler: AsyncIOScheduler = dispatcher.workflow_data["scheduler"]
-
-        scheduler.add_job(
-            archive_rejected_later,
-            trigger="date",
-            run_date=datetime.now(tz=MSC_TZ) + timedelta(minutes=1),
-            args=[assignment.id],
-            id=f"archive_rejected_{assignment.id}",
-            replace_existing=True,
-        )
 
     if not assignment:
         await callback.answer("⚠️ Задание не найдено", show_alert=True)
@@ -1,7 +1,9 @@
+import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
 from aiogram.enums import ParseMode
 from aiogram.filters import ExceptionTypeFilter
 from aiogram_dialog import setup_dialogs, StartMode, DialogManager, ShowMode
@@ -16,10 +18,21 @@ from app.bot.dialogs.info_pages import (
 from app.bot.dialogs.states import MainMenuSG
 from app.bot.middlewares.approval import ApprovalMiddleware
 from app.bot.middlewares.block_user import BlockUserMiddleware
+from app.bot.middlewares.metrics import (
+    HandlerMetricsMiddleware,
+    TimedMiddleware,
+    UpdateMetricsMiddleware,
+)
+from app.bot.middlewares.query_budget import QueryBudgetMiddleware
 from app.bot.middlewares.subscription import SubscriptionMiddleware
-from app.bot.scheduler import setup_scheduler
+from app.bot.session import create_session, instrument
 
+from app.core.metrics import start_metrics_server
 from app.core.settings import settings
+from app.db.free_task_index import free_task_index
+from app.db.invalidation import invalidation_bus
+from app.db.query_budget import install_query_tracer
+from app.repository.warmup import warm_up
 
 
 # middlewares
@@ -60,20 +73,40 @@ async def on_unknown_intent(event, dialog_manager: DialogManager):
     )
 
 
-async def main() -> None:
-    bot = Bot(
+def create_bot(session: BaseSession | None = None, **kwargs) -> Bot:
+    """
+    Bot с настройками по умолчанию и метриками Bot API. Без session —
+    настроенная сессия create_session() (лимиты, таймауты по методам).
+    """
+    return Bot(
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        session=create_session() if session is None else instrument(session),
+        **kwargs,
     )
 
+
+def create_dispatcher() -> Dispatcher:
+    """
+    Собирает Dispatcher со всеми роутерами, диалогами и middleware.
+
+    Планировщик и сервер метрик сюда не входят — их поднимает main(),
+    поэтому тот же Dispatcher используют инструменты нагрузочного
+    тестирования (tools.replay).
+    """
     dp = Dispatcher()
 
-    dp.update.middleware(RegistrationMiddleware())
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    if settings.query_budget is not None or settings.query_budget_ms is not None:
+        install_query_tracer()
+        dp.update.outer_middleware(QueryBudgetMiddleware())
+
+    dp.update.middleware(TimedMiddleware(RegistrationMiddleware()))
 
-    dp.message.middleware(BlockUserMiddleware())
-    dp.callback_query.middleware(BlockUserMiddleware())
+    dp.message.middleware(TimedMiddleware(BlockUserMiddleware()))
+    dp.callback_query.middleware(TimedMiddleware(BlockUserMiddleware()))
 
-    dp.update.middleware(ApprovalMiddleware())
+    dp.update.middleware(TimedMiddleware(ApprovalMiddleware()))
 
     dp.include_router(start_router)
     dp.include_router(admin_router)
@@ -93,10 +126,72 @@ async def main() -> None:
         ExceptionTypeFilter(UnknownIntent),
     )
 
-    scheduler = setup_scheduler(bot)
-    dp.workflow_data["scheduler"] = scheduler
     setup_dialogs(dp)
-    dp.message.middleware(SubscriptionMiddleware())
-    dp.callback_query.middleware(SubscriptionMiddleware())
+    dp.message.middleware(TimedMiddleware(SubscriptionMiddleware()))
+    dp.callback_query.middleware(TimedMiddleware(SubscriptionMiddleware()))
+
+    # последними, чтобы время хендлера не включало остальные middleware
+    dp.message.middleware(HandlerMetricsMiddleware("message"))
+    dp.callback_query.middleware(HandlerMetricsMiddleware("callback_query"))
+
+    return dp
+
+
+async def run_scheduler(bot: Bot, dp: Dispatcher) -> None:
+    """
+    Поднимает APScheduler параллельно с polling: импорт apscheduler
+    и подключение job store (в потоке) не задерживают первый апдейт.
+    """
+    from app.bot.scheduler import start_scheduler
+
+    dp.workflow_data["scheduler"] = await start_scheduler(bot)
 
-    await dp.start_polling(bot)
+
+def _on_scheduler_started(task: asyncio.Task) -> None:
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.critical(
+            "Планировщик не запущен: отчёты и очистки не выполняются",
+            exc_info=task.exception(),
+        )
+
+
+async def start_services() -> None:
+    """
+    Всё, что нужно до первого апдейта: шина инвалидации, прогрев
+    (пул, горячие запросы, справочники) и индекс свободных заданий.
+    Прогрев идёт до индекса — пока индекс не готов, выдача прогревает
+    SQL-запрос выбора задания.
+    """
+    await invalidation_bus.start()
+    await warm_up()
+    if settings.free_task_index:
+        await free_task_index.start()
+
+
+async def stop_services() -> None:
+    await free_task_index.stop()
+    await invalidation_bus.stop()
+
+
+async def main() -> None:
+    bot = create_bot()
+    dp = create_dispatcher()
+
+    await start_services()
+
+    metrics_runner = await start_metrics_server()
+    scheduler_task = asyncio.create_task(run_scheduler(bot, dp))
+    scheduler_task.add_done_callback(_on_scheduler_started)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        scheduler_task.cancel()
+        scheduler = dp.workflow_data.get("scheduler")
+        if scheduler is not None:
+            from app.bot.scheduler import stop_scheduler
+
+            await stop_scheduler(scheduler)
+        await metrics_runner.cleanup()
+        await stop_services()
@@ -3,7 +3,7 @@ from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery
 
 from app.core.settings import settings
-from app.repository.user import get_user_by_tg_id
+from app.repository.user import get_user_access
 from app.models.user import UserApprovalStatus
 
 logger = logging.getLogger(__name__)
@@ -44,14 +44,14 @@ class ApprovalMiddleware(BaseMiddleware):
         ):
             return await handler(event, data)
 
-        user = await get_user_by_tg_id(tg_id=tg_id)
-        if not user:
+        access = await get_user_access(tg_id)
+        if not access:
             return await handler(event, data)
 
-        if not user.full_name:
+        if not access.is_registered:
             return await handler(event, data)
 
-        if user.approval_status == UserApprovalStatus.PENDING:
+        if access.approval_status == UserApprovalStatus.PENDING:
             text = (
                 "⏳ Ваша заявка на регистрацию находится на проверке.\n\n"
                 "Обычно это занимает немного времени. Пожалуйста, подождите."
@@ -66,7 +66,7 @@ class ApprovalMiddleware(BaseMiddleware):
                 )
             return
 
-        if user.approval_status == UserApprovalStatus.REJECTED:
+        if access.approval_status == UserApprovalStatus.REJECTED:
             text = (
                 "❌ В доступе отказано.\n\n"
                 "К сожалению, вы не прошли проверку и не можете пользоваться ботом."
@@ -0,0 +1,122 @@
+import time
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import Update
+from aiogram_dialog.api.internal.middleware import CONTEXT_KEY
+
+from app.core.metrics import (
+    HANDLER_ERRORS,
+    HANDLER_SECONDS,
+    MIDDLEWARE_SECONDS,
+    TELEGRAM_API_ERRORS,
+    TELEGRAM_API_SECONDS,
+    UPDATE_SECONDS,
+    UPDATES_IN_FLIGHT,
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer-middleware на dp.update: полное время апдейта и число апдейтов в работе."""
+
+    async def __call__(self, handler, event: Update, data):
+        started = time.perf_counter()
+        UPDATES_IN_FLIGHT.inc()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATES_IN_FLIGHT.dec()
+            UPDATE_SECONDS.labels(event.event_type).observe(
+                time.perf_counter() - started
+            )
+
+
+def _handler_name(data) -> str:
+    handler = data.get("handler")
+    callback = getattr(handler, "callback", None)
+    if callback is None:
+        return "-"
+    return getattr(callback, "__qualname__", type(callback).__name__)
+
+
+def _state_name(data) -> str:
+    # состояние диалога aiogram_dialog, иначе обычное FSM-состояние
+    context = data.get(CONTEXT_KEY)
+    if context is not None and context.state is not None:
+        return context.state.state
+    return data.get("raw_state") or "-"
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Inner-middleware: время хендлера по роутеру, функции и состоянию диалога.
+
+    Регистрируется на наблюдателях Dispatcher и наследуется вложенными
+    роутерами, поэтому видит уже выбранный хендлер.
+    """
+
+    def __init__(self, event_type: str):
+        self.event_type = event_type
+
+    async def __call__(self, handler, event, data):
+        router = data.get("event_router")
+        labels = (
+            self.event_type,
+            router.name if router is not None else "-",
+            _handler_name(data),
+        )
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            HANDLER_ERRORS.labels(*labels, type(e).__name__).inc()
+            raise
+        finally:
+            HANDLER_SECONDS.labels(*labels, _state_name(data)).observe(
+                time.perf_counter() - started
+            )
+
+
+class TimedMiddleware(BaseMiddleware):
+    """
+    Обёртка над middleware: меряет только её собственное время,
+    вычитая время вложенной цепочки (следующих middleware и хендлера).
+    """
+
+    def __init__(self, middleware: BaseMiddleware, name: str | None = None):
+        self.middleware = middleware
+        self.name = name or type(middleware).__name__
+
+    async def __call__(self, handler, event, data):
+        nested = 0.0
+
+        async def timed_handler(event, data):
+            nonlocal nested
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            finally:
+                nested += time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            return await self.middleware(timed_handler, event, data)
+        finally:
+            MIDDLEWARE_SECONDS.labels(self.name).observe(
+                time.perf_counter() - started - nested
+            )
+
+
+class TelegramApiMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: латентность и ошибки по методам Bot API."""
+
+    async def __call__(self, make_request, bot, method):
+        name = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            TELEGRAM_API_SECONDS.labels(name).observe(time.perf_counter() - started)
@@ -0,0 +1,36 @@
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from app.core.settings import settings
+from app.db.query_budget import check_budget, trace_queries
+
+
+def _update_label(update: Update) -> str:
+    event = update.event
+    detail = ""
+    if update.message is not None:
+        detail = (update.message.text or update.message.content_type or "")[:32]
+    elif update.callback_query is not None:
+        detail = (update.callback_query.data or "")[:32]
+
+    user = getattr(event, "from_user", None)
+    user_part = f" tg_id={user.id}" if user else ""
+    return f"update={update.update_id} {update.event_type} {detail!r}{user_part}"
+
+
+class QueryBudgetMiddleware(BaseMiddleware):
+    """
+    Outer-middleware на dp.update: считает и замеряет SQL-запросы
+    апдейта и предупреждает о превышении QUERY_BUDGET / QUERY_BUDGET_MS.
+    """
+
+    async def __call__(self, handler, event: Update, data):
+        with trace_queries(_update_label(event)) as trace:
+            try:
+                return await handler(event, data)
+            finally:
+                check_budget(
+                    trace,
+                    settings.query_budget,
+                    settings.query_budget_ms,
+                )
@@ -7,7 +7,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram_dialog import DialogManager
 
 from app.core.settings import settings
-from app.repository.user import get_user_by_tg_id
+from app.repository.user import get_user_access
 
 logger = logging.getLogger(__name__)
 
@@ -45,9 +45,9 @@ class RegistrationMiddleware(BaseMiddleware):
         if dialog_manager and dialog_manager.has_active_dialog():
             return await handler(event, data)
 
-        user = await get_user_by_tg_id(tg_id)
+        access = await get_user_access(tg_id)
 
-        if not user or not user.full_name:
+        if not access or not access.is_registered:
             logger.info(
                 "Пользователь %s заблокирован middleware (не зарегистрирован)",
                 tg_id,
@@ -4,7 +4,7 @@ from aiogram_dialog import DialogManager, StartMode
 from app.bot.dialogs.states import SubscriptionSG
 from app.core.settings import settings
 from app.models.user import UserApprovalStatus
-from app.repository.user import get_user_by_tg_id
+from app.repository.user import get_user_access
 
 
 from aiogram_dialog.api.exceptions import NoContextError
@@ -21,15 +21,15 @@ class SubscriptionMiddleware(BaseMiddleware):
         if user_tg.id in settings.admin_id_list:
             return await handler(event, data)
 
-        user = await get_user_by_tg_id(user_tg.id)
+        access = await get_user_access(user_tg.id)
 
-        if not user or not user.full_name:
+        if not access or not access.is_registered:
             return await handler(event, data)
 
-        if user.approval_status != UserApprovalStatus.APPROVED:
+        if access.approval_status != UserApprovalStatus.APPROVED:
             return await handler(event, data)
 
-        if user.is_channel_verified:
+        if access.is_channel_verified:
             return await handler(event, data)
 
         if dialog_manager:
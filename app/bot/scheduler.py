@@ -1,8 +1,42 @@
+"""
+Планировщик отчётов и чисток: APScheduler с job store в Postgres
+и выбором лидера через advisory lock (джобы выполняет один экземпляр).
+
+Компромисс: SQLAlchemyJobStore синхронный (psycopg), а AsyncIOScheduler
+обрабатывает джобы в потоке цикла событий. Каждое пробуждение — в том
+числе раз в REJECTED_SWEEP_INTERVAL_SECONDS для sweeper'а отклонённых —
+выполняет запросы к apscheduler_jobs синхронно, и polling стоит, пока
+Postgres отвечает. Запросы короткие (выборка по next_run_time
+и обновление одной строки), но при медленной или недоступной БД
+пауза растёт до таймаутов соединения. Старт (создание таблицы)
+вынесен в поток — см. start_scheduler.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timezone, timedelta
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from datetime import timezone, timedelta
+from apscheduler.triggers.interval import IntervalTrigger
 
 from aiogram import Bot
+from app.core.metrics import (
+    SCHEDULER_BACKGROUND_TASKS,
+    SCHEDULER_JOB_RUNS,
+    SCHEDULER_JOB_SECONDS,
+)
+from app.core.settings import settings
 from app.bot.service.daily_report import (
     send_daily_tasks_report,
     send_weekly_tasks_report,
@@ -11,63 +45,234 @@ from app.bot.service.rejected_cleanup import (
     run_rejected_archive,
     run_unsubmitted_cleanup,
 )
+from app.bot.service.user_stats import run_user_stats_reconcile
+from app.db.leader import AdvisoryLockLeader
+from app.models.scheduler_job_run import SchedulerJobRunStatus
+from app.repository.scheduler import record_job_run
+
+logger = logging.getLogger(__name__)
 
 MSC_TZ = timezone(timedelta(hours=3))
 
+INSTANCE = f"{socket.gethostname()}:{os.getpid()}"
+
+# Джобы хранятся в БД (pickle), поэтому в них нельзя передать Bot
+# аргументом — обёртки берут его из модуля.
+_bot: Bot | None = None
+_background: set[asyncio.Task] = set()
+_leadership_task: asyncio.Task | None = None
+SCHEDULER_BACKGROUND_TASKS.set_function(lambda: len(_background))
+
+
+async def daily_tasks_report_job() -> None:
+    await send_daily_tasks_report(_bot)
+
+
+async def weekly_tasks_report_job() -> None:
+    await send_weekly_tasks_report(_bot)
+
+
+def _job_specs() -> list[dict]:
+    return [
+        {
+            "func": daily_tasks_report_job,
+            "trigger": CronTrigger(hour=0, minute=0, timezone=MSC_TZ),
+            "id": "daily_tasks_report",
+        },
+        {
+            "func": run_rejected_archive,
+            "trigger": IntervalTrigger(
+                seconds=settings.rejected_sweep_interval_seconds,
+                timezone=MSC_TZ,
+            ),
+            "id": "archive_rejected_assignments",
+            "max_instances": 1,
+        },
+        {
+            "func": weekly_tasks_report_job,
+            "trigger": CronTrigger(
+                day_of_week="mon", hour=0, minute=10, timezone=MSC_TZ
+            ),
+            "id": "weekly_tasks_report",
+        },
+        {
+            "func": run_unsubmitted_cleanup,
+            "trigger": CronTrigger(hour=5, minute=0, timezone=MSC_TZ),
+            "id": "cleanup_unsubmitted_tasks",
+        },
+        {
+            "func": run_user_stats_reconcile,
+            "trigger": CronTrigger(hour=4, minute=0, timezone=MSC_TZ),
+            "id": "reconcile_user_stats",
+        },
+    ]
+
+
+def _ensure_jobs(scheduler: AsyncIOScheduler) -> None:
+    """
+    Регистрирует джобы в job store.
+
+    Уже сохранённая джоба с тем же триггером не перезаписывается:
+    её next_run_time из БД сохраняется, и запуск, пропущенный
+    во время рестарта, выполнится в пределах misfire_grace_time.
+    """
+    for spec in _job_specs():
+        job = scheduler.get_job(spec["id"])
+        if job is not None and str(job.trigger) == str(spec["trigger"]):
+            continue
+        scheduler.add_job(**spec, replace_existing=True)
+
+
+class JobMetricsListener:
+    """
+    Пишет длительность, ошибки и пропуски джоб в scheduler_job_runs
+    и в метрики Prometheus.
+    """
+
+    def __init__(self):
+        self._started: dict[str, tuple[float, datetime]] = {}
+
+    def __call__(self, event) -> None:
+        if event.code == EVENT_JOB_SUBMITTED:
+            self._started[event.job_id] = (
+                time.perf_counter(),
+                datetime.now(timezone.utc),
+            )
+            return
 
-def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
+        started = self._started.pop(event.job_id, None)
+        duration_ms = (
+            round((time.perf_counter() - started[0]) * 1000) if started else None
+        )
+
+        if event.code == EVENT_JOB_MISSED:
+            status = SchedulerJobRunStatus.MISSED
+            logger.warning(
+                "Job %s missed run at %s", event.job_id, event.scheduled_run_time
+            )
+        elif event.exception is not None:
+            status = SchedulerJobRunStatus.ERROR
+        else:
+            status = SchedulerJobRunStatus.SUCCESS
+
+        SCHEDULER_JOB_RUNS.labels(event.job_id, status).inc()
+        if started:
+            SCHEDULER_JOB_SECONDS.labels(event.job_id).observe(
+                time.perf_counter() - started[0]
+            )
+
+        task = asyncio.ensure_future(
+            record_job_run(
+                job_id=event.job_id,
+                status=status,
+                scheduled_at=event.scheduled_run_time,
+                started_at=started[1] if started else None,
+                duration_ms=duration_ms,
+                instance=INSTANCE,
+                error=repr(event.exception) if event.exception else None,
+            )
+        )
+        _background.add(task)
+        task.add_done_callback(_on_record_done)
+
+
+def _on_record_done(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("Не удалось записать метрику джобы: %r", task.exception())
+
+
+async def _leadership_loop(scheduler: AsyncIOScheduler) -> None:
+    """
+    Выполняет джобы только экземпляр, удерживающий advisory lock:
+    остальные держат планировщик на паузе и периодически
+    пытаются перехватить лидерство.
+    """
+    leader = AdvisoryLockLeader(settings.scheduler_lock_id)
+
+    try:
+        while True:
+            try:
+                if leader.is_leader:
+                    if not await leader.check():
+                        scheduler.pause()
+                        logger.warning("Scheduler leadership lost (%s)", INSTANCE)
+                elif await leader.try_acquire():
+                    _ensure_jobs(scheduler)
+                    scheduler.resume()
+                    logger.info("Scheduler leader elected (%s)", INSTANCE)
+            except Exception:
+                logger.exception("Ошибка выбора лидера планировщика")
+                if leader.is_leader:
+                    scheduler.pause()
+                    await leader.release()
+
+            await asyncio.sleep(settings.scheduler_leader_check_seconds)
+    finally:
+        if scheduler.running:
+            scheduler.pause()
+        await leader.release()
+
+
+def _create_scheduler(bot: Bot) -> tuple[AsyncIOScheduler, SQLAlchemyJobStore]:
+    global _bot
+    _bot = bot
+
+    jobstore = SQLAlchemyJobStore(
+        url=settings.scheduler_database_url,
+        engine_options={"pool_pre_ping": True},
+    )
     scheduler = AsyncIOScheduler(
+        jobstores={"default": jobstore},
         timezone=MSC_TZ,
         job_defaults={
             "misfire_grace_time": 600,
             "coalesce": True,
         },
     )
-    scheduler.add_job(
-        send_daily_tasks_report,
-        trigger=CronTrigger(
-            hour=0,
-            minute=0,
-            timezone=MSC_TZ,
-        ),
-        args=[bot],
-        id="daily_tasks_report",
-        replace_existing=True,
-    )
-    scheduler.add_job(
-        run_rejected_archive,
-        trigger=CronTrigger(
-            hour=0,
-            minute=5,
-            timezone=MSC_TZ,
-        ),
-        id="archive_rejected_assignments",
-        replace_existing=True,
+    scheduler.add_listener(
+        JobMetricsListener(),
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED,
     )
+    return scheduler, jobstore
 
-    scheduler.add_job(
-        send_weekly_tasks_report,
-        trigger=CronTrigger(
-            day_of_week="mon",
-            hour=0,
-            minute=10,
-            timezone=MSC_TZ,
-        ),
-        args=[bot],
-        id="weekly_tasks_report",
-        replace_existing=True,
-    )
 
-    scheduler.add_job(
-        run_unsubmitted_cleanup,
-        trigger=CronTrigger(
-            hour=5,
-            minute=0,
-            timezone=MSC_TZ,
-        ),
-        id="cleanup_unsubmitted_tasks",
-        replace_existing=True,
-    )
+async def start_scheduler(bot: Bot) -> AsyncIOScheduler:
+    """
+    Создаёт и запускает планировщик на паузе и цикл выбора лидера.
+
+    Job store синхронный (psycopg): подключение и создание таблицы
+    выполняются в потоке, после чего scheduler.start() в цикле событий
+    лишь проверяет таблицу по уже открытому соединению.
+    """
+    global _leadership_task
+
+    scheduler, jobstore = _create_scheduler(bot)
+    await asyncio.to_thread(jobstore.jobs_t.create, jobstore.engine, True)
+
+    # до получения лидерства джобы не выполняются
+    scheduler.start(paused=True)
+
+    _leadership_task = asyncio.create_task(_leadership_loop(scheduler))
+    _background.add(_leadership_task)
+    _leadership_task.add_done_callback(_background.discard)
 
-    scheduler.start()
     return scheduler
+
+
+async def stop_scheduler(scheduler: AsyncIOScheduler) -> None:
+    """Останавливает цикл лидерства (освобождает advisory lock) и планировщик."""
+    global _leadership_task
+
+    task, _leadership_task = _leadership_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Ошибка остановки цикла лидерства планировщика")
+
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
@@ -1,7 +1,7 @@
 import logging
 from aiogram import Bot
-from aiogram.types import BufferedInputFile
 
+from app.bot.utils.tg import send_document_to_chats
 from app.core.settings import settings
 from app.repository.task_repository_daily import (
     export_daily_tasks_excel,
@@ -21,18 +21,18 @@ async def send_daily_tasks_report(bot: Bot) -> None:
         logger.info("Daily report: empty file")
         return
 
-    for admin_id in settings.admin_id_list:
-        try:
-            await bot.send_document(
-                chat_id=admin_id,
-                document=BufferedInputFile(
-                    data,
-                    filename="daily_tasks_report.xlsx",
-                ),
-                caption="📊 Отчёт по заданиям за прошедший день",
-            )
-        except Exception:
-            logger.exception("Failed to send daily report to admin %s", admin_id)
+    delivered = await send_document_to_chats(
+        bot,
+        settings.admin_id_list,
+        data=data,
+        filename="daily_tasks_report.xlsx",
+        caption="📊 Отчёт по заданиям за прошедший день",
+    )
+    logger.info(
+        "Daily report delivered to %s/%s admins",
+        delivered,
+        len(settings.admin_id_list),
+    )
 
 
 async def send_weekly_tasks_report(bot: Bot) -> None:
@@ -45,18 +45,15 @@ async def send_weekly_tasks_report(bot: Bot) -> None:
         logger.info("Weekly report: empty file")
         return
 
-    for admin_id in settings.admin_id_list:
-        try:
-            await bot.send_document(
-                chat_id=admin_id,
-                document=BufferedInputFile(
-                    data,
-                    filename="weekly_tasks_report.xlsx",
-                ),
-                caption="📊 Отчёт по заданиям за прошедшую неделю",
-            )
-        except Exception:
-            logger.exception(
-                "Failed to send weekly report to admin %s",
-                admin_id,
-            )
+    delivered = await send_document_to_chats(
+        bot,
+        settings.admin_id_list,
+        data=data,
+        filename="weekly_tasks_report.xlsx",
+        caption="📊 Отчёт по заданиям за прошедшую неделю",
+    )
+    logger.info(
+        "Weekly report delivered to %s/%s admins",
+        delivered,
+        len(settings.admin_id_list),
+    )
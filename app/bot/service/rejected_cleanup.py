@@ -1,8 +1,9 @@
 import logging
+from datetime import datetime, timedelta, timezone
 
+from app.core.settings import settings
 from app.repository.task import (
     archive_rejected_assignments,
-    archive_assignment_by_id,
     delete_unsubmitted_tasks,
 )
 
@@ -10,28 +11,21 @@ logger = logging.getLogger(__name__)
 
 
 async def run_rejected_archive() -> None:
-    logger.info("start run_rejected_archive()")
-
-    count = await archive_rejected_assignments()
+    """
+    Периодический sweeper: архивирует все отклонённые задания,
+    у которых истёк льготный период после отклонения.
+    Одна джоба вместо отдельной date-джобы на каждое отклонение.
+    """
+    logger.debug("start run_rejected_archive()")
+
+    older_than = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.rejected_archive_delay_seconds
+    )
+    count = await archive_rejected_assignments(older_than=older_than)
     if count:
         logger.info("Rejected assignments archived: %s", count)
 
 
-async def archive_rejected_later(assignment_id: int) -> None:
-    logger.info(
-        "Running delayed archive for rejected assignment %s",
-        assignment_id,
-    )
-
-    archived = await archive_assignment_by_id(assignment_id=assignment_id)
-
-    if archived:
-        logger.info(
-            "Assignment %s archived after rejection delay",
-            assignment_id,
-        )
-
-
 async def run_unsubmitted_cleanup() -> None:
     logger.info("Start cleanup of unsubmitted tasks")
 
@@ -0,0 +1,14 @@
+import logging
+
+from app.repository.user_stats import reconcile_user_stats
+
+logger = logging.getLogger(__name__)
+
+
+async def run_user_stats_reconcile() -> None:
+    logger.info("Start user stats reconciliation")
+
+    fixed = await reconcile_user_stats()
+
+    if fixed:
+        logger.warning("User stats drift fixed for %s users", fixed)
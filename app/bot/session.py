@@ -0,0 +1,92 @@
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+
+from app.bot.middlewares.metrics import TelegramApiMetricsMiddleware
+from app.core.runtime import json_codecs
+from app.core.settings import settings
+
+# Методы с коротким таймаутом: пользователь ждёт реакции на кнопку,
+# а зависший запрос держит соединение пула.
+FAST_METHODS = (
+    "answerCallbackQuery",
+    "deleteMessage",
+    "editMessageReplyMarkup",
+    "editMessageText",
+    "getChatMember",
+)
+
+# Отправка файлов: выгрузки Excel и фото отчётов.
+UPLOAD_METHODS = (
+    "sendDocument",
+    "sendMediaGroup",
+    "sendPhoto",
+)
+
+
+class TelegramSession(AiohttpSession):
+    """
+    AiohttpSession с таймаутом по методу Bot API и настройками
+    TCPConnector (keep-alive, кеш DNS) поверх аргументов aiogram.
+
+    Таймаут, переданный явно (request_timeout — так делает polling
+    для getUpdates), важнее таблицы method_timeouts.
+    """
+
+    def __init__(
+        self,
+        *,
+        method_timeouts: dict[str, float],
+        dns_cache_seconds: int,
+        keepalive_seconds: float,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.method_timeouts = method_timeouts
+        # коннектор создаётся лениво в create_session() из _connector_init
+        self._connector_init.update(
+            ttl_dns_cache=dns_cache_seconds,
+            keepalive_timeout=keepalive_seconds,
+        )
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod, timeout: float | None = None
+    ):
+        if timeout is None:
+            timeout = self.method_timeouts.get(method.__api_method__)
+        return await super().make_request(bot, method, timeout)
+
+
+def method_timeouts() -> dict[str, float]:
+    """Таймауты по методам из настроек (TELEGRAM_*_TIMEOUT_SECONDS)."""
+    timeouts = dict.fromkeys(FAST_METHODS, settings.telegram_fast_timeout_seconds)
+    timeouts.update(
+        dict.fromkeys(UPLOAD_METHODS, settings.telegram_upload_timeout_seconds)
+    )
+    timeouts.update(settings.telegram_method_timeout_map)
+    return timeouts
+
+
+def instrument(session: BaseSession) -> BaseSession:
+    """Латентность и ошибки по методам Bot API (telegram_api_*)."""
+    session.middleware(TelegramApiMetricsMiddleware())
+    return session
+
+
+def create_session() -> TelegramSession:
+    """
+    HTTP-сессия Bot API по настройкам: лимит соединений, keep-alive,
+    кеш DNS, таймауты по методам, JSON-кодеки и метрики.
+    """
+    json_loads, json_dumps = json_codecs()
+    session = TelegramSession(
+        method_timeouts=method_timeouts(),
+        limit=settings.telegram_connection_limit,
+        dns_cache_seconds=settings.telegram_dns_cache_seconds,
+        keepalive_seconds=settings.telegram_keepalive_seconds,
+        timeout=settings.telegram_timeout_seconds,
+        json_loads=json_loads,
+        json_dumps=json_dumps,
+    )
+    return instrument(session)
@@ -0,0 +1,59 @@
+from math import ceil
+
+from app.db.pagination import decode_cursor, encode_cursor
+
+
+async def load_keyset_page(
+    data: dict,
+    *,
+    total_count: int,
+    page_size: int,
+    fetch,
+    cursor_of,
+) -> tuple[int, int, list]:
+    """
+    Загружает страницу по курсорам из dialog_data.
+
+    Навигационные кнопки только выставляют direction,
+    а ключи первой/последней записи страницы хранятся в first_key/last_key.
+
+    Returns:
+        tuple: (page, total_pages, items)
+    """
+    page = int(data.get("page", 0))
+    direction = data.get("direction", "first")
+
+    total_pages = max(1, ceil(total_count / page_size))
+    last_page = total_pages - 1
+
+    cursor = None
+    limit = page_size
+
+    if direction == "next":
+        cursor = decode_cursor(data.get("last_key"))
+    elif direction in ("prev", "stay"):
+        cursor = decode_cursor(data.get("first_key"))
+    elif direction == "last":
+        page = last_page
+        # последняя страница неполная — берём ровно остаток,
+        # чтобы границы страниц совпадали с листанием вперёд
+        limit = total_count - last_page * page_size or page_size
+
+    if direction == "first" or (cursor is None and direction != "last"):
+        direction, page = "first", 0
+
+    items = await fetch(direction, cursor, limit)
+
+    if not items and direction != "first":
+        page = 0
+        items = await fetch("first", None, page_size)
+
+    page = max(0, min(page, last_page))
+
+    data["page"] = page
+    data["last_page"] = last_page
+    data["direction"] = "stay"
+    data["first_key"] = encode_cursor(cursor_of(items[0])) if items else None
+    data["last_key"] = encode_cursor(cursor_of(items[-1])) if items else None
+
+    return page, total_pages, items
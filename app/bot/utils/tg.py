@@ -2,10 +2,11 @@ import asyncio
 from html import escape
 
 from aiogram.enums import ParseMode
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import BufferedInputFile, InlineKeyboardMarkup, InlineKeyboardButton
 
 from app.bot.keyboards.user_approval import user_approval_keyboard, go_main_menu_kb
-from app.consts.source_task import SOURCE_MAP
+from app.consts.source_task import source_registry
 from app.models.user import User
 
 import logging
@@ -21,10 +22,7 @@ from app.repository.user import save_approval_admin_message
 logger = logging.getLogger(__name__)
 
 def get_source_emoji_html(source: str) -> str:
-    for _, (title, _, emoji_id) in SOURCE_MAP.items():
-        if title == source:
-            return f'<tg-emoji emoji-id="{emoji_id}">🗺</tg-emoji>'
-    return "🗺"
+    return source_registry.emoji_html(source)
 
 
 async def notify_admins_user_registered(
@@ -262,3 +260,83 @@ async def notify_user_about_approval(
             "Не удалось отправить approval-уведомление пользователю tg_id=%s",
             tg_id,
         )
+
+
+async def send_document_to_chats(
+    bot: Bot,
+    chat_ids: list[int],
+    *,
+    data: bytes,
+    filename: str,
+    caption: str | None = None,
+    concurrency: int = 10,
+) -> int:
+    """
+    Рассылает документ нескольким получателям.
+
+    Файл загружается в Telegram один раз (первому доступному получателю),
+    остальным параллельно отправляется полученный file_id — объём
+    загрузки не зависит от числа получателей.
+
+    Ошибки доставки только логируются и учитываются в результате —
+    это для плановых рассылок админам. Ответ одному пользователю
+    (кнопки выгрузок) отправляется напрямую через bot.send_document,
+    чтобы ошибка дошла до хендлера.
+
+    Args:
+        bot (Bot): Экземпляр бота.
+        chat_ids (list[int]): Получатели.
+        data (bytes): Содержимое файла.
+        filename (str): Имя файла.
+        caption (str | None): Подпись.
+        concurrency (int): Максимум одновременных отправок по file_id.
+
+    Returns:
+        int: Количество успешных доставок.
+    """
+    pending = list(chat_ids)
+    file_id = None
+    delivered = 0
+
+    while pending and file_id is None:
+        chat_id = pending.pop(0)
+        try:
+            msg = await bot.send_document(
+                chat_id=chat_id,
+                document=BufferedInputFile(data, filename=filename),
+                caption=caption,
+            )
+            file_id = msg.document.file_id
+            delivered += 1
+        except Exception:
+            logger.exception(
+                "DOCUMENT_UPLOAD_ERROR | chat_id=%s file=%s", chat_id, filename
+            )
+
+    if file_id is None or not pending:
+        return delivered
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(chat_id: int) -> bool:
+        async with semaphore:
+            try:
+                try:
+                    await bot.send_document(
+                        chat_id=chat_id, document=file_id, caption=caption
+                    )
+                except TelegramRetryAfter as e:
+                    # флуд-лимит Telegram: ждём и повторяем один раз
+                    await asyncio.sleep(e.retry_after)
+                    await bot.send_document(
+                        chat_id=chat_id, document=file_id, caption=caption
+                    )
+                return True
+            except Exception:
+                logger.exception(
+                    "DOCUMENT_SEND_ERROR | chat_id=%s file=%s", chat_id, filename
+                )
+                return False
+
+    results = await asyncio.gather(*(send(chat_id) for chat_id in pending))
+    return delivered + sum(results)
@@ -0,0 +1,27 @@
+# Альтернативные написания городов → название в справочнике cities.
+# Ключи сравниваются после normalize_city_name (регистр, ё/е, пробелы
+# и дефисы не важны), алиасы городов, которых нет в справочнике,
+# игнорируются.
+CITY_ALIASES = {
+    "спб": "Санкт-Петербург",
+    "с-пб": "Санкт-Петербург",
+    "питер": "Санкт-Петербург",
+    "санкт петербург": "Санкт-Петербург",
+    "петербург": "Санкт-Петербург",
+    "ленинград": "Санкт-Петербург",
+    "мск": "Москва",
+    "msk": "Москва",
+    "moscow": "Москва",
+    "spb": "Санкт-Петербург",
+    "saint petersburg": "Санкт-Петербург",
+    "екб": "Екатеринбург",
+    "екат": "Екатеринбург",
+    "нск": "Новосибирск",
+    "новосиб": "Новосибирск",
+    "нн": "Нижний Новгород",
+    "нижний": "Нижний Новгород",
+    "tyumen": "Тюмень",
+    "sochi": "Сочи",
+    "krasnodar": "Краснодар",
+    "volgograd": "Волгоград",
+}
@@ -1,38 +1,167 @@
+from dataclasses import dataclass
 
-SOURCE_MAP = {
-    "yandex": (
-        "Яндекс Карты",
-        "Яндекс Карты",
-        "5359811897677848798",  # yandex
+
+@dataclass(frozen=True)
+class Source:
+    """Источник заданий (площадка для отзыва)."""
+
+    key: str  # id кнопки выбора источника
+    title: str  # подпись кнопки
+    value: str  # Task.source в БД
+    emoji_id: str  # custom emoji Telegram
+    prefix: str  # префикс human_code
+    domains: tuple[str, ...]  # домены ссылок (с поддоменами)
+    task_text: str  # текст задания при импорте
+    # метка бренда, с которой подходит любая национальная зона
+    # (2gis.uz, google.com.tr), если точного домена в domains нет
+    brands: tuple[str, ...] = ()
+
+    @property
+    def emoji_html(self) -> str:
+        return f'<tg-emoji emoji-id="{self.emoji_id}">🗺</tg-emoji>'
+
+
+SOURCES = (
+    Source(
+        key="yandex",
+        title="Яндекс Карты",
+        value="Яндекс Карты",
+        emoji_id="5359811897677848798",
+        prefix="YAN",
+        domains=("yandex.ru", "yandex.com"),
+        task_text="Оставить отзыв на Яндекс Картах",
+        brands=("yandex",),
     ),
-    "yandex_browser": (
-        "Яндекс Браузер",
-        "Яндекс Браузер",
-        "5267066657355900602",  # yandex browser
+    Source(
+        key="yandex_browser",
+        title="Яндекс Браузер",
+        value="Яндекс Браузер",
+        emoji_id="5267066657355900602",
+        prefix="YBR",
+        domains=("browser.yandex.ru", "ya.ru"),
+        task_text="Оставить отзыв через Яндекс Браузер",
     ),
-    "2gis": (
-        "2ГИС",
-        "2ГИС",
-        "5244638999561135703",  # 2gis
+    Source(
+        key="2gis",
+        title="2ГИС",
+        value="2ГИС",
+        emoji_id="5244638999561135703",
+        prefix="GIS",
+        domains=("2gis.ru", "2gis.com", "2gis.kz", "2gis.by", "2gis.ae", "2gis.kg"),
+        task_text="Оставить отзыв в 2ГИС",
+        brands=("2gis",),
     ),
-    "google": (
-        "Google Maps",
-        "Google Maps",
-        "5343611925282435092",  # google
+    Source(
+        key="google",
+        title="Google Maps",
+        value="Google Maps",
+        emoji_id="5343611925282435092",
+        prefix="GGL",
+        domains=("google.com", "google.ru", "goo.gl"),
+        task_text="Оставить отзыв в Google Maps",
+        brands=("google",),
     ),
-    "vk": (
-        "VK",
-        "VK",
-        "5263006895353896908",  # vk
+    Source(
+        key="vk",
+        title="VK",
+        value="VK",
+        emoji_id="5263006895353896908",
+        prefix="VK",
+        domains=("vk.ru", "vk.com"),
+        task_text="Оставить отзыв во ВКонтакте",
     ),
-    "yell": (
-        "Yell",
-        "Yell",
-        "5264961741128769729",  # yell
+    Source(
+        key="yell",
+        title="Yell",
+        value="Yell",
+        emoji_id="5264961741128769729",
+        prefix="YEL",
+        domains=("yell.ru",),
+        task_text="Оставить отзыв на Yell",
     ),
-    "zoon": (
-        "Zoon",
-        "Zoon",
-        "5267443489196510893",  # zoon
+    Source(
+        key="zoon",
+        title="Zoon",
+        value="Zoon",
+        emoji_id="5267443489196510893",
+        prefix="ZON",
+        domains=("zoon.ru",),
+        task_text="Оставить отзыв на Zoon",
     ),
-}
\ No newline at end of file
+)
+
+# вторые уровни национальных зон вида com.tr, co.uk
+_SECOND_LEVELS = {"com", "co"}
+
+# префикс human_code для неизвестного источника
+DEFAULT_PREFIX = "MAP"
+DEFAULT_EMOJI_HTML = "🗺"
+
+
+def _is_country_zone(labels: list[str]) -> bool:
+    """ru, uz, com, com.tr, co.uk — но не evil.com."""
+    if len(labels) == 1:
+        return bool(labels[0])
+    return len(labels) == 2 and labels[0] in _SECOND_LEVELS and len(labels[1]) == 2
+
+
+class SourceRegistry:
+    """
+    Индексы источников по key, value (Task.source) и префиксу
+    human_code и дерево доменов для классификации ссылок.
+
+    Дерево построено по меткам домена справа налево
+    (ru → yandex → browser), поиск выбирает самый длинный
+    совпавший суффикс: browser.yandex.ru → «Яндекс Браузер»,
+    maps.yandex.ru → «Яндекс Карты». Стоимость — O(число меток).
+
+    Если суффикс не найден, подходит метка бренда (Source.brands)
+    перед национальной зоной: 2gis.uz, www.google.com.tr.
+    """
+
+    _LEAF = None  # метка домена не бывает None
+
+    def __init__(self, sources: tuple[Source, ...]):
+        self.sources = sources
+        self.by_key = {s.key: s for s in sources}
+        self.by_value = {s.value: s for s in sources}
+        self.by_prefix = {s.prefix: s for s in sources}
+        self._emoji_html = {s.value: s.emoji_html for s in sources}
+        self._brands = {brand: s for s in sources for brand in s.brands}
+
+        self._trie: dict = {}
+        for source in sources:
+            for domain in source.domains:
+                node = self._trie
+                for label in reversed(domain.split(".")):
+                    node = node.setdefault(label, {})
+                node[self._LEAF] = source
+
+    def match_host(self, host: str) -> Source | None:
+        """Источник по имени хоста ссылки (без порта)."""
+        labels = host.lower().rstrip(".").split(".")
+        node = self._trie
+        found = None
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(self._LEAF, found)
+        if found is not None:
+            return found
+
+        for i, label in enumerate(labels):
+            source = self._brands.get(label)
+            if source is not None and _is_country_zone(labels[i + 1 :]):
+                return source
+        return None
+
+    def emoji_html(self, value: str | None) -> str:
+        return self._emoji_html.get(value, DEFAULT_EMOJI_HTML)
+
+    def prefix(self, value: str | None) -> str:
+        source = self.by_value.get(value)
+        return source.prefix if source else DEFAULT_PREFIX
+
+
+source_registry = SourceRegistry(SOURCES)
@@ -0,0 +1,129 @@
+import logging
+
+from aiohttp import web
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Границы гистограмм: от единиц миллисекунд (PK-чтения, кеш)
+# до десятков секунд (выгрузки Excel, ночные джобы).
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# --- апдейты и хендлеры ---
+HANDLER_SECONDS = Histogram(
+    "bot_handler_seconds",
+    "Длительность хендлера (без внешних middleware)",
+    ["event_type", "router", "handler", "state"],
+    buckets=LATENCY_BUCKETS,
+)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total",
+    "Исключения в хендлерах",
+    ["event_type", "router", "handler", "error"],
+)
+MIDDLEWARE_SECONDS = Histogram(
+    "bot_middleware_seconds",
+    "Собственное время middleware (без вложенного хендлера)",
+    ["middleware"],
+    buckets=LATENCY_BUCKETS,
+)
+UPDATE_SECONDS = Histogram(
+    "bot_update_seconds",
+    "Полное время обработки апдейта",
+    ["event_type"],
+    buckets=LATENCY_BUCKETS,
+)
+UPDATES_IN_FLIGHT = Gauge(
+    "bot_updates_in_flight",
+    "Апдейты, обрабатываемые в данный момент",
+)
+
+# --- БД ---
+DB_CALL_SECONDS = Histogram(
+    "db_call_seconds",
+    "Длительность вызова репозиторной функции (сессия целиком)",
+    ["function"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL-запросы по репозиторным функциям",
+    ["function"],
+)
+DB_CALL_ERRORS = Counter(
+    "db_call_errors_total",
+    "Исключения в репозиторных функциях",
+    ["function", "error"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Занятые соединения пула",
+    ["pool"],
+)
+
+# --- Telegram Bot API ---
+TELEGRAM_API_SECONDS = Histogram(
+    "telegram_api_seconds",
+    "Длительность вызова Bot API",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+TELEGRAM_API_ERRORS = Counter(
+    "telegram_api_errors_total",
+    "Ошибки вызовов Bot API",
+    ["method", "error"],
+)
+
+# --- планировщик ---
+SCHEDULER_JOB_SECONDS = Histogram(
+    "scheduler_job_seconds",
+    "Длительность джоб планировщика",
+    ["job_id"],
+    buckets=JOB_BUCKETS,
+)
+SCHEDULER_JOB_RUNS = Counter(
+    "scheduler_job_runs_total",
+    "Запуски джоб планировщика по результату",
+    ["job_id", "status"],
+)
+SCHEDULER_BACKGROUND_TASKS = Gauge(
+    "scheduler_background_tasks",
+    "Фоновые задачи планировщика (цикл лидерства, запись запусков в БД)",
+)
+
+
+async def _metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(
+        body=generate_latest(REGISTRY),
+        headers={"Content-Type": CONTENT_TYPE_LATEST},
+    )
+
+
+async def start_metrics_server() -> web.AppRunner:
+    """Поднимает /metrics (text exposition format) на METRICS_PORT."""
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.metrics_host, port=settings.metrics_port)
+    await site.start()
+
+    logger.info(
+        "Metrics server started on %s:%s/metrics",
+        settings.metrics_host,
+        settings.metrics_port,
+    )
+    return runner
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import logging
+from collections.abc import Callable, Coroutine
+from typing import Any, TypeVar
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# uvloop и orjson необязательны: без пакета флаг игнорируется
+# с предупреждением, и бот работает на стандартных asyncio / json.
+
+
+def _loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    if not settings.uvloop:
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("UVLOOP=true, но uvloop не установлен: стандартный цикл asyncio")
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """asyncio.run() с циклом uvloop, если он включён (UVLOOP)."""
+    with asyncio.Runner(loop_factory=_loop_factory()) as runner:
+        return runner.run(main)
+
+
+def json_codecs() -> tuple[Callable[[str], Any], Callable[[Any], str]]:
+    """
+    (loads, dumps) для сессии Bot API: orjson, если включён
+    FAST_JSON и установлен, иначе stdlib json.
+    """
+    if settings.fast_json:
+        try:
+            import orjson
+        except ImportError:
+            logger.warning("FAST_JSON=true, но orjson не установлен: stdlib json")
+        else:
+
+            def dumps(value: Any) -> str:
+                # aiogram ждёт str; ключи-числа допускает и stdlib json
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+            return orjson.loads, dumps
+    return json.loads, json.dumps
@@ -17,8 +17,98 @@ class Settings(BaseSettings):
     db_password: str = Field(alias="DB_PASSWORD")
     db_name: str = Field(alias="DB_NAME")
 
+    db_replica_host: str | None = Field(default=None, alias="DB_REPLICA_HOST")
+    db_replica_port: int | None = Field(default=None, alias="DB_REPLICA_PORT")
+    replica_max_lag_seconds: float = Field(
+        default=5.0, alias="REPLICA_MAX_LAG_SECONDS"
+    )
+    replica_check_interval_seconds: float = Field(
+        default=10.0, alias="REPLICA_CHECK_INTERVAL_SECONDS"
+    )
+    replica_connect_timeout_seconds: float = Field(
+        default=3.0, alias="REPLICA_CONNECT_TIMEOUT_SECONDS"
+    )
+    # запросы к реплике — выгрузки и статистика, поэтому с запасом
+    replica_command_timeout_seconds: float = Field(
+        default=300.0, alias="REPLICA_COMMAND_TIMEOUT_SECONDS"
+    )
+
     max_active_assignments: int = 3
 
+    # каталог дневных партиций отчёта по заданиям (JSON gzip)
+    reports_dir: str = Field(default="data/reports", alias="REPORTS_DIR")
+
+    # ключ pg_advisory_lock для выбора лидера планировщика
+    scheduler_lock_id: int = Field(default=7_340_001, alias="SCHEDULER_LOCK_ID")
+    scheduler_leader_check_seconds: float = Field(
+        default=5.0, alias="SCHEDULER_LEADER_CHECK_SECONDS"
+    )
+
+    # размер пачки ночных чисток (одна транзакция на пачку)
+    cleanup_batch_size: int = Field(default=1000, alias="CLEANUP_BATCH_SIZE")
+
+    # отклонённое задание архивируется через столько секунд,
+    # sweeper проверяет раз в rejected_sweep_interval_seconds
+    rejected_archive_delay_seconds: int = Field(
+        default=60, alias="REJECTED_ARCHIVE_DELAY_SECONDS"
+    )
+    rejected_sweep_interval_seconds: int = Field(
+        default=60, alias="REJECTED_SWEEP_INTERVAL_SECONDS"
+    )
+
+    # /metrics в text exposition format (Prometheus)
+    metrics_host: str = Field(default="0.0.0.0", alias="METRICS_HOST")
+    metrics_port: int = Field(default=8000, alias="METRICS_PORT")
+
+    # бюджет SQL на один апдейт (dev/CI): при превышении — warning
+    # с самыми частыми запросами; если оба не заданы, трассировка выключена
+    query_budget: int | None = Field(default=None, alias="QUERY_BUDGET")
+    query_budget_ms: float | None = Field(default=None, alias="QUERY_BUDGET_MS")
+
+    # индекс свободных заданий в памяти (app/db/free_task_index.py):
+    # проверка соединения LISTEN и полная пересинхронизация снимком
+    free_task_index: bool = Field(default=False, alias="FREE_TASK_INDEX")
+    free_task_index_check_seconds: float = Field(
+        default=5.0, alias="FREE_TASK_INDEX_CHECK_SECONDS"
+    )
+    free_task_index_resync_seconds: float = Field(
+        default=600.0, alias="FREE_TASK_INDEX_RESYNC_SECONDS"
+    )
+
+    # локальные кеши, сбрасываемые шиной инвалидации (app/db/invalidation.py)
+    cache_ttl_seconds: float = Field(default=300.0, alias="CACHE_TTL_SECONDS")
+    cache_max_entries: int = Field(default=100_000, alias="CACHE_MAX_ENTRIES")
+    cache_check_seconds: float = Field(default=5.0, alias="CACHE_CHECK_SECONDS")
+
+    # прогрев при старте (app/repository/warmup.py): сколько соединений
+    # пула открыть заранее, 0 — только справочники
+    db_warmup_connections: int = Field(default=5, alias="DB_WARMUP_CONNECTIONS")
+
+    # среда выполнения (app/core/runtime.py): цикл uvloop и orjson
+    # для JSON Bot API; без установленного пакета флаг игнорируется
+    uvloop: bool = Field(default=False, alias="UVLOOP")
+    fast_json: bool = Field(default=False, alias="FAST_JSON")
+
+    # HTTP-сессия Bot API (app/bot/session.py)
+    telegram_connection_limit: int = Field(default=100, alias="TELEGRAM_CONNECTION_LIMIT")
+    telegram_keepalive_seconds: float = Field(
+        default=30.0, alias="TELEGRAM_KEEPALIVE_SECONDS"
+    )
+    telegram_dns_cache_seconds: int = Field(
+        default=3600, alias="TELEGRAM_DNS_CACHE_SECONDS"
+    )
+    # таймаут по умолчанию, для быстрых методов (ответ на callback,
+    # правка/удаление сообщений) и для отправки файлов
+    telegram_timeout_seconds: float = Field(default=30.0, alias="TELEGRAM_TIMEOUT_SECONDS")
+    telegram_fast_timeout_seconds: float = Field(
+        default=10.0, alias="TELEGRAM_FAST_TIMEOUT_SECONDS"
+    )
+    telegram_upload_timeout_seconds: float = Field(
+        default=180.0, alias="TELEGRAM_UPLOAD_TIMEOUT_SECONDS"
+    )
+    # точечные переопределения: "sendDocument=300,getChatMember=5"
+    telegram_method_timeouts: str = Field(default="", alias="TELEGRAM_METHOD_TIMEOUTS")
+
     @property
     def database_url(self) -> str:
         """Собирает URL подключения к PostgreSQL."""
@@ -27,10 +117,43 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def scheduler_database_url(self) -> str:
+        """
+        URL для job store APScheduler: SQLAlchemyJobStore синхронный,
+        поэтому используется sync-драйвер psycopg.
+        """
+        return (
+            f"postgresql+psycopg://{self.db_user}:{self.db_password}"
+            f"@{self.db_host}:{self.db_port}/{self.db_name}"
+        )
+
+    @property
+    def replica_database_url(self) -> str | None:
+        """Собирает URL подключения к реплике (None, если реплика не задана)."""
+        if not self.db_replica_host:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.db_user}:{self.db_password}"
+            f"@{self.db_replica_host}:{self.db_replica_port or self.db_port}"
+            f"/{self.db_name}"
+        )
+
     @property
     def admin_id_list(self) -> list[int]:
         """Возвращает список id администраторов из строки ADMIN_IDS."""
         return [int(x.strip()) for x in self.admin_ids.split(",") if x.strip()]
 
+    @property
+    def telegram_method_timeout_map(self) -> dict[str, float]:
+        """Разбирает TELEGRAM_METHOD_TIMEOUTS в {метод Bot API: секунды}."""
+        result = {}
+        for item in self.telegram_method_timeouts.split(","):
+            if not item.strip():
+                continue
+            method, _, seconds = item.partition("=")
+            result[method.strip()] = float(seconds)
+        return result
+
 
 settings = Settings()
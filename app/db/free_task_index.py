@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Канал NOTIFY, в который пишут триггеры tasks / task_assignments
+# (миграция c9e4a7b2d5f8). Payload — JSON {"op": "free"|"busy"|"drop", ...}
+# или строка "reload" (массовая загрузка, см. tools.seed_dataset).
+CHANNEL = "free_tasks"
+
+# Отдельный движок без пула: LISTEN живёт на своём соединении
+# и не должен попадать в общий пул.
+_listen_engine = create_async_engine(
+    settings.database_url,
+    poolclass=NullPool,
+    isolation_level="AUTOCOMMIT",
+)
+
+SNAPSHOT_SQL = text(
+    """
+    SELECT t.id, t.source, t.city_id, t.required_gender
+    FROM tasks t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM task_assignments ta
+        WHERE ta.task_id = t.id AND ta.is_archived = false
+    )
+    """
+)
+
+BucketKey = tuple[str | None, uuid.UUID | None, str | None]
+
+
+class Bucket:
+    """
+    Массив id заданий с индексом позиций: добавление, удаление
+    (swap-remove — на место удалённого ставится последний элемент)
+    и случайный выбор за O(1).
+    """
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self):
+        self.items: list[uuid.UUID] = []
+        self.positions: dict[uuid.UUID, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, task_id: uuid.UUID) -> None:
+        if task_id in self.positions:
+            return
+        self.positions[task_id] = len(self.items)
+        self.items.append(task_id)
+
+    def remove(self, task_id: uuid.UUID) -> None:
+        pos = self.positions.pop(task_id, None)
+        if pos is None:
+            return
+        last = self.items.pop()
+        if last != task_id:
+            self.items[pos] = last
+            self.positions[last] = pos
+
+
+class FreeTaskIndex:
+    """
+    Индекс свободных заданий в памяти процесса.
+
+    Задания разложены по корзинам (source, city_id, required_gender).
+    Индекс заполняется снимком при старте и поддерживается
+    в актуальном состоянии через LISTEN/NOTIFY: триггеры БД сообщают
+    о выдаче, архивации и удалении назначений, импорте и удалении
+    заданий. События идемпотентны (задают состояние, а не меняют его),
+    поэтому буфер событий, пришедших во время загрузки снимка,
+    просто проигрывается поверх него.
+
+    Индекс — только подсказка кандидатов: окончательное решение
+    принимает условная вставка в task_assignments под уникальным
+    индексом ux_task_assignments_task_active (см. assign_random_task).
+    """
+
+    def __init__(self):
+        self._buckets: dict[tuple, dict[str | None, Bucket]] = defaultdict(dict)
+        self._where: dict[uuid.UUID, BucketKey] = {}
+        self._rng = random.Random()
+        self._conn: AsyncConnection | None = None
+        self._buffer: list[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._reloads: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    # --- изменение ---
+
+    def add(
+        self,
+        task_id: uuid.UUID,
+        source: str | None,
+        city_id: uuid.UUID | None,
+        required_gender: str | None,
+    ) -> None:
+        key = (source, city_id, required_gender)
+        if self._where.get(task_id) == key:
+            return
+        self.discard(task_id)
+        by_gender = self._buckets[(source, city_id)]
+        by_gender.setdefault(required_gender, Bucket()).add(task_id)
+        self._where[task_id] = key
+
+    def discard(self, task_id: uuid.UUID) -> None:
+        key = self._where.pop(task_id, None)
+        if key is None:
+            return
+        source, city_id, required_gender = key
+        by_gender = self._buckets[(source, city_id)]
+        bucket = by_gender[required_gender]
+        bucket.remove(task_id)
+        if not bucket:
+            del by_gender[required_gender]
+            if not by_gender:
+                del self._buckets[(source, city_id)]
+
+    # --- выбор ---
+
+    def _candidate_buckets(
+        self,
+        source: str | None,
+        city_id: uuid.UUID | None,
+        required_gender: str | None,
+    ) -> list[Bucket]:
+        # город задания — любой (None) или город пользователя;
+        # пол задания — любой (None) или выбранный пользователем
+        cities = {None, city_id}
+        buckets = []
+        for city in cities:
+            by_gender = self._buckets.get((source, city))
+            if not by_gender:
+                continue
+            if required_gender is None:
+                buckets.extend(by_gender.values())
+            else:
+                for gender in (None, required_gender):
+                    if gender in by_gender:
+                        buckets.append(by_gender[gender])
+        return buckets
+
+    def has_any(self, source: str | None, city_id: uuid.UUID | None) -> bool:
+        return bool(self._candidate_buckets(source, city_id, None))
+
+    def pick(
+        self,
+        source: str | None,
+        city_id: uuid.UUID | None,
+        required_gender: str | None,
+        exclude: set[uuid.UUID] = frozenset(),
+        attempts: int = 8,
+    ) -> uuid.UUID | None:
+        """
+        Случайное свободное задание, равномерно по всем подходящим
+        корзинам. exclude — уже отвергнутые кандидаты текущей выдачи.
+        """
+        buckets = self._candidate_buckets(source, city_id, required_gender)
+        total = sum(len(b) for b in buckets)
+        if not total:
+            return None
+
+        for _ in range(attempts):
+            n = self._rng.randrange(total)
+            for bucket in buckets:
+                if n < len(bucket):
+                    task_id = bucket.items[n]
+                    break
+                n -= len(bucket)
+            if task_id not in exclude:
+                return task_id
+        return None
+
+    # --- синхронизация ---
+
+    def _apply(self, payload: str) -> None:
+        if payload == "reload":
+            self._schedule_reload()
+            return
+
+        event = json.loads(payload)
+        task_id = uuid.UUID(event["id"])
+        if event["op"] == "free":
+            city_id = event.get("city_id")
+            self.add(
+                task_id,
+                event.get("source"),
+                uuid.UUID(city_id) if city_id else None,
+                event.get("gender"),
+            )
+        else:  # busy / drop
+            self.discard(task_id)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        if self._buffer is not None:
+            self._buffer.append(payload)
+            return
+        try:
+            self._apply(payload)
+        except Exception:
+            logger.exception("Некорректное событие %s: %r", CHANNEL, payload)
+
+    async def load(self) -> None:
+        """Перечитывает индекс снимком из БД (LISTEN уже должен быть активен)."""
+        async with self._lock:
+            started = time.perf_counter()
+            self._buffer = []
+            try:
+                async with _listen_engine.connect() as conn:
+                    rows = (await conn.execute(SNAPSHOT_SQL)).all()
+
+                self._buckets.clear()
+                self._where.clear()
+                for row in rows:
+                    self.add(row.id, row.source, row.city_id, row.required_gender)
+            finally:
+                buffered, self._buffer = self._buffer, None
+
+        # reload во время загрузки: снимок мог не увидеть массовую вставку
+        for payload in buffered:
+            self._on_notify(None, None, CHANNEL, payload)
+
+        self.ready = True
+        logger.info(
+            "Free task index loaded: tasks=%s buckets=%s in %.2fs (+%s events)",
+            len(self._where),
+            sum(len(b) for b in self._buckets.values()),
+            time.perf_counter() - started,
+            len(buffered),
+        )
+
+    def _schedule_reload(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.load())
+        self._reloads.add(task)
+        task.add_done_callback(self._on_reload_done)
+
+    def _on_reload_done(self, task: asyncio.Task) -> None:
+        self._reloads.discard(task)
+        if not task.cancelled() and task.exception():
+            # индекс остаётся прежним до следующей пересинхронизации _watch
+            logger.error("Free task index: перезагрузка не удалась: %r", task.exception())
+
+    async def _listen(self) -> None:
+        conn = await _listen_engine.connect()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.add_listener(CHANNEL, self._on_notify)
+        self._conn = conn
+
+    async def start(self) -> None:
+        """LISTEN + снимок; дальше _watch следит за соединением и пересинхронизирует."""
+        await self._listen()
+        await self.load()
+        self._task = asyncio.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        last_sync = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.free_task_index_check_seconds)
+            try:
+                if self._conn is None:
+                    await self._listen()
+                    await self.load()
+                    last_sync = time.monotonic()
+                    continue
+
+                await self._conn.execute(text("SELECT 1"))
+                if time.monotonic() - last_sync >= settings.free_task_index_resync_seconds:
+                    await self.load()
+                    last_sync = time.monotonic()
+            except Exception:
+                # события за время обрыва потеряны: пока LISTEN не
+                # восстановлен, выдача идёт обычным SQL-запросом
+                logger.exception("Free task index: соединение LISTEN потеряно")
+                self.ready = False
+                await self._close()
+
+    async def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            logger.exception("Ошибка закрытия соединения LISTEN")
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._reloads:
+            task.cancel()
+        await self._close()
+
+
+free_task_index = FreeTaskIndex()
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable, Hashable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Отдельный движок без пула, как у free_task_index и leader:
+# LISTEN живёт на своём соединении.
+_listen_engine = create_async_engine(
+    settings.database_url,
+    poolclass=NullPool,
+    isolation_level="AUTOCOMMIT",
+)
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+class CacheKind:
+    """Типы событий инвалидации (ключ события — в скобках)."""
+
+    USER = "user"  # tg_id: статус, блокировка, профиль, счётчики
+    CITIES = "cities"  # без ключа: справочник городов (триггер на cities)
+
+
+class InvalidationBus:
+    """
+    Шина инвалидации локальных кешей между процессами бота.
+
+    Репозиторные функции вызывают publish() внутри своей транзакции:
+    pg_notify доставляется подписчикам только после commit, а при
+    rollback не доставляется вовсе. Каждый процесс (включая
+    отправителя) слушает канал и вызывает подписчиков вида.
+
+    Пока соединение LISTEN не установлено, running=False и кеши
+    не используются; после переподключения кеши очищаются целиком,
+    так как события за время обрыва потеряны.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable[[str | None], None]]] = defaultdict(list)
+        self._conn: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._conn is not None
+
+    def subscribe(self, kind: str, callback: Callable[[str | None], None]) -> None:
+        """callback(key) — key=None означает «сбросить всё»."""
+        self._subscribers[kind].append(callback)
+
+    async def publish(
+        self,
+        kind: str,
+        key: Hashable | None = None,
+        *,
+        session: AsyncSession,
+    ) -> None:
+        """
+        Ставит событие в транзакцию session. Локальные кеши сбрасываются
+        сразу, остальные процессы — после commit.
+        """
+        key = None if key is None else str(key)
+        self._dispatch(kind, key)
+        await session.execute(
+            NOTIFY_SQL,
+            {"channel": CHANNEL, "payload": json.dumps({"kind": kind, "key": key})},
+        )
+
+    def _dispatch(self, kind: str, key: str | None) -> None:
+        for callback in self._subscribers.get(kind, ()):
+            callback(key)
+
+    def _clear_all(self) -> None:
+        for kind in self._subscribers:
+            self._dispatch(kind, None)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+            self._dispatch(event["kind"], event.get("key"))
+        except Exception:
+            logger.exception("Некорректное событие %s: %r", CHANNEL, payload)
+
+    async def _listen(self) -> None:
+        conn = await _listen_engine.connect()
+        try:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.add_listener(CHANNEL, self._on_notify)
+        except Exception:
+            await conn.close()
+            raise
+        self._clear_all()
+        self._conn = conn
+
+    async def start(self) -> None:
+        await self._listen()
+        self._task = asyncio.create_task(self._watch())
+        logger.info("Invalidation bus started (channel=%s)", CHANNEL)
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(settings.cache_check_seconds)
+            try:
+                if self._conn is None:
+                    await self._listen()
+                    logger.info("Invalidation bus reconnected")
+                else:
+                    await self._conn.execute(text("SELECT 1"))
+            except Exception:
+                logger.exception("Invalidation bus: соединение LISTEN потеряно")
+                await self._close()
+
+    async def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        self._clear_all()
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            logger.exception("Ошибка закрытия соединения LISTEN")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._close()
+
+
+invalidation_bus = InvalidationBus()
+
+
+class LocalCache:
+    """
+    Кеш в памяти процесса, сбрасываемый событиями шины.
+
+    TTL — страховка от потерянных событий. Без активной шины
+    (инструменты, тесты) кеш прозрачен: всегда читает из loader.
+    """
+
+    def __init__(self, *kinds: str, bus: InvalidationBus = invalidation_bus):
+        self.bus = bus
+        self._data: dict[str | None, tuple[float, object]] = {}
+        # растёт при каждой инвалидации: значение, загруженное
+        # до события, не попадает в кеш после него
+        self._generation = 0
+        for kind in kinds:
+            bus.subscribe(kind, self.evict)
+
+    async def get_or_load(self, key: Hashable | None, loader: Callable):
+        """Значение из кеша или результат await loader()."""
+        key = None if key is None else str(key)
+        if self.bus.running:
+            item = self._data.get(key)
+            if item is not None and item[0] >= time.monotonic():
+                return item[1]
+
+        generation = self._generation
+        value = await loader()
+        if self.bus.running and generation == self._generation:
+            if len(self._data) >= settings.cache_max_entries:
+                self._data.clear()
+            self._data[key] = (time.monotonic() + settings.cache_ttl_seconds, value)
+        return value
+
+    def evict(self, key: str | None) -> None:
+        self._generation += 1
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
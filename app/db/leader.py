@@ -0,0 +1,79 @@
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Отдельный движок без пула: закрытие соединения гарантированно
+# снимает сессионную advisory-блокировку (в пуле она бы «переехала»
+# к следующему пользователю соединения).
+_lock_engine = create_async_engine(
+    settings.database_url,
+    poolclass=NullPool,
+    isolation_level="AUTOCOMMIT",
+)
+
+
+class AdvisoryLockLeader:
+    """
+    Выбор лидера через pg_try_advisory_lock.
+
+    Лидер — процесс, удерживающий сессионную блокировку key на своём
+    соединении. Блокировка снимается при закрытии соединения
+    или падении процесса, после чего её может взять другой экземпляр.
+    """
+
+    def __init__(self, key: int):
+        self.key = key
+        self._conn: AsyncConnection | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    async def try_acquire(self) -> bool:
+        """Пытается стать лидером (без ожидания)."""
+        if self._conn is not None:
+            return True
+
+        conn = await _lock_engine.connect()
+        try:
+            acquired = await conn.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            )
+        except Exception:
+            await conn.close()
+            raise
+
+        if not acquired:
+            await conn.close()
+            return False
+
+        self._conn = conn
+        return True
+
+    async def check(self) -> bool:
+        """Проверяет, что соединение с блокировкой живо."""
+        if self._conn is None:
+            return False
+        try:
+            await self._conn.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            logger.warning("Соединение лидера потеряно (lock=%s)", self.key)
+            await self.release()
+            return False
+
+    async def release(self) -> None:
+        """Отдаёт лидерство (закрытие соединения снимает блокировку)."""
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            await conn.close()
+        except Exception:
+            logger.exception("Ошибка закрытия соединения лидера")
@@ -0,0 +1,106 @@
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import DateTime, Select, literal_column, tuple_
+
+# first — первая страница, last — последняя,
+# next/prev — соседние страницы относительно курсора,
+# stay — перерисовка текущей страницы (курсор включительно).
+PageDirection = Literal["first", "next", "prev", "last", "stay"]
+
+# Подстановки для NULL в ключах сортировки: сравнение кортежей с NULL
+# не работает, поэтому nullable-колонки оборачиваются в coalesce.
+# -infinity при DESC даёт NULLS LAST, infinity при ASC — тоже NULLS LAST.
+NEG_INF = literal_column("'-infinity'::timestamptz", DateTime(timezone=True))
+POS_INF = literal_column("'infinity'::timestamptz", DateTime(timezone=True))
+
+
+def encode_cursor(values: Sequence[Any]) -> list[str | None]:
+    """
+    Превращает значения ключа сортировки в JSON-совместимый список
+    (для хранения в dialog_data).
+    """
+    result: list[str | None] = []
+    for value in values:
+        if value is None:
+            result.append(None)
+        elif isinstance(value, datetime):
+            result.append(value.isoformat())
+        else:
+            result.append(str(value))
+    return result
+
+
+def decode_cursor(raw: Sequence[str | None] | None) -> tuple | None:
+    """
+    Обратное преобразование: все значения, кроме последнего, — datetime,
+    последнее — UUID записи (tie-breaker).
+    """
+    if not raw:
+        return None
+    *dates, last = raw
+    return (
+        *(datetime.fromisoformat(v) if v is not None else None for v in dates),
+        uuid.UUID(last),
+    )
+
+
+async def fetch_keyset_page(
+    session,
+    stmt: Select,
+    *,
+    keys: Sequence,
+    cursor: Sequence | None,
+    direction: PageDirection,
+    limit: int,
+    descending: bool = False,
+    scalars: bool = True,
+) -> list:
+    """
+    Keyset-пагинация по составному ключу keys.
+
+    Вместо OFFSET используется сравнение кортежей (keys) > (cursor),
+    поэтому стоимость страницы не зависит от её номера и при наличии
+    подходящего индекса составляет O(limit).
+
+    Args:
+        session: Сессия БД.
+        stmt (Select): Запрос с фильтрами, без ORDER BY/LIMIT.
+        keys: Выражения ключа сортировки (последнее — уникальный id).
+        cursor: Значения ключа (SQL-выражения или литералы) граничной записи.
+        direction (PageDirection): Направление перехода.
+        limit (int): Размер страницы.
+        descending (bool): Порядок отображения по убыванию.
+        scalars (bool): Вернуть ORM-объекты (иначе строки Row).
+
+    Returns:
+        list: Записи страницы в порядке отображения.
+    """
+    backward = direction in ("prev", "last")
+    reverse_order = descending != backward
+
+    if cursor is not None and direction in ("next", "prev", "stay"):
+        key_tuple = tuple_(*keys)
+        cursor_tuple = tuple_(*cursor)
+
+        if direction == "stay":
+            cond = key_tuple <= cursor_tuple if descending else key_tuple >= cursor_tuple
+        elif reverse_order:
+            cond = key_tuple < cursor_tuple
+        else:
+            cond = key_tuple > cursor_tuple
+
+        stmt = stmt.where(cond)
+
+    order = [k.desc() if reverse_order else k.asc() for k in keys]
+    stmt = stmt.order_by(*order).limit(limit)
+
+    result = await session.execute(stmt)
+    items = list(result.scalars().all() if scalars else result.all())
+
+    if backward:
+        items.reverse()
+
+    return items
@@ -0,0 +1,133 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from collections.abc import Iterator
+
+from sqlalchemy import event
+
+from app.db.session import engine, replica_engine
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar["QueryTrace | None"] = ContextVar(
+    "query_trace", default=None
+)
+
+_STARTED_KEY = "query_trace_started"
+_WS_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Поток выполнил больше SQL-запросов, чем разрешено бюджетом."""
+
+
+@dataclass
+class QueryTrace:
+    """SQL-запросы, выполненные в рамках одного апдейта (или блока кода)."""
+
+    label: str
+    statements: list[tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(duration for _, duration in self.statements) * 1000
+
+    def top_repeated(self, limit: int = 3) -> list[tuple[str, int]]:
+        """Самые частые запросы — первые кандидаты на N+1."""
+        counter = Counter(
+            _WS_RE.sub(" ", statement).strip()[:160]
+            for statement, _ in self.statements
+        )
+        return [(sql, n) for sql, n in counter.most_common(limit) if n > 1]
+
+    def summary(self) -> str:
+        lines = [f"{self.label}: {self.count} queries, {self.total_ms:.1f}ms"]
+        for sql, n in self.top_repeated():
+            lines.append(f"  x{n} {sql}")
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    started = conn.info.get(_STARTED_KEY)
+    if trace is None or not started:
+        return
+    trace.statements.append((statement, time.perf_counter() - started.pop()))
+
+
+def install_query_tracer() -> None:
+    """
+    Подключает слушатели before/after_cursor_execute к движкам.
+
+    Включается явно (QUERY_BUDGET / QUERY_BUDGET_MS или инструменты
+    разработки): вне trace_queries слушатели ничего не делают.
+    """
+    for target in (engine, replica_engine):
+        if target is None:
+            continue
+        sync_engine = target.sync_engine
+        if not event.contains(
+            sync_engine, "before_cursor_execute", _before_cursor_execute
+        ):
+            event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def trace_queries(label: str) -> Iterator[QueryTrace]:
+    """Собирает все SQL-запросы, выполненные внутри блока (и его задач)."""
+    trace = QueryTrace(label)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def check_budget(
+    trace: QueryTrace,
+    max_queries: int | None,
+    max_ms: float | None = None,
+) -> bool:
+    """Логирует предупреждение, если трасса вышла за бюджет."""
+    over_count = max_queries is not None and trace.count > max_queries
+    over_time = max_ms is not None and trace.total_ms > max_ms
+    if not (over_count or over_time):
+        return True
+
+    logger.warning(
+        "Query budget exceeded (max %s queries / %s ms)\n%s",
+        max_queries,
+        max_ms,
+        trace.summary(),
+    )
+    return False
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, label: str = "block") -> Iterator[QueryTrace]:
+    """
+    Проверка для тестов (фикстура query_budget) и инструментов:
+    бросает QueryBudgetExceeded, если блок выполнил больше
+    max_queries запросов.
+    """
+    install_query_tracer()
+    with trace_queries(label) as trace:
+        yield trace
+    if trace.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"expected <= {max_queries} queries\n{trace.summary()}"
+        )
@@ -1,17 +1,84 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
 from functools import wraps
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.metrics import (
+    DB_CALL_ERRORS,
+    DB_CALL_SECONDS,
+    DB_POOL_CHECKED_OUT,
+    DB_QUERIES,
+)
 from app.core.settings import settings
 from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+logger = logging.getLogger(__name__)
+
 engine = create_async_engine(settings.database_url, echo=False)
 SessionLocal = async_sessionmaker(
     bind=engine, expire_on_commit=False, class_=AsyncSession
 )
 
+# Реплика для тяжёлых read-only запросов (аналитика, выгрузки).
+# Если DB_REPLICA_HOST не задан — всё идёт в primary.
+replica_engine = (
+    create_async_engine(
+        settings.replica_database_url,
+        echo=False,
+        # недоступная реплика не должна держать вызовы по минуте
+        # (таймаут подключения asyncpg по умолчанию — 60 с)
+        connect_args={
+            "timeout": settings.replica_connect_timeout_seconds,
+            "command_timeout": settings.replica_command_timeout_seconds,
+        },
+    )
+    if settings.replica_database_url
+    else None
+)
+ReplicaSessionLocal = (
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False, class_=AsyncSession)
+    if replica_engine is not None
+    else None
+)
+
+# NULL — инстанс не в recovery, то есть не реплика (например,
+# отдельная пустая БД): такой «реплике» read-only запросы не отдаются
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+# Репозиторная функция, в которой сейчас выполняется запрос
+# (для подсчёта SQL-запросов по функциям).
+_current_function: ContextVar[str] = ContextVar("db_function", default="-")
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.labels(_current_function.get()).inc()
+
+
+for _engine, _pool_name in ((engine, "primary"), (replica_engine, "replica")):
+    if _engine is None:
+        continue
+    event.listen(_engine.sync_engine, "before_cursor_execute", _count_query)
+    DB_POOL_CHECKED_OUT.labels(_pool_name).set_function(_engine.pool.checkedout)
+
+_replica_state = {"checked_at": float("-inf"), "usable": False}
+# одна проверка реплики за раз: остальные вызовы ждут её результат
+_replica_lock = asyncio.Lock()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Провайдер асинхронной сессии БД."""
@@ -19,25 +86,96 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-def connection(isolation_level=None):
+async def _replica_is_usable() -> bool:
+    """
+    Проверяет доступность и отставание реплики.
+    Результат кешируется на replica_check_interval_seconds,
+    чтобы не делать лишний запрос на каждый вызов.
+    """
+    if _replica_fresh():
+        return _replica_state["usable"]
+
+    async with _replica_lock:
+        # пока ждали блокировку, проверку мог сделать другой вызов
+        if _replica_fresh():
+            return _replica_state["usable"]
+
+        try:
+            lag = await asyncio.wait_for(
+                _replica_lag(), settings.replica_connect_timeout_seconds * 2
+            )
+            if lag is None:
+                logger.warning(
+                    "Инстанс DB_REPLICA_HOST не в recovery (не реплика), "
+                    "read-only запросы идут в primary"
+                )
+                usable = False
+            else:
+                usable = lag <= settings.replica_max_lag_seconds
+                if not usable:
+                    logger.warning(
+                        "Replica lag %.1fs > %.1fs, read-only запросы идут в primary",
+                        lag,
+                        settings.replica_max_lag_seconds,
+                    )
+        except Exception:
+            logger.exception("Реплика недоступна, read-only запросы идут в primary")
+            usable = False
+
+        _replica_state["checked_at"] = time.monotonic()
+        _replica_state["usable"] = usable
+        return usable
+
+
+def _replica_fresh() -> bool:
+    age = time.monotonic() - _replica_state["checked_at"]
+    return age < settings.replica_check_interval_seconds
+
+
+async def _replica_lag() -> float | None:
+    async with replica_engine.connect() as conn:
+        lag = await conn.scalar(REPLICA_LAG_SQL)
+    return None if lag is None else float(lag)
+
+
+async def _get_sessionmaker(readonly: bool) -> async_sessionmaker:
+    if readonly and ReplicaSessionLocal is not None and await _replica_is_usable():
+        return ReplicaSessionLocal
+    return SessionLocal
+
+
+def connection(isolation_level=None, readonly: bool = False):
     def decorator(method):
+        # метка метрик: "<модуль>.<функция>", например "task.assign_random_task"
+        name = f"{method.__module__.rsplit('.', 1)[-1]}.{method.__qualname__}"
+
         @wraps(method)
         async def wrapper(*args, **kwargs):
-            async with SessionLocal() as session:
-                try:
-                    # Устанавливаем уровень изоляции, если передан
-                    if isolation_level:
-                        await session.execute(
-                            text(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
-                        )
-
-                    # Выполняем декорированный метод
-                    return await method(*args, session=session, **kwargs)
-                except Exception as e:
-                    await session.rollback()  # Откатываем сессию при ошибке
-                    raise e  # Поднимаем исключение дальше
-                finally:
-                    await session.close()  # Закрываем сессию
+            token = _current_function.set(name)
+            started = time.perf_counter()
+            try:
+                session_factory = await _get_sessionmaker(readonly)
+                async with session_factory() as session:
+                    try:
+                        # Устанавливаем уровень изоляции, если передан
+                        if isolation_level:
+                            await session.execute(
+                                text(
+                                    f"SET TRANSACTION ISOLATION LEVEL {isolation_level}"
+                                )
+                            )
+
+                        # Выполняем декорированный метод
+                        return await method(*args, session=session, **kwargs)
+                    except Exception as e:
+                        await session.rollback()  # Откатываем сессию при ошибке
+                        DB_CALL_ERRORS.labels(name, type(e).__name__).inc()
+                        raise e  # Поднимаем исключение дальше
+                    finally:
+                        await session.close()  # Закрываем сессию
+            finally:
+                DB_CALL_SECONDS.labels(name).observe(time.perf_counter() - started)
+                _current_function.reset(token)
 
         return wrapper
 
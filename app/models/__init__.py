@@ -3,6 +3,8 @@ from app.models.city import City
 from app.models.task import Task
 from app.models.task_assignment import TaskAssignment
 from app.models.task_report import TaskReport
+from app.models.user_stats import UserStats
+from app.models.scheduler_job_run import SchedulerJobRun
 
 __all__ = [
     "User",
@@ -10,4 +12,6 @@ __all__ = [
     "Task",
     "TaskAssignment",
     "TaskReport",
+    "UserStats",
+    "SchedulerJobRun",
 ]
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class SchedulerJobRunStatus:
+    """Результат запуска джобы планировщика."""
+
+    SUCCESS = "SUCCESS"
+    ERROR = "ERROR"
+    MISSED = "MISSED"  # пропущена (misfire_grace_time истёк)
+
+
+class SchedulerJobRun(Base):
+    """Запуск джобы APScheduler (метрики: длительность, ошибки, пропуски)."""
+
+    __tablename__ = "scheduler_job_runs"
+
+    __table_args__ = (
+        Index("ix_scheduler_job_runs_job_finished", "job_id", "finished_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    job_id: Mapped[str] = mapped_column(String(191))
+    status: Mapped[str] = mapped_column(String(16))
+
+    scheduled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # hostname:pid экземпляра-лидера, выполнившего джобу
+    instance: Mapped[str] = mapped_column(String(128))
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -32,6 +32,49 @@ class TaskAssignment(Base):
             unique=True,
             postgresql_where=text("is_archived = false"),
         ),
+        # активное задание / лимит SUBMITTED пользователя
+        Index(
+            "ix_task_assignments_user_archived_status",
+            "user_id",
+            "is_archived",
+            "status",
+        ),
+        # выборки по статусу в порядке выдачи
+        Index(
+            "ix_task_assignments_status_archived_created",
+            "status",
+            "is_archived",
+            "created_at",
+        ),
+        # выгрузки и статистика по дате проверки
+        Index(
+            "ix_task_assignments_status_processed",
+            "status",
+            "processed_at",
+        ),
+        # sweeper архивации отклонённых (run_rejected_archive)
+        Index(
+            "ix_task_assignments_unarchived_status_processed",
+            "status",
+            "processed_at",
+            postgresql_where=text("is_archived = false"),
+        ),
+        # keyset-пагинация списка выданных заданий в админке
+        Index(
+            "ix_task_assignments_assigned_keyset",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'ASSIGNED' AND is_archived = false"),
+        ),
+        # keyset-пагинация истории заданий пользователя в админке
+        Index(
+            "ix_task_assignments_user_history",
+            "user_id",
+            text("coalesce(processed_at, '-infinity'::timestamptz)"),
+            text("coalesce(submitted_at, '-infinity'::timestamptz)"),
+            "created_at",
+            "id",
+        ),
     )
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -41,7 +84,7 @@ class TaskAssignment(Base):
         UUID(as_uuid=True), ForeignKey("users.id"), index=True
     )
     task_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("tasks.id"), index=True
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), index=True
     )
 
     status: Mapped[str] = mapped_column(
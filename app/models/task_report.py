@@ -18,7 +18,7 @@ class TaskReport(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     assignment_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("task_assignments.id"), unique=True
+        UUID(as_uuid=True), ForeignKey("task_assignments.id", ondelete="CASCADE"), unique=True
     )
 
     account_name: Mapped[str] = mapped_column(String(128))
@@ -0,0 +1,52 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class UserStats(Base):
+    """
+    Денормализованные счётчики пользователя (одна строка на пользователя).
+
+    Обновляются в той же транзакции, что и исходное изменение
+    (create_user, submit_report, review_assignment), и периодически
+    сверяются с task_assignments/users джобой reconcile_user_stats.
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # все APPROVED назначения пользователя
+    approved_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    # неархивные SUBMITTED (лимит заданий на проверке)
+    submitted_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    referrals_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    # APPROVED за календарную неделю (МСК), начинающуюся с week_start;
+    # если week_start устарел — за текущую неделю одобрений ещё нет
+    week_start: Mapped[date | None] = mapped_column(Date, nullable=True)
+    week_approved_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
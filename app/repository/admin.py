@@ -1,44 +1,42 @@
 import io
 import logging
 import uuid
+from itertools import groupby
 from datetime import datetime, timedelta, timezone
 
 from dataclasses import dataclass
 from typing import Literal
 
-from openpyxl.styles import Alignment, Font
-from sqlalchemy import func
+from sqlalchemy import func, literal, DateTime
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from openpyxl import Workbook
-
-from app.bot.utils.excel import (
-    format_worksheet,
-    apply_table_style,
-    merge_user_block,
-    ColSpec,
-    HEADER_FILL,
-    apply_user_block_border,
-    REJECTED_FILL,
-    APPROVED_FILL,
-)
+
+from app.db.invalidation import CacheKind, invalidation_bus
+from app.db.pagination import NEG_INF, PageDirection, fetch_keyset_page
 from app.db.session import connection
 from app.models import TaskAssignment, TaskReport, Task
 from app.models.task_assignment import TaskAssignmentStatus
 from app.models.user import User, UserApprovalStatus
+from app.models.user_stats import UserStats
 
 logger = logging.getLogger(__name__)
 
+# openpyxl (и app.bot.utils.excel) импортируются внутри функций выгрузки:
+# модуль загружается при старте бота, а Excel нужен только по запросу.
 
 MSC_TZ = timezone(timedelta(hours=3))
 
 PeriodKey = Literal["day", "week", "all"]
 
 
-@connection()
+@connection(readonly=True)
 async def export_users_to_excel(*, session):
+    from openpyxl import Workbook
+    from app.bot.utils.excel import format_worksheet
+
     stmt = (
         select(User)
         .options(
@@ -118,37 +116,44 @@ def assignment_status_ru(status) -> str:
     }.get(status, str(status))
 
 
-@connection()
-async def export_users_tasks_to_excel(
-    *,
+def _iso(dt: datetime | None) -> str | None:
+    if not dt:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+async def _collect_users_tasks_rows(
     session,
     date_from: datetime | None = None,
     date_to: datetime | None = None,
-) -> io.BytesIO:
+) -> list[dict]:
     """
-    Экспорт пользователей и их заданий.
-
-    Особенности:
-    - Верхняя строка с группировкой колонок
-    - Переименованные колонки
-    - Администратор выводится как ФИО @username (tg_id)
-    - Аккаунт отчёта перенесён перед ссылкой
-    - Включён autofilter
+    Строки отчёта по заданиям: одна строка на назначение,
+    только JSON-совместимые значения (даты — ISO UTC),
+    поэтому их можно сохранить как промежуточный артефакт
+    и позже склеить несколько периодов в один отчёт.
     """
+    stmt = select(TaskAssignment).options(
+        selectinload(TaskAssignment.user).selectinload(User.referrer),
+        selectinload(TaskAssignment.user).selectinload(User.city),
+        selectinload(TaskAssignment.task).selectinload(Task.city),
+    )
 
-    stmt = (
-        select(TaskAssignment)
-        .options(
-            selectinload(TaskAssignment.user).selectinload(User.referrer),
-            selectinload(TaskAssignment.user).selectinload(User.city),
-            selectinload(TaskAssignment.task),
-        )
-        .order_by(
-            TaskAssignment.user_id,
-            TaskAssignment.processed_at.desc().nullslast(),
-            TaskAssignment.submitted_at.desc().nullslast(),
+    if date_from or date_to:
+        # фильтр периода на стороне БД (индекс ix_task_assignments_status_processed)
+        stmt = stmt.where(
+            TaskAssignment.status.in_(
+                [TaskAssignmentStatus.APPROVED, TaskAssignmentStatus.REJECTED]
+            ),
+            TaskAssignment.processed_at.is_not(None),
         )
-    )
+        if date_from:
+            stmt = stmt.where(TaskAssignment.processed_at >= date_from)
+        if date_to:
+            stmt = stmt.where(TaskAssignment.processed_at < date_to)
+
     assignments = (await session.execute(stmt)).scalars().all()
 
     assignment_ids = [a.id for a in assignments]
@@ -170,36 +175,90 @@ async def export_users_tasks_to_excel(
         stmt = select(User).where(User.tg_id.in_(admin_ids))
         admins = {u.tg_id: u for u in (await session.execute(stmt)).scalars().all()}
 
-    by_user: dict[uuid.UUID, list[TaskAssignment]] = {}
+    rows = []
 
     for a in assignments:
-        if date_from or date_to:
-            if a.status not in (
-                TaskAssignmentStatus.APPROVED,
-                TaskAssignmentStatus.REJECTED,
-            ):
-                continue
-            if not a.processed_at:
-                continue
-            if date_from and a.processed_at < date_from:
-                continue
-            if date_to and a.processed_at >= date_to:
-                continue
-
-        by_user.setdefault(a.user_id, []).append(a)
-
-    user_ids = set(by_user.keys())
-
-    users_stmt = (
-        select(User)
-        .options(selectinload(User.city), selectinload(User.referrer))
-        .order_by(User.id)
-    )
+        u = a.user
+        task = a.task
 
-    if date_from or date_to:
-        users_stmt = users_stmt.where(User.id.in_(user_ids))
+        referrer = (
+            f"{u.referrer.full_name or '—'} "
+            f"@{u.referrer.username or '—'} "
+            f"({u.referrer.tg_id})"
+            if u.referrer
+            else "—"
+        )
+
+        req_gender = (
+            "Мужской"
+            if task.required_gender == "M"
+            else "Женский"
+            if task.required_gender == "F"
+            else "—"
+        )
 
-    users = (await session.execute(users_stmt)).scalars().all()
+        report = reports_map.get(a.id)
+
+        admin = admins.get(a.processed_by_admin_id)
+        admin_str = (
+            f"{admin.full_name or '—'} @{admin.username or '—'} ({admin.tg_id})"
+            if admin
+            else "—"
+        )
+
+        rows.append(
+            {
+                "user_id": str(u.id),
+                "tg_id": u.tg_id,
+                "username": f"@{u.username}" if u.username else "—",
+                "full_name": u.full_name or "—",
+                "phone": u.phone or "—",
+                "gender": gender_ru(u.gender),
+                "city": u.city.name if u.city else "—",
+                "referrer": referrer,
+                "status": a.status,
+                "report_account": report.account_name if report else "—",
+                "task_req_gender": req_gender,
+                "task_req_city": task.city.name if task.city else "Любой",
+                "task_link": task.link if task else "—",
+                "task_example": task.example_text if task else "—",
+                "submitted_at": _iso(a.submitted_at),
+                "processed_at": _iso(a.processed_at),
+                "processed_by": admin_str,
+            }
+        )
+
+    return rows
+
+
+def build_users_tasks_workbook(rows: list[dict]) -> io.BytesIO:
+    """
+    Собирает Excel-отчёт по заданиям из строк _collect_users_tasks_rows.
+
+    Особенности:
+    - Верхняя строка с группировкой колонок
+    - Переименованные колонки
+    - Администратор выводится как ФИО @username (tg_id)
+    - Аккаунт отчёта перенесён перед ссылкой
+    - Включён autofilter
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Font
+    from app.bot.utils.excel import (
+        apply_table_style,
+        merge_user_block,
+        ColSpec,
+        HEADER_FILL,
+        apply_user_block_border,
+        REJECTED_FILL,
+        APPROVED_FILL,
+    )
+
+    # порядок: пользователи по id, внутри — свежие проверенные сверху
+    # (сортировки стабильны, поэтому от младшего ключа к старшему)
+    rows = sorted(rows, key=lambda r: r["submitted_at"] or "", reverse=True)
+    rows.sort(key=lambda r: r["processed_at"] or "", reverse=True)
+    rows.sort(key=lambda r: r["user_id"])
 
     wb = Workbook()
     ws = wb.active
@@ -258,68 +317,35 @@ async def export_users_tasks_to_excel(
             )
     current_row = 3
 
-    for u in users:
-        assignments = by_user.get(u.id, [])
-        if not assignments:
-            continue
-
+    for _, user_rows in groupby(rows, key=lambda r: r["user_id"]):
         block_start = current_row
 
-        referrer = (
-            f"{u.referrer.full_name or '—'} "
-            f"@{u.referrer.username or '—'} "
-            f"({u.referrer.tg_id})"
-            if u.referrer
-            else "—"
-        )
-
-        for a in assignments:
-            task = a.task
-
-            req_gender = (
-                "Мужской"
-                if task.required_gender == "M"
-                else "Женский"
-                if task.required_gender == "F"
-                else "—"
-            )
-
-            req_city = task.city.name if task.city else "Любой"
-
-            report = reports_map.get(a.id)
-
-            admin = admins.get(a.processed_by_admin_id)
-            admin_str = (
-                f"{admin.full_name or '—'} @{admin.username or '—'} ({admin.tg_id})"
-                if admin
-                else "—"
-            )
-
+        for r in user_rows:
             ws.append(
                 [
-                    u.tg_id,
-                    f"@{u.username}" if u.username else "—",
-                    u.full_name or "—",
-                    u.phone or "—",
-                    gender_ru(u.gender),
-                    u.city.name if u.city else "—",
-                    referrer,
-                    assignment_status_ru(a.status),
-                    report.account_name if report else "—",
-                    req_gender,
-                    req_city,
-                    task.link if task else "—",
-                    task.example_text if task else "—",
-                    _dt_to_ekb_str(a.submitted_at),
-                    _dt_to_ekb_str(a.processed_at),
-                    admin_str,
+                    r["tg_id"],
+                    r["username"],
+                    r["full_name"],
+                    r["phone"],
+                    r["gender"],
+                    r["city"],
+                    r["referrer"],
+                    assignment_status_ru(r["status"]),
+                    r["report_account"],
+                    r["task_req_gender"],
+                    r["task_req_city"],
+                    r["task_link"],
+                    r["task_example"],
+                    _iso_to_ekb_str(r["submitted_at"]),
+                    _iso_to_ekb_str(r["processed_at"]),
+                    r["processed_by"],
                 ]
             )
 
             status_cell = ws.cell(row=current_row, column=8)
-            if a.status == TaskAssignmentStatus.APPROVED:
+            if r["status"] == TaskAssignmentStatus.APPROVED:
                 status_cell.fill = APPROVED_FILL
-            elif a.status == TaskAssignmentStatus.REJECTED:
+            elif r["status"] == TaskAssignmentStatus.REJECTED:
                 status_cell.fill = REJECTED_FILL
 
             current_row += 1
@@ -346,10 +372,46 @@ async def export_users_tasks_to_excel(
     return buffer
 
 
+def _iso_to_ekb_str(value: str | None) -> str:
+    return _dt_to_ekb_str(datetime.fromisoformat(value) if value else None)
+
+
+@connection()
+async def collect_users_tasks_rows(
+    *,
+    session,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[dict]:
+    """
+    Строки отчёта по заданиям за период (см. _collect_users_tasks_rows).
+
+    Читает с primary, а не с реплики: из этих строк один раз собирается
+    дневная партиция, и отставание реплики навсегда потеряло бы
+    последние проверки дня.
+    """
+    return await _collect_users_tasks_rows(session, date_from, date_to)
+
+
+@connection(readonly=True)
+async def export_users_tasks_to_excel(
+    *,
+    session,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> io.BytesIO:
+    """
+    Экспорт пользователей и их заданий (см. build_users_tasks_workbook).
+    """
+    rows = await _collect_users_tasks_rows(session, date_from, date_to)
+    return build_users_tasks_workbook(rows)
+
+
 @dataclass(frozen=True)
 class UserTaskItem:
     assignment_id: uuid.UUID
     status: str
+    created_at: datetime
     submitted_at: datetime | None
     processed_at: datetime | None
     processed_by_admin_id: int | None
@@ -391,68 +453,109 @@ def _period_to_range(period: PeriodKey) -> tuple[datetime | None, datetime | Non
     return None, None
 
 
-@connection()
-async def get_user_tasks_page(
-    *,
-    session,
-    tg_id: int,
-    period: PeriodKey,
-    page: int,
-    page_size: int = 5,
-) -> tuple[User | None, int, list[UserTaskItem]]:
+def _user_tasks_filters(user_id: uuid.UUID, period: PeriodKey) -> list:
     """
-    Возвращает:
-      - user (или None)
-      - total_count (общее число заданий под фильтр)
-      - items (страница заданий)
-    Период применяется по processed_at (как в твоём экспорте) и только для APPROVED/REJECTED.
-    Для period="all" — показываем все задания (в т.ч. ASSIGNED/SUBMITTED).
+    Период применяется по processed_at (как в экспорте) и только для APPROVED/REJECTED.
+    Для period="all" — все задания (в т.ч. ASSIGNED/SUBMITTED).
     """
-
-    user = await get_user_by_tg_id(tg_id=tg_id)
-    if not user:
-        return None, 0, []
-
     date_from, date_to = _period_to_range(period)
 
-    base_filters = [TaskAssignment.user_id == user.id]
+    filters = [TaskAssignment.user_id == user_id]
 
     if period != "all":
         # как в экспорте: “за период” = обработанные админом
-        base_filters.append(
+        filters.append(
             TaskAssignment.status.in_(
                 [TaskAssignmentStatus.APPROVED, TaskAssignmentStatus.REJECTED]
             )
         )
-        base_filters.append(TaskAssignment.processed_at.is_not(None))
+        filters.append(TaskAssignment.processed_at.is_not(None))
         if date_from:
-            base_filters.append(TaskAssignment.processed_at >= date_from)
+            filters.append(TaskAssignment.processed_at >= date_from)
         if date_to:
-            base_filters.append(TaskAssignment.processed_at < date_to)
+            filters.append(TaskAssignment.processed_at < date_to)
+
+    return filters
+
+
+# Эти же выражения лежат в индексе ix_task_assignments_user_history.
 
-    # total
-    total_stmt = select(func.count(TaskAssignment.id)).where(*base_filters)
-    total_count = (await session.execute(total_stmt)).scalar_one()
+USER_TASKS_KEYS = [
+    func.coalesce(TaskAssignment.processed_at, NEG_INF),
+    func.coalesce(TaskAssignment.submitted_at, NEG_INF),
+    TaskAssignment.created_at,
+    TaskAssignment.id,
+]
+
+
+def _user_tasks_cursor(cursor: tuple | None) -> list | None:
+    if cursor is None:
+        return None
+    processed_at, submitted_at, created_at, assignment_id = cursor
+    return [
+        func.coalesce(literal(processed_at, DateTime(timezone=True)), NEG_INF),
+        func.coalesce(literal(submitted_at, DateTime(timezone=True)), NEG_INF),
+        literal(created_at, DateTime(timezone=True)),
+        literal(assignment_id, UUID(as_uuid=True)),
+    ]
+
+
+@connection()
+async def count_user_tasks(
+    *,
+    session,
+    tg_id: int,
+    period: PeriodKey,
+) -> int:
+    """
+    Общее число заданий пользователя под фильтр периода.
+    Считается при смене пользователя/периода, а не на каждом перелистывании.
+    """
+    user_id = select(User.id).where(User.tg_id == tg_id).scalar_subquery()
+    stmt = select(func.count(TaskAssignment.id)).where(
+        *_user_tasks_filters(user_id, period)
+    )
+    return (await session.execute(stmt)).scalar_one()
+
+
+@connection()
+async def get_user_tasks_page(
+    *,
+    session,
+    tg_id: int,
+    period: PeriodKey,
+    direction: PageDirection,
+    cursor: tuple | None = None,
+    page_size: int = 5,
+) -> tuple[User | None, list[UserTaskItem]]:
+    """
+    Возвращает:
+      - user (или None)
+      - items (страница заданий, keyset по
+        (processed_at, submitted_at, created_at, id) в порядке убывания)
+    """
 
-    # page query
-    offset = max(page, 0) * page_size
+    user = await get_user_by_tg_id(tg_id=tg_id)
+    if not user:
+        return None, []
 
     stmt = (
         select(TaskAssignment)
         .options(
             selectinload(TaskAssignment.task),
         )
-        .where(*base_filters)
-        .order_by(
-            TaskAssignment.processed_at.desc().nullslast(),
-            TaskAssignment.submitted_at.desc().nullslast(),
-            TaskAssignment.created_at.desc().nullslast(),
-        )
-        .offset(offset)
-        .limit(page_size)
+        .where(*_user_tasks_filters(user.id, period))
     )
 
-    assignments = (await session.execute(stmt)).scalars().all()
+    assignments = await fetch_keyset_page(
+        session,
+        stmt,
+        keys=USER_TASKS_KEYS,
+        cursor=_user_tasks_cursor(cursor),
+        direction=direction,
+        limit=page_size,
+        descending=True,
+    )
 
     items: list[UserTaskItem] = []
     for a in assignments:
@@ -461,6 +564,7 @@ async def get_user_tasks_page(
             UserTaskItem(
                 assignment_id=a.id,
                 status=a.status,
+                created_at=a.created_at,
                 submitted_at=a.submitted_at,
                 processed_at=a.processed_at,
                 processed_by_admin_id=a.processed_by_admin_id,
@@ -470,10 +574,10 @@ async def get_user_tasks_page(
             )
         )
 
-    return user, int(total_count), items
+    return user, items
 
 
-@connection()
+@connection(readonly=True)
 async def export_single_user_tasks_to_excel(
     *,
     session,
@@ -483,6 +587,9 @@ async def export_single_user_tasks_to_excel(
     """
     Excel экспорт заданий ОДНОГО пользователя по выбранному периоду.
     """
+    from openpyxl import Workbook
+    from app.bot.utils.excel import apply_table_style, ColSpec
+
     user = await get_user_by_tg_id(tg_id=tg_id)
     if not user:
         # пустой файл
@@ -495,26 +602,10 @@ async def export_single_user_tasks_to_excel(
         buf.seek(0)
         return buf
 
-    date_from, date_to = _period_to_range(period)
-
-    base_filters = [TaskAssignment.user_id == user.id]
-
-    if period != "all":
-        base_filters.append(
-            TaskAssignment.status.in_(
-                [TaskAssignmentStatus.APPROVED, TaskAssignmentStatus.REJECTED]
-            )
-        )
-        base_filters.append(TaskAssignment.processed_at.is_not(None))
-        if date_from:
-            base_filters.append(TaskAssignment.processed_at >= date_from)
-        if date_to:
-            base_filters.append(TaskAssignment.processed_at < date_to)
-
     stmt = (
         select(TaskAssignment)
         .options(selectinload(TaskAssignment.task))
-        .where(*base_filters)
+        .where(*_user_tasks_filters(user.id, period))
         .order_by(
             TaskAssignment.processed_at.desc().nullslast(),
             TaskAssignment.submitted_at.desc().nullslast(),
@@ -586,11 +677,12 @@ async def set_user_blocked(
 
     user.is_blocked = blocked
     user.blocked_at = datetime.now(timezone.utc) if blocked else None
+    await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
 
     await session.commit()
 
 
-@connection()
+@connection(readonly=True)
 async def get_daily_completed_stats(*, session):
     """
     Возвращает количество APPROVED заданий по дням за последние 7 дней.
@@ -626,31 +718,43 @@ async def get_daily_completed_stats(*, session):
     return result
 
 
-@connection()
+def _weekly_approved_filters(user_id) -> list:
+    """APPROVED за последние 7 дней (скользящее окно)."""
+    return [
+        TaskAssignment.user_id == user_id,
+        TaskAssignment.status == TaskAssignmentStatus.APPROVED,
+        TaskAssignment.processed_at >= datetime.now(MSC_TZ) - timedelta(days=7),
+    ]
+
+
+@connection(readonly=True)
 async def get_top_5_users(*, session):
     """
-    Возвращает топ-5 пользователей по количеству APPROVED заданий.
+    Возвращает топ-5 пользователей по количеству APPROVED заданий
+    (счётчик user_stats) вместе с APPROVED за последние 7 дней —
+    одним запросом.
     """
+    weekly = (
+        select(func.count(TaskAssignment.id))
+        .where(*_weekly_approved_filters(User.id))
+        .correlate(User)
+        .scalar_subquery()
+    )
     stmt = (
         select(
             User.id,
             User.full_name,
             User.tg_id,
             User.username,
-            func.count(TaskAssignment.id).label("approved_count"),
+            UserStats.approved_count,
+            weekly,
         )
-        .join(TaskAssignment, TaskAssignment.user_id == User.id)
+        .join(UserStats, UserStats.user_id == User.id)
         .where(
-            TaskAssignment.status == TaskAssignmentStatus.APPROVED,
+            UserStats.approved_count > 0,
             User.is_blocked.is_(False),
         )
-        .group_by(
-            User.id,
-            User.full_name,
-            User.tg_id,
-            User.username,
-        )
-        .order_by(func.count(TaskAssignment.id).desc())
+        .order_by(UserStats.approved_count.desc())
         .limit(5)
     )
 
@@ -663,6 +767,7 @@ async def get_top_5_users(*, session):
             "tg_id": row[2],
             "username": row[3],
             "count": row[4],
+            "weekly": row[5],
         }
         for row in rows
     ]
@@ -674,11 +779,14 @@ def _dt_to_msk_str(dt):
     return dt.astimezone(MSC_TZ).strftime("%Y-%m-%d %H:%M")
 
 
-@connection()
+@connection(readonly=True)
 async def export_available_tasks_to_excel(*, session) -> io.BytesIO:
     """
     Excel-экспорт доступных заданий
     """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+    from app.bot.utils.excel import apply_table_style, ColSpec
 
     taken_subquery = select(TaskAssignment.task_id).where(
         TaskAssignment.is_archived.is_(False)
@@ -734,7 +842,7 @@ async def export_available_tasks_to_excel(*, session) -> io.BytesIO:
     return buffer
 
 
-@connection()
+@connection(readonly=True)
 async def get_users_statistics(*, session: AsyncSession) -> dict:
     now = datetime.now(MSC_TZ)
 
@@ -777,14 +885,15 @@ async def get_users_statistics(*, session: AsyncSession) -> dict:
     }
 
 
-@connection()
+@connection(readonly=True)
 async def get_user_weekly_approved_count(*, session, user_id):
-    week_start = datetime.now(MSC_TZ) - timedelta(days=7)
-
+    """
+    APPROVED пользователя за последние 7 дней. Счётчик недели
+    в user_stats считается с понедельника, поэтому здесь — запрос
+    к task_assignments (индекс по user_id).
+    """
     stmt = select(func.count(TaskAssignment.id)).where(
-        TaskAssignment.user_id == user_id,
-        TaskAssignment.status == TaskAssignmentStatus.APPROVED,
-        TaskAssignment.processed_at >= week_start,
+        *_weekly_approved_filters(user_id)
     )
 
     return await session.scalar(stmt) or 0
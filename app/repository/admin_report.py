@@ -1,16 +1,16 @@
 import io
 import uuid
 import logging
-import pandas as pd
-from sqlalchemy import select
 
 from urllib.parse import urlparse
 
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, DataError
 
+from app.consts.source_task import source_registry
 from app.db.session import connection
 from app.models import Task
-from app.models.city import City
+from app.repository.city import city_registry
+from app.repository.human_code import allocate_human_codes
 
 logger = logging.getLogger(__name__)
 
@@ -27,56 +27,15 @@ def parse_source_and_text(link: str) -> tuple[str, str]:
     """
     Возвращает (source, text)
     """
-    parsed = urlparse(link)
-    netloc = parsed.netloc.lower()
-
-    if netloc.startswith("www."):
-        netloc = netloc[4:]
-
-    google_domains = {
-        "google.com",
-        "maps.google.com",
-        "goo.gl",
-        "maps.app.goo.gl",
-    }
-
-
-    if any(domain in netloc for domain in google_domains):
-        return "Google Maps", "Оставить отзыв в Google Maps"
-
-    yandex_domains = {
-        "yandex.ru",
-        "yandex.com",
-        "maps.yandex.ru",
-    }
-
-    if any(domain in netloc for domain in yandex_domains):
-        return "Яндекс Карты", "Оставить отзыв на Яндекс Картах"
-
-    yandex_browser_domains = {
-        "browser.yandex.ru",
-        "ya.ru",
-    }
-
-    if any(domain in netloc for domain in yandex_browser_domains):
-        return "Яндекс Браузер", "Оставить отзыв через Яндекс Браузер"
-
-    if "2gis" in netloc:
-        return "2ГИС", "Оставить отзыв в 2ГИС"
-
-    if netloc in {"vk.ru", "vk.com"}:
-        return "VK", "Оставить отзыв во ВКонтакте"
-
-    if "zoon.ru" in netloc:
-        return "Zoon", "Оставить отзыв на Zoon"
-
-    if "yell.ru" in netloc:
-        return "Yell", "Оставить отзыв на Yell"
-
-    raise UnknownSourceError(f"Неизвестный источник ссылки: {link}")
+    source = source_registry.match_host(urlparse(link).hostname or "")
+    if source is None:
+        raise UnknownSourceError(f"Неизвестный источник ссылки: {link}")
+    return source.value, source.task_text
 
 
 def parse_gender(value) -> str | None:
+    import pandas as pd
+
     if value is None or pd.isna(value):
         return None
 
@@ -105,6 +64,9 @@ async def import_tasks_from_excel(
     - логируются ошибки SQLAlchemy и неожиданные исключения
     """
 
+    # pandas (~0.5 с импорта) нужен только здесь — не грузим его при старте бота
+    import pandas as pd
+
     logger.info("Начат импорт задач из Excel")
 
     try:
@@ -158,15 +120,7 @@ async def import_tasks_from_excel(
             if not pd.isna(city_name):
                 city_name_clean = str(city_name).strip()
                 if city_name_clean.lower() not in ("н/а", "na", "none"):
-                    stmt = select(City).where(City.name == city_name_clean)
-                    try:
-                        city = (await session.execute(stmt)).scalar_one_or_none()
-                    except SQLAlchemyError:
-                        logger.exception(
-                            "Ошибка БД при поиске города. Строка %s", row_num
-                        )
-                        raise
-
+                    city = await city_registry.find(city_name_clean)
                     if not city:
                         row_errors.append(f"Город не найден: {city_name_clean}")
                     else:
@@ -201,6 +155,12 @@ async def import_tasks_from_excel(
             await session.rollback()
             return 0, errors
 
+        codes = await allocate_human_codes(
+            [task.source for task in tasks_to_create], session=session
+        )
+        for task, code in zip(tasks_to_create, codes):
+            task.human_code = code
+
         session.add_all(tasks_to_create)
 
         try:
@@ -1,23 +1,119 @@
+import asyncio
+import logging
+import re
+import uuid
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.consts.cities import CITY_ALIASES
+from app.db.invalidation import CacheKind, invalidation_bus
 from app.db.session import connection
 from app.models.city import City
 
+logger = logging.getLogger(__name__)
+
+_DASHES = re.compile(r"\s*[-‐‑‒–—―−]\s*")
+_CITY_PREFIX = re.compile(r"^(г\.|г |город )\s*")
+
+
+def normalize_city_name(name: str) -> str:
+    """
+    Ключ поиска города: без регистра, ё → е, пробелы схлопнуты,
+    любые тире — дефис без пробелов, без префикса «г.»/«город».
+    """
+    name = " ".join(name.casefold().replace("ё", "е").split())
+    name = _DASHES.sub("-", name)
+    return _CITY_PREFIX.sub("", name)
+
 
 @connection()
-async def get_all_cities(
+async def _load_all_cities(
     *,
     session: AsyncSession,
 ) -> list[City]:
+    result = await session.execute(select(City).order_by(City.name))
+    return result.scalars().all()
+
+
+class CityRegistry:
     """
-    Возвращает список доступных городов.
+    Справочник городов в памяти процесса: O(1) поиск по id
+    и по нормализованному названию (с учётом CITY_ALIASES).
+
+    Загружается при старте бота (или лениво при первом обращении)
+    и перечитывается после события CacheKind.CITIES шины инвалидации
+    (его шлёт триггер на cities, миграция b6f3d9a2c4e7) или
+    переподключения шины.
+    """
+
+    def __init__(self):
+        self._cities: list[City] = []
+        self._by_id: dict[uuid.UUID, City] = {}
+        self._by_name: dict[str, City] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        invalidation_bus.subscribe(CacheKind.CITIES, self._invalidate)
+
+    def _invalidate(self, key: str | None) -> None:
+        self._loaded = False
 
-    Args:
-        session (AsyncSession): Сессия базы данных.
+    async def load(self) -> None:
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        # флаг ставится до запроса: событие, пришедшее во время
+        # загрузки, снова пометит справочник устаревшим
+        self._loaded = True
+        try:
+            cities = await _load_all_cities()
+        except Exception:
+            self._loaded = False
+            raise
+
+        by_name = {normalize_city_name(c.name): c for c in cities}
+        for alias, name in CITY_ALIASES.items():
+            city = by_name.get(normalize_city_name(name))
+            if city is not None:
+                by_name.setdefault(normalize_city_name(alias), city)
+
+        self._cities = cities
+        self._by_id = {c.id: c for c in cities}
+        self._by_name = by_name
+        logger.info(
+            "Cities loaded: %s (+%s aliases)", len(cities), len(by_name) - len(cities)
+        )
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self._load()
+
+    async def all(self) -> list[City]:
+        await self._ensure_loaded()
+        return self._cities
+
+    async def get(self, city_id: uuid.UUID) -> City | None:
+        await self._ensure_loaded()
+        return self._by_id.get(city_id)
+
+    async def find(self, name: str) -> City | None:
+        """Город по названию или алиасу («СПб» → «Санкт-Петербург»)."""
+        await self._ensure_loaded()
+        return self._by_name.get(normalize_city_name(name))
+
+
+city_registry = CityRegistry()
+
+
+async def get_all_cities() -> list[City]:
+    """
+    Возвращает список доступных городов (из city_registry).
 
     Returns:
         list[City]: Список городов.
     """
-    result = await session.execute(select(City).order_by(City.name))
-    return result.scalars().all()
+    return await city_registry.all()
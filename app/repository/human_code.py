@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.consts.source_task import source_registry
+
+# Crockford base32: без I, L, O, U — не путаются при ручном вводе
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+MIN_WIDTH = 5
+
+# Старые коды — 6 hex-символов uuid (YAN-1A2B3C). Чтобы не пересечься
+# с ними, 6-символьные коды не выдаются: после 32^5 номеров
+# кодирование сразу переходит к 7 символам.
+_SKIP_FROM = 32**5
+_SKIP_BY = 32**6 - 32**5
+
+
+def encode_number(n: int) -> str:
+    if n >= _SKIP_FROM:
+        n += _SKIP_BY
+    digits = []
+    while n:
+        n, r = divmod(n, 32)
+        digits.append(ALPHABET[r])
+    return "".join(reversed(digits)).rjust(MIN_WIDTH, "0")
+
+
+def _sequence(prefix: str) -> str:
+    return f"human_code_seq_{prefix.lower()}"
+
+
+async def allocate_human_codes(
+    sources: list[str | None],
+    *,
+    session: AsyncSession,
+) -> list[str]:
+    """
+    Выдаёт human_code для заданий с указанными source (в том же порядке).
+
+    Номера берутся из последовательности префикса источника
+    (human_code_seq_<prefix>) одной выборкой на префикс, поэтому
+    коды уникальны без повторных попыток при любом размере каталога.
+    Номера, взятые в откаченной транзакции, просто пропускаются.
+    """
+    positions: dict[str, list[int]] = defaultdict(list)
+    for i, source in enumerate(sources):
+        positions[source_registry.prefix(source)].append(i)
+
+    codes: list[str] = [""] * len(sources)
+    for prefix, indexes in positions.items():
+        numbers = (
+            await session.scalars(
+                text(
+                    f"SELECT nextval('{_sequence(prefix)}') "
+                    "FROM generate_series(1, :n)"
+                ),
+                {"n": len(indexes)},
+            )
+        ).all()
+        for i, number in zip(indexes, numbers):
+            codes[i] = f"{prefix}-{encode_number(number)}"
+    return codes
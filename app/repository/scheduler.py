@@ -0,0 +1,85 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import connection
+from app.models.scheduler_job_run import SchedulerJobRun, SchedulerJobRunStatus
+
+logger = logging.getLogger(__name__)
+
+
+@connection()
+async def record_job_run(
+    *,
+    session: AsyncSession,
+    job_id: str,
+    status: str,
+    scheduled_at: datetime,
+    started_at: datetime | None,
+    duration_ms: int | None,
+    instance: str,
+    error: str | None = None,
+) -> None:
+    """Сохраняет результат запуска джобы планировщика."""
+    session.add(
+        SchedulerJobRun(
+            job_id=job_id,
+            status=status,
+            scheduled_at=scheduled_at,
+            started_at=started_at,
+            duration_ms=duration_ms,
+            instance=instance,
+            error=error,
+        )
+    )
+    await session.commit()
+
+
+@connection(readonly=True)
+async def get_job_stats(*, session: AsyncSession) -> list[dict]:
+    """
+    Сводка по джобам планировщика: число запусков, ошибок и пропусков,
+    средняя/максимальная длительность, последний успешный запуск.
+    """
+    run = SchedulerJobRun
+
+    def count_status(status: str):
+        return func.count(case((run.status == status, 1)))
+
+    stmt = (
+        select(
+            run.job_id,
+            func.count().label("runs"),
+            count_status(SchedulerJobRunStatus.ERROR).label("errors"),
+            count_status(SchedulerJobRunStatus.MISSED).label("missed"),
+            func.avg(run.duration_ms).label("avg_duration_ms"),
+            func.max(run.duration_ms).label("max_duration_ms"),
+            func.max(run.finished_at)
+            .filter(run.status == SchedulerJobRunStatus.SUCCESS)
+            .label("last_success_at"),
+            func.max(run.finished_at)
+            .filter(run.status == SchedulerJobRunStatus.ERROR)
+            .label("last_error_at"),
+        )
+        .group_by(run.job_id)
+        .order_by(run.job_id)
+    )
+
+    rows = (await session.execute(stmt)).all()
+    return [
+        {
+            "job_id": row.job_id,
+            "runs": row.runs,
+            "errors": row.errors,
+            "missed": row.missed,
+            "avg_duration_ms": (
+                round(float(row.avg_duration_ms)) if row.avg_duration_ms else None
+            ),
+            "max_duration_ms": row.max_duration_ms,
+            "last_success_at": row.last_success_at,
+            "last_error_at": row.last_error_at,
+        }
+        for row in rows
+    ]
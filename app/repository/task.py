@@ -2,14 +2,27 @@ import uuid
 import logging
 from datetime import datetime, timezone, timedelta
 
-from sqlalchemy import select, update, func, exists, delete
+from sqlalchemy import (
+    bindparam,
+    select,
+    update,
+    func,
+    exists,
+    delete,
+    tuple_,
+    literal,
+    false,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.settings import settings
+from app.db.free_task_index import free_task_index
+from app.db.invalidation import CacheKind, invalidation_bus
+from app.db.pagination import PageDirection, fetch_keyset_page
 from app.db.session import connection
 from app.models import TaskReport
-from app.models.task_assigment_admin_message import TaskAssignmentAdminMessage
 from app.models.task_assignment import (
     TaskAssignment,
     TaskAssignmentStatus,
@@ -20,6 +33,11 @@ from sqlalchemy.orm import selectinload
 
 from app.models.task import Task
 from app.models.user import User
+from app.models.user_stats import UserStats
+from app.repository.user_stats import (
+    track_assignment_reviewed,
+    track_report_submitted,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +49,45 @@ def _ekb_day_start() -> datetime:
     return now.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
+# Горячие запросы собраны один раз с bindparam (см. app/repository/user.py)
+ACTIVE_ASSIGNMENT_STMT = (
+    select(TaskAssignment)
+    .where(
+        TaskAssignment.user_id == bindparam("user_id"),
+        TaskAssignment.is_archived.is_(False),
+        TaskAssignment.status.in_(
+            [
+                TaskAssignmentStatus.ASSIGNED,
+                TaskAssignmentStatus.SUBMITTED,
+            ]
+        ),
+    )
+    .options(selectinload(TaskAssignment.task))
+)
+
+CURRENT_ASSIGNMENT_STMT = (
+    select(TaskAssignment)
+    .where(
+        TaskAssignment.user_id == bindparam("user_id"),
+        TaskAssignment.is_archived.is_(False),
+        TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
+    )
+    .options(selectinload(TaskAssignment.task))
+)
+
+# денормализованный счётчик неархивных SUBMITTED (user_stats)
+SUBMITTED_COUNT_STMT = select(UserStats.submitted_count).where(
+    UserStats.user_id == bindparam("user_id")
+)
+
+
 @connection()
 async def get_active_assignment(
     user_id: uuid.UUID,
     *,
     session,
 ) -> TaskAssignment | None:
-    stmt = (
-        select(TaskAssignment)
-        .where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.is_archived.is_(False),
-            TaskAssignment.status.in_(
-                [
-                    TaskAssignmentStatus.ASSIGNED,
-                    TaskAssignmentStatus.SUBMITTED,
-                ]
-            ),
-        )
-        .options(selectinload(TaskAssignment.task))
-    )
-    res = await session.execute(stmt)
+    res = await session.execute(ACTIVE_ASSIGNMENT_STMT, {"user_id": user_id})
     return res.scalar_one_or_none()
 
 
@@ -61,16 +97,7 @@ async def get_current_assignment(
     *,
     session,
 ) -> TaskAssignment | None:
-    stmt = (
-        select(TaskAssignment)
-        .where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.is_archived.is_(False),
-            TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
-        )
-        .options(selectinload(TaskAssignment.task))
-    )
-    res = await session.execute(stmt)
+    res = await session.execute(CURRENT_ASSIGNMENT_STMT, {"user_id": user_id})
     return res.scalar_one_or_none()
 
 
@@ -80,17 +107,7 @@ async def get_submitted_count(
     *,
     session,
 ) -> int:
-    stmt = (
-        select(func.count())
-        .select_from(TaskAssignment)
-        .where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.is_archived.is_(False),
-            TaskAssignment.status == TaskAssignmentStatus.SUBMITTED,
-        )
-    )
-    res = await session.execute(stmt)
-    return res.scalar_one()
+    return await session.scalar(SUBMITTED_COUNT_STMT, {"user_id": user_id}) or 0
 
 
 @connection()
@@ -108,6 +125,9 @@ async def has_available_tasks_for_source(
       - не занятость (нет активного неархивного TaskAssignment)
       - source совпадает
     """
+    if free_task_index.ready:
+        return free_task_index.has_any(source, user.city_id)
+
     stmt = (
         select(Task.id)
         .where(
@@ -126,6 +146,88 @@ async def has_available_tasks_for_source(
     return task_id is not None
 
 
+# сколько кандидатов из индекса пробовать, прежде чем
+# перейти к выбору обычным SQL-запросом
+INDEX_ASSIGN_ATTEMPTS = 5
+
+
+async def _assign_from_index(
+    user: User,
+    source: str | None,
+    required_gender: str | None,
+    *,
+    session,
+) -> TaskAssignment | str | None:
+    """
+    Выдача задания по кандидатам из free_task_index: одна условная
+    вставка на кандидата. Вставка не проходит, если задание уже занято
+    (ON CONFLICT по ux_task_assignments_task_active) или пользователь
+    уже брал его раньше — тогда пробуем следующего кандидата.
+    Каждая попытка идёт в SAVEPOINT: кандидат из отставшего индекса
+    может быть уже удалён (IntegrityError по внешнему ключу).
+
+    Возвращает назначение, "no_tasks" (в индексе нет подходящих)
+    или None, если попытки кончились и нужен обычный SQL-выбор.
+    """
+    tried: set[uuid.UUID] = set()
+
+    for _ in range(INDEX_ASSIGN_ATTEMPTS):
+        task_id = free_task_index.pick(
+            source, user.city_id, required_gender, exclude=tried
+        )
+        if task_id is None:
+            return None if tried else "no_tasks"
+
+        assignment_id = uuid.uuid4()
+        stmt = (
+            pg_insert(TaskAssignment)
+            .from_select(
+                ["id", "user_id", "task_id", "status", "created_at", "is_archived"],
+                select(
+                    literal(assignment_id),
+                    literal(user.id),
+                    literal(task_id),
+                    literal(TaskAssignmentStatus.ASSIGNED),
+                    func.now(),
+                    false(),
+                ).where(
+                    ~exists().where(
+                        TaskAssignment.task_id == task_id,
+                        TaskAssignment.user_id == user.id,
+                    )
+                ),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[TaskAssignment.task_id],
+                # предикат как у ux_task_assignments_task_active
+                index_where=TaskAssignment.is_archived == false(),
+            )
+            .returning(TaskAssignment.id)
+        )
+
+        try:
+            async with session.begin_nested():
+                inserted = (await session.execute(stmt)).scalar_one_or_none()
+        except IntegrityError:
+            # индекс отстал: задание удалено, а "drop" ещё не пришёл
+            tried.add(task_id)
+            free_task_index.discard(task_id)
+            continue
+        if inserted is None:
+            tried.add(task_id)
+            continue
+
+        await session.commit()
+        # не ждём NOTIFY от собственной вставки
+        free_task_index.discard(task_id)
+        return await session.get(TaskAssignment, assignment_id)
+
+    logger.info(
+        "[ASSIGN_INDEX_MISS] tg_id=%s tried=%s, fallback to SQL", user.tg_id, len(tried)
+    )
+    return None
+
+
 @connection()
 async def assign_random_task(
     user: User,
@@ -144,13 +246,21 @@ async def assign_random_task(
         logger.info(f"[ASSIGN_HAS_ACTIVE] tg_id={user.tg_id}")
         return "has_active"
 
-    submitted_count = await get_submitted_count(user.id)
+    stats = await session.get(UserStats, user.id)
+    submitted_count = stats.submitted_count if stats else 0
     if submitted_count >= settings.max_active_assignments:
         logger.info(
             f"[ASSIGN_SUBMITTED_LIMIT] tg_id={user.tg_id} submitted={submitted_count}"
         )
         return "submitted_limit"
 
+    if free_task_index.ready:
+        assignment = await _assign_from_index(
+            user, source, required_gender, session=session
+        )
+        if assignment is not None:
+            return assignment
+
     conditions = [
         or_(Task.city_id.is_(None), Task.city_id == user.city_id),
         Task.source == source,
@@ -252,6 +362,7 @@ async def submit_report(
 
     assignment.status = TaskAssignmentStatus.SUBMITTED
     assignment.submitted_at = datetime.now(timezone.utc)
+    await track_report_submitted(assignment.user_id, session=session)
 
     await session.commit()
 
@@ -325,6 +436,14 @@ async def process_assignment(
 
     assignment.processed_by_admin_id = admin_tg_id
     assignment.processed_at = datetime.now(timezone.utc)
+    await track_assignment_reviewed(
+        assignment.user_id,
+        approved=assignment.status == TaskAssignmentStatus.APPROVED,
+        session=session,
+    )
+    # счётчики в профиле исполнителя
+    tg_id = await session.scalar(select(User.tg_id).where(User.id == assignment.user_id))
+    await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
 
     logger.info(
         "Задание %s обработано админом %s: %s",
@@ -371,6 +490,13 @@ async def review_assignment(
     )
     assignment.processed_by_admin_id = admin_tg_id
     assignment.processed_at = datetime.now(timezone.utc)
+    await track_assignment_reviewed(
+        assignment.user_id,
+        approved=approve,
+        session=session,
+    )
+    # счётчики в профиле исполнителя
+    await invalidation_bus.publish(CacheKind.USER, assignment.user.tg_id, session=session)
 
     await session.commit()
     logger.info(
@@ -397,51 +523,78 @@ async def save_assignment_report_message_id(
 
 
 @connection()
-async def archive_rejected_assignments(*, session) -> int:
+async def archive_rejected_assignments(
+    *,
+    session,
+    older_than: datetime | None = None,
+    batch_size: int | None = None,
+    after: tuple[datetime, uuid.UUID] | None = None,
+) -> int:
     """
-    Архивирует REJECTED задания прошлых дней,
-    чтобы они не мешали повторной выдаче.
+    Архивирует REJECTED задания, обработанные раньше older_than
+    (по умолчанию — прошлых дней), чтобы они не мешали повторной выдаче.
+
+    Обрабатывает пачками по keyset (processed_at, id) с коммитом
+    на каждую пачку, поэтому блокировки короткие. Обработанные строки
+    выпадают из условия, так что повторный запуск продолжает с места
+    остановки; курсор последней пачки пишется в лог и может быть
+    передан в after.
     """
-    today_start = _ekb_day_start()
+    older_than = older_than or _ekb_day_start()
+    batch_size = batch_size or settings.cleanup_batch_size
 
-    stmt = (
-        update(TaskAssignment)
-        .where(
-            TaskAssignment.status == TaskAssignmentStatus.REJECTED,
-            TaskAssignment.is_archived.is_(False),
-            TaskAssignment.processed_at < today_start,
+    total = 0
+    cursor = after
+
+    while True:
+        batch = (
+            select(TaskAssignment.id)
+            .where(
+                TaskAssignment.status == TaskAssignmentStatus.REJECTED,
+                TaskAssignment.is_archived.is_(False),
+                TaskAssignment.processed_at < older_than,
+            )
+            .order_by(TaskAssignment.processed_at, TaskAssignment.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
         )
-        .values(is_archived=True)
-    )
+        if cursor is not None:
+            batch = batch.where(
+                tuple_(TaskAssignment.processed_at, TaskAssignment.id) > tuple_(*cursor)
+            )
 
-    result = await session.execute(stmt)
-    await session.commit()
+        stmt = (
+            update(TaskAssignment)
+            .where(TaskAssignment.id.in_(batch.scalar_subquery()))
+            .values(is_archived=True)
+            .returning(TaskAssignment.processed_at, TaskAssignment.id)
+            .execution_options(synchronize_session=False)
+        )
 
-    count = result.rowcount or 0
-    logger.info("Archived rejected assignments: %s", count)
-    return count
+        rows = (await session.execute(stmt)).all()
+        await session.commit()
 
+        if not rows:
+            break
 
-@connection()
-async def archive_assignment_by_id(*, assignment_id: int, session) -> bool:
-    stmt = (
-        update(TaskAssignment)
-        .where(
-            TaskAssignment.status == TaskAssignmentStatus.REJECTED,
-            TaskAssignment.id == assignment_id,
-            TaskAssignment.is_archived.is_(False),
+        total += len(rows)
+        cursor = max((row.processed_at, row.id) for row in rows)
+        logger.info(
+            "Archived rejected assignments: batch=%s total=%s cursor=%s",
+            len(rows),
+            total,
+            cursor,
         )
-        .values(is_archived=True)
-        .returning(TaskAssignment.id)
-    )
 
-    result = await session.execute(stmt)
-    await session.commit()
+        if len(rows) < batch_size:
+            break
 
-    return result.scalar() is not None
+    if total:
+        logger.info("Archived rejected assignments: %s", total)
+    return total
 
 
-@connection()
+@connection(readonly=True)
 async def get_avg_execution_time(*, session: AsyncSession) -> float:
     """
     Возвращает среднее время выполнения задания (в минутах).
@@ -472,7 +625,7 @@ async def get_avg_execution_time(*, session: AsyncSession) -> float:
     return avg_seconds / 60
 
 
-@connection()
+@connection(readonly=True)
 async def get_tasks_statistics(*, session: AsyncSession) -> dict:
     total_tasks = await session.scalar(select(func.count(Task.id)))
 
@@ -555,84 +708,124 @@ async def get_submitted_assignments(
 
 
 @connection()
-async def delete_unsubmitted_tasks(*, session) -> int:
+async def delete_unsubmitted_tasks(
+    *,
+    session,
+    batch_size: int | None = None,
+    after: tuple[datetime, uuid.UUID] | None = None,
+) -> int:
     """
     Полностью удаляет Task и всю связанную историю,
     если задание выдано (ASSIGNED), но отчёт не отправлен.
+
+    Удаление пачками по keyset (created_at, id) назначений,
+    выданных до начала запуска; каждая пачка — отдельная транзакция.
+    Назначения, отчёты и сообщения админам удаляются
+    каскадом (ON DELETE CASCADE) вместе с Task.
+    Курсор последней пачки пишется в лог и может быть передан в after.
     """
+    started_at = datetime.now(timezone.utc)
+    batch_size = batch_size or settings.cleanup_batch_size
+
+    total = 0
+    cursor = after
 
-    assignment_ids_result = await session.execute(
-        select(TaskAssignment.id, TaskAssignment.task_id).where(
-            TaskAssignment.status == TaskAssignmentStatus.ASSIGNED
+    while True:
+        stmt = (
+            select(TaskAssignment.created_at, TaskAssignment.id, TaskAssignment.task_id)
+            .where(
+                TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
+                TaskAssignment.is_archived.is_(False),
+                TaskAssignment.created_at < started_at,
+            )
+            .order_by(TaskAssignment.created_at, TaskAssignment.id)
+            .limit(batch_size)
+            # не пересекаемся с параллельной отправкой отчёта
+            .with_for_update(skip_locked=True)
         )
-    )
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(TaskAssignment.created_at, TaskAssignment.id) > tuple_(*cursor)
+            )
 
-    rows = assignment_ids_result.all()
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            break
 
-    if not rows:
-        return 0
+        deleted = await session.execute(
+            delete(Task)
+            .where(Task.id.in_([row.task_id for row in rows]))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_count = len(deleted.all())
+        await session.commit()
 
-    assignment_ids = [row.id for row in rows]
-    task_ids = [row.task_id for row in rows]
+        total += deleted_count
+        cursor = (rows[-1].created_at, rows[-1].id)
+        logger.info(
+            "Deleted unsubmitted tasks: batch=%s total=%s cursor=%s",
+            deleted_count,
+            total,
+            cursor,
+        )
 
-    await session.execute(
-        delete(TaskReport).where(TaskReport.assignment_id.in_(assignment_ids))
-    )
+        if len(rows) < batch_size:
+            break
 
-    await session.execute(
-        delete(TaskAssignmentAdminMessage).where(
-            TaskAssignmentAdminMessage.assignment_id.in_(assignment_ids)
-        )
-    )
+    return total
 
-    await session.execute(
-        delete(TaskAssignment).where(TaskAssignment.id.in_(assignment_ids))
-    )
 
-    await session.execute(delete(Task).where(Task.id.in_(task_ids)))
+def _assigned_filters() -> list:
+    return [
+        TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
+        TaskAssignment.is_archived.is_(False),
+    ]
 
-    await session.commit()
 
-    return len(task_ids)
+@connection()
+async def count_assigned_tasks(*, session) -> int:
+    """
+    Количество выданных (ASSIGNED) заданий.
+    Считается при открытии окна, а не на каждом перелистывании.
+    """
+    total_stmt = (
+        select(func.count()).select_from(TaskAssignment).where(*_assigned_filters())
+    )
+    return await session.scalar(total_stmt) or 0
 
 
 @connection()
 async def get_assigned_tasks_page(
     *,
-    page: int,
+    direction: PageDirection,
+    cursor: tuple | None = None,
     page_size: int,
     session,
-) -> tuple[int, list[TaskAssignment]]:
-    """
-    Возвращает (total_count, items)
+) -> list[TaskAssignment]:
     """
+    Возвращает страницу выданных заданий (keyset по (created_at, id)).
 
-    total_stmt = (
-        select(func.count())
-        .select_from(TaskAssignment)
-        .where(
-            TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
-            TaskAssignment.is_archived.is_(False),
-        )
-    )
-
-    total_count = await session.scalar(total_stmt)
-
+    Args:
+        direction (PageDirection): first/next/prev/last/stay.
+        cursor (tuple | None): (created_at, id) граничной записи текущей страницы.
+        page_size (int): Размер страницы.
+        session: Сессия БД.
+    """
     stmt = (
         select(TaskAssignment)
-        .where(
-            TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
-            TaskAssignment.is_archived.is_(False),
-        )
+        .where(*_assigned_filters())
         .options(
             selectinload(TaskAssignment.task),
             selectinload(TaskAssignment.user),
         )
-        .order_by(TaskAssignment.created_at.asc())
-        .offset(page * page_size)
-        .limit(page_size)
     )
 
-    res = await session.execute(stmt)
-
-    return total_count or 0, res.scalars().all()
+    return await fetch_keyset_page(
+        session,
+        stmt,
+        keys=[TaskAssignment.created_at, TaskAssignment.id],
+        cursor=cursor,
+        direction=direction,
+        limit=page_size,
+    )
@@ -1,11 +1,21 @@
+import asyncio
+import gzip
 import io
-from datetime import datetime, timedelta, timezone
+import json
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
 
-from app.repository.admin import export_users_tasks_to_excel
-from app.db.session import connection
+from app.core.settings import settings
+from app.repository.admin import build_users_tasks_workbook, collect_users_tasks_rows
+
+logger = logging.getLogger(__name__)
 
 MSC_TZ = timezone(timedelta(hours=3))
 
+# сколько дней хранить дневные партиции
+PARTITIONS_KEEP_DAYS = 35
+
 
 def _ekb_day_range() -> tuple[datetime, datetime]:
     """
@@ -32,21 +42,83 @@ def _ekb_week_range() -> tuple[datetime, datetime]:
     return monday_last_week, monday_this_week
 
 
-@connection()
-async def export_weekly_tasks_excel(*, session) -> io.BytesIO:
-    date_from, date_to = _ekb_week_range()
+# ---------------------------------------------------------------------------
+# Дневные партиции: строки отчёта за закрытый день (МСК) сохраняются
+# один раз, недельный отчёт склеивается из семи партиций без запросов к БД.
+# ---------------------------------------------------------------------------
+
+
+def _partition_path(day: date) -> Path:
+    return Path(settings.reports_dir) / "daily" / f"{day.isoformat()}.json.gz"
 
-    return await export_users_tasks_to_excel(
-        date_from=date_from,
-        date_to=date_to,
-    )
 
+def _read_partition(day: date) -> list[dict] | None:
+    path = _partition_path(day)
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logger.exception("Повреждена партиция отчёта %s, пересобираю", path)
+        return None
 
-@connection()
-async def export_daily_tasks_excel(*, session) -> io.BytesIO:
-    date_from, date_to = _ekb_day_range()
 
-    return await export_users_tasks_to_excel(
-        date_from=date_from,
-        date_to=date_to,
+def _write_partition(day: date, rows: list[dict]) -> None:
+    path = _partition_path(day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # атомарная запись: читатель не увидит недописанный файл
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+    tmp.replace(path)
+
+    threshold = day - timedelta(days=PARTITIONS_KEEP_DAYS)
+    for old in path.parent.glob("*.json.gz"):
+        try:
+            if date.fromisoformat(old.name.removesuffix(".json.gz")) < threshold:
+                old.unlink()
+        except ValueError:
+            continue
+
+
+async def get_daily_rows(day: date) -> list[dict]:
+    """
+    Строки отчёта за день (МСК): из партиции, а если её нет —
+    из primary с сохранением партиции (только для закрытых дней).
+    """
+    rows = await asyncio.to_thread(_read_partition, day)
+    if rows is not None:
+        return rows
+
+    day_start = datetime.combine(day, time.min, tzinfo=MSC_TZ)
+    rows = await collect_users_tasks_rows(
+        date_from=day_start,
+        date_to=day_start + timedelta(days=1),
     )
+
+    if day < datetime.now(MSC_TZ).date():
+        await asyncio.to_thread(_write_partition, day, rows)
+        logger.info("Сохранена партиция отчёта %s: %s строк", day, len(rows))
+
+    return rows
+
+
+async def export_weekly_tasks_excel() -> io.BytesIO:
+    date_from, date_to = _ekb_week_range()
+
+    rows = []
+    day = date_from.date()
+    while day < date_to.date():
+        rows.extend(await get_daily_rows(day))
+        day += timedelta(days=1)
+
+    return await asyncio.to_thread(build_users_tasks_workbook, rows)
+
+
+async def export_daily_tasks_excel() -> io.BytesIO:
+    date_from, _ = _ekb_day_range()
+
+    rows = await get_daily_rows(date_from.date())
+    return await asyncio.to_thread(build_users_tasks_workbook, rows)
@@ -1,20 +1,85 @@
 import uuid
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from sqlalchemy import select, update, func
+from sqlalchemy import bindparam, select, update, func, literal, DateTime
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, aliased
 
 from app.core.settings import settings
+from app.db.invalidation import CacheKind, LocalCache, invalidation_bus
+from app.db.pagination import POS_INF, PageDirection, fetch_keyset_page
 from app.db.session import connection
-from app.models import Task, TaskReport
+from app.models import City, Task, TaskReport
 from app.models.user import User, UserApprovalStatus
 from app.models.task_assignment import TaskAssignment, TaskAssignmentStatus
 from app.models.user_approval_admin_message import UserApprovalAdminMessage
+from app.models.user_stats import UserStats
+from app.repository.user_stats import track_user_created
 
 logger = logging.getLogger(__name__)
 
+# сбрасываются событиями CacheKind.USER (ключ — tg_id)
+_access_cache = LocalCache(CacheKind.USER)
+_profile_cache = LocalCache(CacheKind.USER)
+
+# Запросы, которые выполняются на каждом апдейте, собраны один раз
+# с bindparam: select() не строится заново, а ключ кеша компиляции
+# SQLAlchemy вычисляется один раз и запоминается на объекте запроса.
+USER_ACCESS_STMT = select(
+    User.id,
+    User.full_name,
+    User.approval_status,
+    User.is_blocked,
+    User.is_channel_verified,
+).where(User.tg_id == bindparam("tg_id"))
+
+USER_BY_TG_ID_STMT = (
+    select(User)
+    .where(User.tg_id == bindparam("tg_id"))
+    .options(
+        selectinload(User.referrer),
+        selectinload(User.city),
+    )
+)
+
+USER_ID_BY_TG_ID_STMT = select(User.id).where(User.tg_id == bindparam("tg_id"))
+
+
+@dataclass(frozen=True)
+class UserAccess:
+    """Поля пользователя, которые middleware проверяют на каждом апдейте."""
+
+    user_id: uuid.UUID
+    is_registered: bool  # профиль заполнен (есть full_name)
+    approval_status: str
+    is_blocked: bool
+    is_channel_verified: bool
+
+
+async def get_user_access(tg_id: int) -> UserAccess | None:
+    """
+    Состояние доступа пользователя (None — пользователя нет).
+    Кешируется до события инвалидации по tg_id.
+    """
+    return await _access_cache.get_or_load(tg_id, lambda: _load_user_access(tg_id))
+
+
+@connection()
+async def _load_user_access(tg_id: int, *, session) -> UserAccess | None:
+    row = (await session.execute(USER_ACCESS_STMT, {"tg_id": tg_id})).one_or_none()
+    if row is None:
+        return None
+    return UserAccess(
+        user_id=row.id,
+        is_registered=bool(row.full_name),
+        approval_status=row.approval_status,
+        is_blocked=row.is_blocked,
+        is_channel_verified=row.is_channel_verified,
+    )
+
 
 @connection()
 async def get_user_by_tg_id(
@@ -25,16 +90,7 @@ async def get_user_by_tg_id(
     """
     Возвращает пользователя по Telegram ID с загруженными связями.
     """
-    stmt = (
-        select(User)
-        .where(User.tg_id == tg_id)
-        .options(
-            selectinload(User.referrer),
-            selectinload(User.city),
-        )
-    )
-
-    result = await session.execute(stmt)
+    result = await session.execute(USER_BY_TG_ID_STMT, {"tg_id": tg_id})
     return result.scalar_one_or_none()
 
 
@@ -60,14 +116,9 @@ async def get_user_by_id(
     return result.scalar_one_or_none()
 
 
-@connection()
-async def is_user_blocked(
-    session: AsyncSession,
-    *,
-    tg_id: int,
-) -> bool:
-    result = await session.execute(select(User.is_blocked).where(User.tg_id == tg_id))
-    return bool(result.scalar())
+async def is_user_blocked(*, tg_id: int) -> bool:
+    access = await get_user_access(tg_id)
+    return access is not None and access.is_blocked
 
 
 @connection()
@@ -86,7 +137,7 @@ async def get_user_id_by_tg_id(
     Returns:
         UUID | None: UUID пользователя или None.
     """
-    result = await session.execute(select(User.id).where(User.tg_id == tg_id))
+    result = await session.execute(USER_ID_BY_TG_ID_STMT, {"tg_id": tg_id})
     return result.scalar_one_or_none()
 
 
@@ -124,6 +175,17 @@ async def create_user(
     )
 
     session.add(user)
+    await session.flush()
+    await track_user_created(user.id, referrer_id, session=session)
+
+    await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
+    if referrer_id is not None:
+        # referrals_count в профиле реферера
+        referrer_tg_id = await session.scalar(
+            select(User.tg_id).where(User.id == referrer_id)
+        )
+        await invalidation_bus.publish(CacheKind.USER, referrer_tg_id, session=session)
+
     logger.info("Создан пользователь tg_id=%s", tg_id)
     await session.commit()
     return user
@@ -167,6 +229,7 @@ async def update_user_profile(
         values["approval_status"] = UserApprovalStatus.PENDING
 
     await session.execute(update(User).where(User.id == user_id).values(**values))
+    await invalidation_bus.publish(CacheKind.USER, user.tg_id, session=session)
 
     logger.info(
         "Профиль пользователя %s обновлён (admin=%s)",
@@ -177,55 +240,99 @@ async def update_user_profile(
     await session.commit()
 
 
-@connection()
-async def get_profile_data(
-    tg_id: int,
-    *,
-    session: AsyncSession,
-) -> dict:
+async def get_profile_data(tg_id: int) -> dict:
     """
     Возвращает данные профиля пользователя.
+    Кешируется до события инвалидации по tg_id.
 
     Args:
         tg_id (int): Telegram ID пользователя.
-        session (AsyncSession): Сессия базы данных.
 
     Returns:
         dict: Данные профиля.
     """
-    user_stmt = select(User).where(User.tg_id == tg_id).options(selectinload(User.city))
-    user = (await session.execute(user_stmt)).scalar_one()
+    return await _profile_cache.get_or_load(tg_id, lambda: _load_profile_data(tg_id))
 
-    referrals_stmt = (
-        select(func.count()).select_from(User).where(User.referrer_id == user.id)
-    )
-    referrals_count = await session.scalar(referrals_stmt) or 0
 
-    approved_tasks_stmt = (
-        select(func.count())
-        .select_from(TaskAssignment)
-        .where(
-            TaskAssignment.user_id == user.id,
-            TaskAssignment.status == TaskAssignmentStatus.APPROVED,
+@connection()
+async def _load_profile_data(
+    tg_id: int,
+    *,
+    session: AsyncSession,
+) -> dict:
+    # Счётчики денормализованы в user_stats (PK = users.id),
+    # поэтому профиль — одна строка без агрегатов.
+    stmt = (
+        select(
+            User.tg_id,
+            User.full_name,
+            City.name.label("city_name"),
+            func.coalesce(UserStats.approved_count, 0).label("orders_count"),
+            func.coalesce(UserStats.referrals_count, 0).label("referrals_count"),
         )
+        .outerjoin(City, City.id == User.city_id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.tg_id == tg_id)
     )
-    orders_count = await session.scalar(approved_tasks_stmt) or 0
+    user = (await session.execute(stmt)).one()
 
     return {
         "full_name": user.full_name or "—",
-        "city": user.city.name if user.city else "—",
-        "orders_count": orders_count,
-        "referrals_count": referrals_count,
+        "city": user.city_name or "—",
+        "orders_count": user.orders_count,
+        "referrals_count": user.referrals_count,
         "referral_link": f"https://t.me/MapSuccessBot?start=ref_{user.tg_id}",
     }
 
 
+def _approved_tasks_filters(user_id: uuid.UUID) -> list:
+    return [
+        TaskAssignment.user_id == user_id,
+        TaskAssignment.status == TaskAssignmentStatus.APPROVED,
+    ]
+
+
+@connection()
+async def count_approved_tasks(
+    user_id: uuid.UUID,
+    *,
+    session,
+) -> int:
+    """
+    Количество принятых заданий пользователя (для истории в профиле).
+    """
+    stmt = (
+        select(func.count())
+        .select_from(TaskAssignment)
+        .join(TaskReport, TaskReport.assignment_id == TaskAssignment.id)
+        .where(*_approved_tasks_filters(user_id))
+    )
+    return await session.scalar(stmt) or 0
+
+
 @connection()
-async def get_approved_tasks(
+async def get_approved_tasks_page(
     user_id: uuid.UUID,
     *,
+    direction: PageDirection,
+    cursor: tuple | None = None,
+    page_size: int,
     session,
 ) -> list[dict]:
+    """
+    Возвращает страницу принятых заданий пользователя
+    (keyset по (processed_at, id) в порядке убывания).
+
+    Args:
+        user_id (UUID): UUID пользователя.
+        direction (PageDirection): first/next/prev/last/stay.
+        cursor (tuple | None): (processed_at, assignment_id) граничной записи.
+        page_size (int): Размер страницы.
+        session: Сессия БД.
+
+    Returns:
+        list[dict]: Задания страницы.
+    """
     stmt = (
         select(
             Task.human_code,
@@ -236,17 +343,23 @@ async def get_approved_tasks(
             Task.required_gender,
             TaskAssignment.processed_at,
             TaskReport.account_name,
+            TaskAssignment.id,
         )
         .join(TaskAssignment, TaskAssignment.task_id == Task.id)
         .join(TaskReport, TaskReport.assignment_id == TaskAssignment.id)
-        .where(
-            TaskAssignment.user_id == user_id,
-            TaskAssignment.status == TaskAssignmentStatus.APPROVED,
-        )
-        .order_by(TaskAssignment.processed_at.desc())
+        .where(*_approved_tasks_filters(user_id))
     )
 
-    result = await session.execute(stmt)
+    rows = await fetch_keyset_page(
+        session,
+        stmt,
+        keys=[TaskAssignment.processed_at, TaskAssignment.id],
+        cursor=cursor,
+        direction=direction,
+        limit=page_size,
+        descending=True,
+        scalars=False,
+    )
 
     return [
         {
@@ -258,6 +371,7 @@ async def get_approved_tasks(
             "required_gender": required_gender,
             "processed_at": processed_at,
             "account_name": account_name,
+            "assignment_id": assignment_id,
         }
         for (
             human_code,
@@ -268,65 +382,98 @@ async def get_approved_tasks(
             required_gender,
             processed_at,
             account_name,
-        ) in result.all()
+            assignment_id,
+        ) in rows
+    ]
+
+
+def _referrals_filters(referrer_id: uuid.UUID) -> list:
+    return [
+        User.referrer_id == referrer_id,
+        User.approval_status == UserApprovalStatus.APPROVED,
     ]
 
 
 @connection()
-async def get_referrals_with_stats(
+async def count_referrals(
+    referrer_id: uuid.UUID,
+    *,
+    session,
+) -> int:
+    """
+    Количество подтверждённых рефералов пользователя.
+    """
+    stmt = select(func.count(User.id)).where(*_referrals_filters(referrer_id))
+    return await session.scalar(stmt) or 0
+
+
+@connection()
+async def get_referrals_page(
     referrer_id: uuid.UUID,
     *,
+    direction: PageDirection,
+    cursor: tuple | None = None,
+    page_size: int,
     session,
 ) -> list[dict]:
     """
-    Возвращает список подтверждённых рефералов
+    Возвращает страницу подтверждённых рефералов
     + количество принятых (APPROVED) заданий.
+
+    Количество считается коррелированным подзапросом только
+    для рефералов текущей страницы, а не агрегатом по всем пользователям.
+    Keyset по (approval_at, id), NULL-ы approval_at — в конце.
     """
 
     ta = aliased(TaskAssignment)
 
-    approved_subq = (
-        select(
-            ta.user_id,
-            func.count(ta.id).label("approved_count"),
-        )
+    approved_count = (
+        select(func.count(ta.id))
         .where(
+            ta.user_id == User.id,
             ta.status == TaskAssignmentStatus.APPROVED,
             ta.is_archived.is_(False),
         )
-        .group_by(ta.user_id)
-        .subquery()
+        .correlate(User)
+        .scalar_subquery()
     )
 
     stmt = (
-        select(
-            User,
-            func.coalesce(approved_subq.c.approved_count, 0),
-        )
-        .outerjoin(
-            approved_subq,
-            approved_subq.c.user_id == User.id,
-        )
-        .where(
-            User.referrer_id == referrer_id,
-            User.approval_status == UserApprovalStatus.APPROVED,
-        )
+        select(User, approved_count)
+        .where(*_referrals_filters(referrer_id))
         .options(selectinload(User.city))
-        .order_by(User.approval_at)
     )
 
-    rows = (await session.execute(stmt)).all()
+    sql_cursor = None
+    if cursor is not None:
+        approval_at, user_id = cursor
+        sql_cursor = [
+            func.coalesce(literal(approval_at, DateTime(timezone=True)), POS_INF),
+            literal(user_id, UUID(as_uuid=True)),
+        ]
+
+    rows = await fetch_keyset_page(
+        session,
+        stmt,
+        keys=[func.coalesce(User.approval_at, POS_INF), User.id],
+        cursor=sql_cursor,
+        direction=direction,
+        limit=page_size,
+        scalars=False,
+    )
 
     result: list[dict] = []
 
-    for user, approved_count in rows:
+    for user, approved in rows:
         result.append(
             {
+                "id": user.id,
+                "approval_at": user.approval_at,
                 "full_name": user.full_name or "—",
                 "username": f"@{user.username}" if user.username else "—",
                 "tg_id": user.tg_id,
                 "city": user.city.name if user.city else "—",
-                "approved_tasks": approved_count or 0,
+                "approved_tasks": approved or 0,
             }
         )
 
@@ -346,8 +493,11 @@ async def approve_user(*, session, tg_id: int, admin_tg_id: int) -> bool:
         .returning(User.tg_id)
     )
     res = await session.execute(stmt)
+    updated = res.scalar_one_or_none() is not None
+    if updated:
+        await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
     await session.commit()
-    return res.scalar_one_or_none() is not None
+    return updated
 
 
 @connection()
@@ -363,8 +513,11 @@ async def reject_user(*, session, tg_id: int, admin_tg_id: int) -> bool:
         .returning(User.tg_id)
     )
     res = await session.execute(stmt)
+    updated = res.scalar_one_or_none() is not None
+    if updated:
+        await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
     await session.commit()
-    return res.scalar_one_or_none() is not None
+    return updated
 
 
 @connection()
@@ -421,5 +574,6 @@ async def mark_user_channel_verified(
     await session.execute(
         update(User).where(User.tg_id == tg_id).values(is_channel_verified=True)
     )
+    await invalidation_bus.publish(CacheKind.USER, tg_id, session=session)
 
     await session.commit()
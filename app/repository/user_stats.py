@@ -0,0 +1,190 @@
+import uuid
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import select, update, func, case, literal, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.session import connection
+from app.models.task_assignment import TaskAssignment, TaskAssignmentStatus
+from app.models.user import User
+from app.models.user_stats import UserStats
+
+logger = logging.getLogger(__name__)
+
+MSC_TZ = timezone(timedelta(hours=3))
+
+
+def current_week_start() -> date:
+    """Понедельник текущей недели по МСК."""
+    today = datetime.now(MSC_TZ).date()
+    return today - timedelta(days=today.weekday())
+
+
+def week_approved(stats: UserStats | None) -> int:
+    """APPROVED за текущую неделю с учётом устаревшего week_start."""
+    if stats is None or stats.week_start != current_week_start():
+        return 0
+    return stats.week_approved_count
+
+
+# ---------------------------------------------------------------------------
+# Обновление счётчиков.
+# Вызываются внутри транзакции исходного изменения (до commit),
+# поэтому счётчик и данные фиксируются атомарно.
+# ---------------------------------------------------------------------------
+
+
+async def track_user_created(
+    user_id: uuid.UUID,
+    referrer_id: uuid.UUID | None,
+    *,
+    session: AsyncSession,
+) -> None:
+    """
+    Создаёт строку счётчиков нового пользователя
+    и увеличивает referrals_count реферера.
+    """
+    await session.execute(
+        insert(UserStats)
+        .values(user_id=user_id)
+        .on_conflict_do_nothing(index_elements=[UserStats.user_id])
+    )
+
+    if referrer_id is not None:
+        await session.execute(
+            update(UserStats)
+            .where(UserStats.user_id == referrer_id)
+            .values(referrals_count=UserStats.referrals_count + 1)
+        )
+
+
+async def track_report_submitted(
+    user_id: uuid.UUID,
+    *,
+    session: AsyncSession,
+) -> None:
+    """ASSIGNED → SUBMITTED."""
+    await session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(submitted_count=UserStats.submitted_count + 1)
+    )
+
+
+async def track_assignment_reviewed(
+    user_id: uuid.UUID,
+    *,
+    approved: bool,
+    session: AsyncSession,
+) -> None:
+    """SUBMITTED → APPROVED / REJECTED."""
+    values = {
+        "submitted_count": func.greatest(UserStats.submitted_count - 1, 0),
+    }
+
+    if approved:
+        week_start = current_week_start()
+        values |= {
+            "approved_count": UserStats.approved_count + 1,
+            "week_approved_count": case(
+                (UserStats.week_start == week_start, UserStats.week_approved_count + 1),
+                else_=1,
+            ),
+            "week_start": week_start,
+        }
+
+    await session.execute(
+        update(UserStats).where(UserStats.user_id == user_id).values(**values)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Сверка
+# ---------------------------------------------------------------------------
+
+
+@connection()
+async def reconcile_user_stats(*, session: AsyncSession) -> int:
+    """
+    Пересчитывает счётчики всех пользователей по исходным таблицам
+    и исправляет расхождения (в т.ч. создаёт недостающие строки).
+
+    Один INSERT ... SELECT ... ON CONFLICT DO UPDATE; строки,
+    где значения совпали, не переписываются. Запускается ночью:
+    изменение, закоммиченное во время пересчёта, может быть
+    перезаписано и будет исправлено следующим запуском.
+
+    Returns:
+        int: Количество созданных/исправленных строк.
+    """
+    week_start = current_week_start()
+    week_start_at = datetime.combine(week_start, time.min, tzinfo=MSC_TZ)
+
+    referral = aliased(User)
+
+    def assignments_count(*conditions):
+        return (
+            select(func.count(TaskAssignment.id))
+            .where(TaskAssignment.user_id == User.id, *conditions)
+            .correlate(User)
+            .scalar_subquery()
+        )
+
+    source = select(
+        User.id,
+        assignments_count(TaskAssignment.status == TaskAssignmentStatus.APPROVED),
+        assignments_count(
+            TaskAssignment.status == TaskAssignmentStatus.SUBMITTED,
+            TaskAssignment.is_archived.is_(False),
+        ),
+        select(func.count(referral.id))
+        .where(referral.referrer_id == User.id)
+        .correlate(User)
+        .scalar_subquery(),
+        literal(week_start),
+        assignments_count(
+            TaskAssignment.status == TaskAssignmentStatus.APPROVED,
+            TaskAssignment.processed_at >= week_start_at,
+        ),
+    )
+
+    columns = [
+        "user_id",
+        "approved_count",
+        "submitted_count",
+        "referrals_count",
+        "week_start",
+        "week_approved_count",
+    ]
+
+    stmt = insert(UserStats).from_select(columns, source)
+    excluded = stmt.excluded
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            **{name: excluded[name] for name in columns[1:]},
+            "updated_at": func.now(),
+        },
+        where=or_(
+            UserStats.approved_count != excluded.approved_count,
+            UserStats.submitted_count != excluded.submitted_count,
+            UserStats.referrals_count != excluded.referrals_count,
+            # устаревший week_start при нуле за неделю — не расхождение
+            case(
+                (UserStats.week_start == week_start, UserStats.week_approved_count),
+                else_=0,
+            )
+            != excluded.week_approved_count,
+        ),
+    )
+
+    result = await session.execute(stmt)
+    await session.commit()
+
+    fixed = result.rowcount or 0
+    logger.info("User stats reconciled, rows fixed: %s", fixed)
+    return fixed
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+import uuid
+from functools import partial
+
+from sqlalchemy import text
+
+from app.consts.source_task import source_registry
+from app.core.settings import settings
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.repository.city import city_registry
+from app.repository.task import (
+    assign_random_task,
+    get_active_assignment,
+    get_current_assignment,
+    get_submitted_count,
+    review_assignment,
+    submit_report,
+)
+from app.repository.user import (
+    _load_profile_data,
+    _load_user_access,
+    get_user_by_tg_id,
+)
+from app.repository.user_stats import (
+    track_assignment_reviewed,
+    track_report_submitted,
+)
+
+logger = logging.getLogger(__name__)
+
+# Несуществующие ключи: запросы прогрева ничего не находят и ничего
+# не меняют, а транзакция всё равно откатывается.
+WARMUP_TG_ID = 0
+WARMUP_ID = uuid.UUID(int=0)
+WARMUP_SOURCE = "__warmup__"
+
+
+def _warmup_steps() -> list[tuple[str, partial]]:
+    """
+    Горячие запросы апдейтов. Вызываются исходные функции
+    (без @connection) на сессии прогрева, поэтому SQL совпадает
+    с боевым и попадает в тот же кеш компиляции SQLAlchemy,
+    а asyncpg готовит его на этом соединении.
+
+    Сдача отчёта, проверка и выдача задания на несуществующих ключах
+    доходят только до выборки: изменения заданий и отчётов (flush ORM)
+    готовятся при первом боевом вызове. UPDATE счётчиков user_stats
+    выполняются напрямую — ни одна строка не совпадает.
+    """
+    user = User(id=WARMUP_ID, tg_id=WARMUP_TG_ID, city_id=None, is_blocked=False)
+    steps = [
+        ("user_access", partial(_load_user_access.__wrapped__, WARMUP_TG_ID)),
+        ("user_by_tg_id", partial(get_user_by_tg_id.__wrapped__, WARMUP_TG_ID)),
+        ("profile", partial(_load_profile_data.__wrapped__, WARMUP_TG_ID)),
+        ("active_assignment", partial(get_active_assignment.__wrapped__, WARMUP_ID)),
+        ("current_assignment", partial(get_current_assignment.__wrapped__, WARMUP_ID)),
+        ("submitted_count", partial(get_submitted_count.__wrapped__, WARMUP_ID)),
+        ("submit_lookup", partial(submit_report.__wrapped__, WARMUP_ID, "", "")),
+        (
+            "review_lookup",
+            partial(
+                review_assignment.__wrapped__,
+                assignment_id=WARMUP_ID,
+                admin_tg_id=0,
+                approve=True,
+            ),
+        ),
+        ("stats_submitted", partial(track_report_submitted, WARMUP_ID)),
+    ]
+    # одобрение и отклонение обновляют разные наборы счётчиков
+    for approved in (True, False):
+        steps.append(
+            (
+                f"stats_reviewed[{approved}]",
+                partial(track_assignment_reviewed, WARMUP_ID, approved=approved),
+            )
+        )
+    # выбор задания с фильтром по полу и без него — разные запросы;
+    # несуществующий источник: кандидатов нет, до вставки не доходит
+    for gender in ("M", None):
+        steps.append(
+            (
+                f"assign[{gender}]",
+                partial(
+                    assign_random_task.__wrapped__,
+                    user,
+                    source=WARMUP_SOURCE,
+                    required_gender=gender,
+                ),
+            )
+        )
+    return steps
+
+
+async def _warm_connection() -> None:
+    async with SessionLocal() as session:
+        await session.execute(text("SELECT 1"))
+        for name, step in _warmup_steps():
+            try:
+                await step(session=session)
+            except Exception as e:
+                # ValueError / NoResultFound для несуществующих ключей — ожидаемы
+                logger.debug("Warm-up step %s: %r", name, e)
+                await session.rollback()
+        await session.rollback()
+
+
+async def warm_up() -> None:
+    """
+    Прогрев перед стартом polling: открывает соединения пула,
+    компилирует и готовит горячие запросы на каждом из них
+    (см. _warmup_steps — что именно прогревается),
+    загружает справочники городов и источников.
+
+    Ошибки прогрева только логируются — бот стартует и без него.
+    """
+    started = time.perf_counter()
+
+    # соединения сверх pool_size закрываются при возврате в пул
+    connections = min(settings.db_warmup_connections, engine.pool.size())
+    results = await asyncio.gather(
+        *(_warm_connection() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    failed = [r for r in results if isinstance(r, BaseException)]
+    for error in failed:
+        logger.warning("Warm-up connection failed: %r", error)
+
+    try:
+        await city_registry.load()
+    except Exception:
+        logger.exception("Warm-up: не удалось загрузить справочник городов")
+
+    logger.info(
+        "Warm-up done in %.2fs: connections=%s (failed=%s) sources=%s",
+        time.perf_counter() - started,
+        connections,
+        len(failed),
+        len(source_registry.sources),
+    )
@@ -0,0 +1,7 @@
+#!/bin/sh
+set -e
+
+# Разрешает потоковую репликацию для postgres_replica (docker-compose-dev.yml).
+# Скрипты initdb выполняются только на пустом томе: для уже созданного
+# pgdata строку нужно добавить в pg_hba.conf вручную и перечитать конфиг.
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
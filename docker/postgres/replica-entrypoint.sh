@@ -0,0 +1,19 @@
+#!/bin/sh
+set -e
+
+# Потоковая реплика primary (сервис postgres): при пустом томе снимает
+# pg_basebackup, -R записывает standby.signal и primary_conninfo.
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+  echo "⏳ Waiting for primary..."
+  until pg_isready -h postgres -U "$POSTGRES_USER"; do
+    sleep 2
+  done
+
+  echo "📦 Cloning primary with pg_basebackup..."
+  PGPASSWORD="$POSTGRES_PASSWORD" pg_basebackup \
+    -h postgres -U "$POSTGRES_USER" -D "$PGDATA" -R -X stream -P
+  chmod 700 "$PGDATA"
+fi
+
+echo "🚀 Starting replica"
+exec postgres -c hot_standby=on
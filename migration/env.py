@@ -15,6 +15,8 @@ from app.models.task_report import TaskReport  # noqa: F401
 from app.models.task_assignment import TaskAssignment  # noqa: F401
 from app.models.task_assigment_admin_message import TaskAssignmentAdminMessage  # noqa: F401
 from app.models.user_approval_admin_message import UserApprovalAdminMessage  # noqa: F401
+from app.models.user_stats import UserStats  # noqa: F401
+from app.models.scheduler_job_run import SchedulerJobRun  # noqa: F401
 from app.core.settings import settings
 
 
@@ -24,6 +26,13 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
+# таблицы, которыми управляет не ORM (job store APScheduler)
+EXTERNAL_TABLES = {"apscheduler_jobs"}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and name in EXTERNAL_TABLES)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -43,6 +52,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -50,7 +60,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,72 @@
+"""add scheduler job store
+
+Revision ID: a2d7e4b9c6f1
+Revises: f1c6a3e8b7d4
+Create Date: 2026-03-13 11:48:03.156472
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2d7e4b9c6f1"
+down_revision: Union[str, Sequence[str], None] = "f1c6a3e8b7d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # схема SQLAlchemyJobStore (APScheduler 3.x)
+    op.create_table(
+        "apscheduler_jobs",
+        sa.Column("id", sa.Unicode(length=191), nullable=False),
+        sa.Column("next_run_time", sa.Float(precision=25), nullable=True),
+        sa.Column("job_state", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_apscheduler_jobs_next_run_time",
+        "apscheduler_jobs",
+        ["next_run_time"],
+        unique=False,
+    )
+
+    op.create_table(
+        "scheduler_job_runs",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("job_id", sa.String(length=191), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "finished_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("instance", sa.String(length=128), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduler_job_runs_job_finished",
+        "scheduler_job_runs",
+        ["job_id", "finished_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_scheduler_job_runs_job_finished", table_name="scheduler_job_runs"
+    )
+    op.drop_table("scheduler_job_runs")
+    op.drop_index("ix_apscheduler_jobs_next_run_time", table_name="apscheduler_jobs")
+    op.drop_table("apscheduler_jobs")
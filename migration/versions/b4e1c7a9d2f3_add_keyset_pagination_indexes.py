@@ -0,0 +1,52 @@
+"""add keyset pagination indexes
+
+Revision ID: b4e1c7a9d2f3
+Revises: 8ece5af1973a
+Create Date: 2026-03-04 12:10:41.518304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e1c7a9d2f3"
+down_revision: Union[str, Sequence[str], None] = "8ece5af1973a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_task_assignments_assigned_keyset",
+        "task_assignments",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'ASSIGNED' AND is_archived = false"),
+    )
+    op.create_index(
+        "ix_task_assignments_user_history",
+        "task_assignments",
+        [
+            "user_id",
+            sa.text("coalesce(processed_at, '-infinity'::timestamptz)"),
+            sa.text("coalesce(submitted_at, '-infinity'::timestamptz)"),
+            "created_at",
+            "id",
+        ],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_task_assignments_user_history", table_name="task_assignments")
+    op.drop_index(
+        "ix_task_assignments_assigned_keyset",
+        table_name="task_assignments",
+        postgresql_where=sa.text("status = 'ASSIGNED' AND is_archived = false"),
+    )
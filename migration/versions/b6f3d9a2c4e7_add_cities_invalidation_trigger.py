@@ -0,0 +1,54 @@
+"""add cities invalidation trigger
+
+Revision ID: b6f3d9a2c4e7
+Revises: e8b2c6d4a9f1
+Create Date: 2026-03-26 11:40:18.274903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6f3d9a2c4e7"
+down_revision: Union[str, Sequence[str], None] = "e8b2c6d4a9f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Справочник городов в процессах бота (city_registry) перечитывается
+    # по событию CacheKind.CITIES шины инвалидации (app/db/invalidation.py).
+    # Города правят прямо в БД, поэтому событие шлёт триггер: один NOTIFY
+    # на оператор, доставка после commit.
+    op.execute(
+        """
+        CREATE FUNCTION notify_cities_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'cache_invalidation',
+                '{"kind": "cities", "key": null}'
+            );
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_cities_invalidation
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+        ON cities
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_cities_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER trg_cities_invalidation ON cities")
+    op.execute("DROP FUNCTION notify_cities_changed()")
@@ -0,0 +1,55 @@
+"""add task_assignments composite indexes
+
+Revision ID: c7d2e5f8a1b6
+Revises: b4e1c7a9d2f3
+Create Date: 2026-03-06 18:42:09.731154
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e5f8a1b6"
+down_revision: Union[str, Sequence[str], None] = "b4e1c7a9d2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (task_id) WHERE is_archived = false уже покрыт
+    # уникальным индексом ux_task_assignments_task_active
+    op.create_index(
+        "ix_task_assignments_user_archived_status",
+        "task_assignments",
+        ["user_id", "is_archived", "status"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_assignments_status_archived_created",
+        "task_assignments",
+        ["status", "is_archived", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_assignments_status_processed",
+        "task_assignments",
+        ["status", "processed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_task_assignments_status_processed", table_name="task_assignments"
+    )
+    op.drop_index(
+        "ix_task_assignments_status_archived_created", table_name="task_assignments"
+    )
+    op.drop_index(
+        "ix_task_assignments_user_archived_status", table_name="task_assignments"
+    )
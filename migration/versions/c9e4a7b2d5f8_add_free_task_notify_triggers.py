@@ -0,0 +1,126 @@
+"""add free task notify triggers
+
+Revision ID: c9e4a7b2d5f8
+Revises: a2d7e4b9c6f1
+Create Date: 2026-03-20 10:14:37.502118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c9e4a7b2d5f8"
+down_revision: Union[str, Sequence[str], None] = "a2d7e4b9c6f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # События для индекса свободных заданий (app/db/free_task_index.py).
+    # Массовые загрузки выключают их через SET app.free_task_notify = 'off'
+    # и в конце шлют NOTIFY free_tasks, 'reload'.
+    op.execute(
+        """
+        CREATE FUNCTION notify_free_task_tasks() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF current_setting('app.free_task_notify', true) = 'off' THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify(
+                    'free_tasks',
+                    json_build_object('op', 'drop', 'id', OLD.id)::text
+                );
+            ELSIF TG_OP = 'INSERT' OR NOT EXISTS (
+                SELECT 1 FROM task_assignments ta
+                WHERE ta.task_id = NEW.id AND ta.is_archived = false
+            ) THEN
+                PERFORM pg_notify(
+                    'free_tasks',
+                    json_build_object(
+                        'op', 'free',
+                        'id', NEW.id,
+                        'source', NEW.source,
+                        'city_id', NEW.city_id,
+                        'gender', NEW.required_gender
+                    )::text
+                );
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION notify_free_task_assignments() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            freed uuid;
+        BEGIN
+            IF current_setting('app.free_task_notify', true) = 'off' THEN
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP = 'INSERT' AND NOT NEW.is_archived
+               OR TG_OP = 'UPDATE' AND OLD.is_archived AND NOT NEW.is_archived THEN
+                PERFORM pg_notify(
+                    'free_tasks',
+                    json_build_object('op', 'busy', 'id', NEW.task_id)::text
+                );
+            ELSIF TG_OP = 'UPDATE' AND NOT OLD.is_archived AND NEW.is_archived THEN
+                freed := NEW.task_id;
+            ELSIF TG_OP = 'DELETE' AND NOT OLD.is_archived THEN
+                freed := OLD.task_id;
+            END IF;
+
+            -- при каскадном удалении задания строки tasks уже нет
+            IF freed IS NOT NULL THEN
+                PERFORM pg_notify(
+                    'free_tasks',
+                    json_build_object(
+                        'op', 'free',
+                        'id', t.id,
+                        'source', t.source,
+                        'city_id', t.city_id,
+                        'gender', t.required_gender
+                    )::text
+                )
+                FROM tasks t
+                WHERE t.id = freed;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_tasks_free_task_notify
+        AFTER INSERT OR DELETE OR UPDATE OF source, city_id, required_gender
+        ON tasks
+        FOR EACH ROW EXECUTE FUNCTION notify_free_task_tasks()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_task_assignments_free_task_notify
+        AFTER INSERT OR DELETE OR UPDATE OF is_archived
+        ON task_assignments
+        FOR EACH ROW EXECUTE FUNCTION notify_free_task_assignments()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER trg_task_assignments_free_task_notify ON task_assignments")
+    op.execute("DROP TRIGGER trg_tasks_free_task_notify ON tasks")
+    op.execute("DROP FUNCTION notify_free_task_assignments()")
+    op.execute("DROP FUNCTION notify_free_task_tasks()")
@@ -0,0 +1,90 @@
+"""add user stats
+
+Revision ID: d3a8f1c5e9b2
+Revises: c7d2e5f8a1b6
+Create Date: 2026-03-09 12:17:44.208391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a8f1c5e9b2"
+down_revision: Union[str, Sequence[str], None] = "c7d2e5f8a1b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "approved_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "submitted_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "referrals_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column("week_start", sa.Date(), nullable=True),
+        sa.Column(
+            "week_approved_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Начальное заполнение (дальше поддерживается приложением
+    # и сверяется джобой reconcile_user_stats)
+    op.execute(
+        """
+        INSERT INTO user_stats (
+            user_id, approved_count, submitted_count, referrals_count,
+            week_start, week_approved_count
+        )
+        SELECT
+            u.id,
+            (
+                SELECT count(*) FROM task_assignments ta
+                WHERE ta.user_id = u.id AND ta.status = 'APPROVED'
+            ),
+            (
+                SELECT count(*) FROM task_assignments ta
+                WHERE ta.user_id = u.id
+                  AND ta.status = 'SUBMITTED'
+                  AND ta.is_archived = false
+            ),
+            (SELECT count(*) FROM users r WHERE r.referrer_id = u.id),
+            w.week_start,
+            (
+                SELECT count(*) FROM task_assignments ta
+                WHERE ta.user_id = u.id
+                  AND ta.status = 'APPROVED'
+                  AND ta.processed_at >= w.week_start::timestamp
+                      AT TIME ZONE 'Europe/Moscow'
+            )
+        FROM users u
+        CROSS JOIN (
+            SELECT date_trunc('week', now() AT TIME ZONE 'Europe/Moscow')::date
+                AS week_start
+        ) w
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_stats")
@@ -0,0 +1,70 @@
+"""cascade task assignment fks
+
+Revision ID: e5b9c2d7f4a3
+Revises: d3a8f1c5e9b2
+Create Date: 2026-03-11 09:31:52.604117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b9c2d7f4a3"
+down_revision: Union[str, Sequence[str], None] = "d3a8f1c5e9b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Task -> task_assignments -> task_reports удаляются каскадом
+    # (task_assignment_admin_messages уже ON DELETE CASCADE)
+    op.drop_constraint(
+        "task_assignments_task_id_fkey", "task_assignments", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "task_assignments_task_id_fkey",
+        "task_assignments",
+        "tasks",
+        ["task_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.drop_constraint(
+        "task_reports_assignment_id_fkey", "task_reports", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "task_reports_assignment_id_fkey",
+        "task_reports",
+        "task_assignments",
+        ["assignment_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "task_reports_assignment_id_fkey", "task_reports", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "task_reports_assignment_id_fkey",
+        "task_reports",
+        "task_assignments",
+        ["assignment_id"],
+        ["id"],
+    )
+    op.drop_constraint(
+        "task_assignments_task_id_fkey", "task_assignments", type_="foreignkey"
+    )
+    op.create_foreign_key(
+        "task_assignments_task_id_fkey",
+        "task_assignments",
+        "tasks",
+        ["task_id"],
+        ["id"],
+    )
@@ -0,0 +1,34 @@
+"""add human code sequences
+
+Revision ID: e8b2c6d4a9f1
+Revises: c9e4a7b2d5f8
+Create Date: 2026-03-24 16:02:51.884310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b2c6d4a9f1"
+down_revision: Union[str, Sequence[str], None] = "c9e4a7b2d5f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# префиксы human_code (app/consts/source_task.py) + префикс по умолчанию;
+# новый источник — новая миграция с его последовательностью
+PREFIXES = ("YAN", "YBR", "GIS", "GGL", "VK", "YEL", "ZON", "MAP")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for prefix in PREFIXES:
+        op.execute(f"CREATE SEQUENCE human_code_seq_{prefix.lower()}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for prefix in PREFIXES:
+        op.execute(f"DROP SEQUENCE human_code_seq_{prefix.lower()}")
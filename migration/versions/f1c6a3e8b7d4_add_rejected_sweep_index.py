@@ -0,0 +1,39 @@
+"""add rejected sweep index
+
+Revision ID: f1c6a3e8b7d4
+Revises: e5b9c2d7f4a3
+Create Date: 2026-03-12 16:05:27.913840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c6a3e8b7d4"
+down_revision: Union[str, Sequence[str], None] = "e5b9c2d7f4a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_task_assignments_unarchived_status_processed",
+        "task_assignments",
+        ["status", "processed_at"],
+        unique=False,
+        postgresql_where=sa.text("is_archived = false"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_task_assignments_unarchived_status_processed",
+        table_name="task_assignments",
+        postgresql_where=sa.text("is_archived = false"),
+    )
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-dataset",
+        help="метка засеянного набора (tools.seed_dataset) для "
+        "tests/test_bench_repository.py; без неё бенчмарки пропускаются",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "db: тест на настоящей БД из DB_* (без доступной БД пропускается)",
+    )
+
+
+def _database_unavailable() -> str | None:
+    """Причина, по которой БД недоступна; None — можно подключиться."""
+    try:
+        import asyncpg
+
+        from app.core.settings import settings
+    except Exception as e:
+        return f"БД не настроена: {type(e).__name__}"
+
+    async def probe():
+        conn = await asyncpg.connect(
+            host=settings.db_host,
+            port=settings.db_port,
+            user=settings.db_user,
+            password=settings.db_password,
+            database=settings.db_name,
+            timeout=3,
+        )
+        await conn.close()
+
+    try:
+        asyncio.run(probe())
+    except Exception as e:
+        return f"БД недоступна: {e!r}"
+    return None
+
+
+def pytest_collection_modifyitems(config, items):
+    db_items = [item for item in items if item.get_closest_marker("db")]
+    if not db_items:
+        return
+    reason = _database_unavailable()
+    if reason is None:
+        return
+    for item in db_items:
+        item.add_marker(pytest.mark.skip(reason=reason))
+
+
+@pytest.fixture(scope="session")
+def run_db():
+    """
+    Выполняет корутину в отдельном цикле событий. Соединения пула
+    привязаны к циклу, поэтому пулы закрываются в нём же.
+    """
+    from app.db.session import engine, replica_engine
+
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await engine.dispose()
+                if replica_engine is not None:
+                    await replica_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def query_budget(request):
+    """
+    query_budget(n) — контекстный менеджер assert_max_queries:
+    тест падает, если блок выполнил больше n SQL-запросов.
+    """
+    from app.db.query_budget import assert_max_queries
+
+    def budget(max_queries: int):
+        return assert_max_queries(max_queries, request.node.name)
+
+    return budget
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.db.free_task_index import FreeTaskIndex
+from app.repository import task as task_repo
+
+CITY = uuid.UUID(int=1)
+DELETED = uuid.UUID(int=10)
+FREE = uuid.UUID(int=11)
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Первая вставка падает по внешнему ключу, следующие проходят."""
+
+    def __init__(self, failures: int = 1):
+        self.failures = failures
+        self.savepoints = 0
+        self.rolled_back = 0
+        self.committed = False
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        self.savepoints += 1
+        try:
+            yield
+        except Exception:
+            self.rolled_back += 1
+            raise
+
+    async def execute(self, stmt):
+        if self.failures:
+            self.failures -= 1
+            raise IntegrityError("INSERT", {}, Exception("task_id_fkey"))
+        return FakeResult(uuid.uuid4())
+
+    async def commit(self):
+        self.committed = True
+
+    async def get(self, model, ident):
+        return SimpleNamespace(id=ident)
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FreeTaskIndex()
+    monkeypatch.setattr(task_repo, "free_task_index", index)
+    return index
+
+
+def assign(session):
+    user = SimpleNamespace(id=uuid.UUID(int=2), tg_id=2, city_id=CITY)
+    return asyncio.run(
+        task_repo._assign_from_index(user, "yandex", None, session=session)
+    )
+
+
+def test_deleted_candidate_is_a_miss(index):
+    index.add(DELETED, "yandex", CITY, None)
+    index.add(FREE, "yandex", CITY, None)
+    # первым выбирается удалённое задание
+    index._rng.randrange = lambda n: 0
+
+    session = FakeSession()
+    assignment = assign(session)
+
+    assert assignment is not None
+    assert session.rolled_back == 1
+    assert session.committed
+    assert DELETED not in index._where
+    assert len(index) == 0
+
+
+def test_only_deleted_candidates_fall_back_to_sql(index):
+    index.add(DELETED, "yandex", CITY, None)
+
+    session = FakeSession()
+    assert assign(session) is None
+    assert not session.committed
+    assert len(index) == 0
@@ -0,0 +1,66 @@
+"""
+Бенчмарки репозиторных функций (сценарии tools.bench_repository).
+
+Прогоняются на засеянном наборе (tools.seed_dataset) только с
+--bench-dataset <метка>: тест функции падает, если p50 или число
+SQL-запросов за вызов вышли за базовую линию набора
+(tools/baselines/repository-<метка>.json, сохраняется
+python -m tools.bench_repository --dataset <метка> --save).
+"""
+
+import pytest
+
+from app.db.query_budget import install_query_tracer
+from tools.bench_repository import (
+    CLEANUP_SQL,
+    ITERATIONS,
+    SETUP_SQL,
+    WARMUP,
+    cases,
+    compare,
+    execute,
+    load_baseline,
+    load_fixtures,
+    measure,
+)
+
+pytestmark = pytest.mark.db
+
+
+@pytest.fixture(scope="module")
+def dataset(request):
+    label = request.config.getoption("--bench-dataset")
+    if not label:
+        pytest.skip("бенчмарки запускаются с --bench-dataset")
+    return label
+
+
+@pytest.fixture(scope="module")
+def baseline(dataset):
+    return load_baseline(dataset)
+
+
+@pytest.fixture(scope="module")
+def fixtures(dataset, run_db):
+    async def setup():
+        await execute(SETUP_SQL)
+        return await load_fixtures()
+
+    install_query_tracer()
+    try:
+        yield run_db(setup())
+    finally:
+        run_db(execute(CLEANUP_SQL))
+
+
+@pytest.mark.parametrize("case", cases(), ids=lambda case: case.name)
+def test_repository_case(case, fixtures, baseline, run_db, record_property):
+    if case.destructive:
+        pytest.skip("меняет набор данных: tools.bench_repository --include-destructive")
+
+    summary = run_db(measure(case, fixtures, ITERATIONS, WARMUP)).summary()
+    for key, value in summary.items():
+        record_property(key, value)
+
+    problem = compare(case.name, summary, baseline.get(case.name))
+    assert problem is None, problem
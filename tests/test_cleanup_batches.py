@@ -0,0 +1,105 @@
+"""
+Ночные чистки пачками (delete_unsubmitted_tasks, archive_rejected_assignments).
+
+Засевает CLEANUP_ROWS назначений (половина ASSIGNED, половина REJECTED
+за вчера) и проверяет, что джобы обрабатывают их пачками по
+CLEANUP_BATCH и что повторный запуск ничего не находит. Объём задаётся
+переменной окружения CLEANUP_ROWS (замер на 1M: CLEANUP_ROWS=1000000);
+пропускная способность пишется в свойства теста (--junitxml).
+"""
+
+import logging
+import math
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.repository.task import archive_rejected_assignments, delete_unsubmitted_tasks
+from tools.bench_cleanup import (
+    CLEANUP_SQL,
+    FOREIGN_ROWS_SQL,
+    BatchTimer,
+    execute,
+    seed_statements,
+)
+
+pytestmark = pytest.mark.db
+
+CLEANUP_ROWS = int(os.environ.get("CLEANUP_ROWS", "10000"))
+CLEANUP_BATCH = 1000
+
+LEFT_SQL = """
+    SELECT count(*) FROM task_assignments ta
+    JOIN tasks t ON t.id = ta.task_id
+    WHERE t.human_code LIKE 'BENCH-%'
+      AND ta.status = :status AND ta.is_archived = false
+"""
+
+
+async def left(status: str) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(text(LEFT_SQL), {"status": status})
+
+
+async def run_job(job, marker: str) -> tuple[int, int, float]:
+    """(обработано строк, пачек, секунд)"""
+    timer = BatchTimer(marker)
+    repo_logger = logging.getLogger("app.repository.task")
+    repo_logger.addHandler(timer)
+    repo_logger.setLevel(logging.INFO)
+    try:
+        started = time.perf_counter()
+        count = await job(batch_size=CLEANUP_BATCH)
+        return count, len(timer.marks), time.perf_counter() - started
+    finally:
+        repo_logger.removeHandler(timer)
+
+
+@pytest.fixture
+def seeded(run_db):
+    async def foreign_rows():
+        async with engine.connect() as conn:
+            return await conn.scalar(text(FOREIGN_ROWS_SQL))
+
+    # джобы работают по всей таблице
+    if run_db(foreign_rows()):
+        pytest.skip("в БД есть чужие ASSIGNED/REJECTED назначения")
+    run_db(execute(seed_statements(CLEANUP_ROWS)))
+    yield
+    run_db(execute(CLEANUP_SQL))
+
+
+@pytest.mark.parametrize(
+    ("job", "marker", "status", "expected"),
+    [
+        (
+            delete_unsubmitted_tasks,
+            "Deleted unsubmitted tasks: batch",
+            "ASSIGNED",
+            CLEANUP_ROWS // 2,
+        ),
+        (
+            archive_rejected_assignments,
+            "Archived rejected assignments: batch",
+            "REJECTED",
+            CLEANUP_ROWS - CLEANUP_ROWS // 2,
+        ),
+    ],
+    ids=["delete_unsubmitted", "archive_rejected"],
+)
+def test_cleanup_in_batches(run_db, seeded, record_property, job, marker, status, expected):
+    async def flow():
+        count, batches, elapsed = await run_job(job, marker)
+        record_property("rows_per_second", round(count / elapsed))
+
+        assert count == expected
+        assert batches == math.ceil(expected / CLEANUP_BATCH)
+        assert await left(status) == 0
+
+        # обработанные строки выпали из условия: повторный запуск пуст
+        assert (await run_job(job, marker))[0] == 0
+
+    run_db(flow())
@@ -0,0 +1,302 @@
+"""
+Регрессионная проверка планов запросов к task_assignments.
+
+В одной транзакции засевает синтетические данные, снимает
+EXPLAIN (FORMAT JSON) с запросов горячих репозиторных функций и проверяет,
+что планировщик использует ожидаемые индексы. Транзакция откатывается,
+данные БД не меняются.
+"""
+
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.session import engine
+from app.repository import admin, task
+
+pytestmark = pytest.mark.db
+
+MSC_TZ = timezone(timedelta(hours=3))
+
+SEED_TG_ID_BASE = 9_000_000_000
+
+# объём засева: на меньших таблицах планировщик выбирает seq scan
+SEED_USERS = 20_000
+SEED_TASKS = 50_000
+SEED_ASSIGNMENTS = 200_000
+
+
+def seed_statements(users: int, tasks: int, assignments: int) -> list[str]:
+    return [
+        """
+        INSERT INTO cities (id, name)
+        SELECT gen_random_uuid(), 'seed-city-' || g
+        FROM generate_series(1, 20) g
+        """,
+        """
+        CREATE TEMP TABLE seed_cities ON COMMIT DROP AS
+        SELECT array_agg(id ORDER BY name) AS ids
+        FROM cities WHERE name LIKE 'seed-city-%'
+        """,
+        f"""
+        INSERT INTO users (
+            id, tg_id, username, full_name, gender, city_id,
+            approval_status, approval_at, is_blocked, is_channel_verified
+        )
+        SELECT
+            gen_random_uuid(),
+            {SEED_TG_ID_BASE} + g,
+            'seed_' || g,
+            'Seed User ' || g,
+            CASE WHEN g % 2 = 0 THEN 'M' ELSE 'F' END,
+            c.ids[1 + g % 20],
+            'APPROVED',
+            now() - (g % 365) * interval '1 day',
+            false,
+            true
+        FROM generate_series(1, {users}) g, seed_cities c
+        """,
+        f"""
+        INSERT INTO tasks (
+            id, text, example_text, source, link,
+            required_gender, city_id, human_code, created_at
+        )
+        SELECT
+            gen_random_uuid(),
+            'Seed task ' || g,
+            'Seed example ' || g,
+            (ARRAY['Яндекс Карты', '2ГИС', 'Google Maps'])[1 + g % 3],
+            'https://example.com/seed/' || g,
+            CASE g % 3 WHEN 0 THEN 'M' WHEN 1 THEN 'F' END,
+            CASE WHEN g % 4 = 0 THEN NULL ELSE c.ids[1 + g % 20] END,
+            'SEED-' || g,
+            now() - (g % 180) * interval '1 day'
+        FROM generate_series(1, {tasks}) g, seed_cities c
+        """,
+        f"""
+        CREATE TEMP TABLE seed_users ON COMMIT DROP AS
+        SELECT id, row_number() OVER (ORDER BY tg_id) AS n
+        FROM users WHERE tg_id > {SEED_TG_ID_BASE}
+        """,
+        """
+        CREATE TEMP TABLE seed_tasks ON COMMIT DROP AS
+        SELECT id, row_number() OVER (ORDER BY id) AS n
+        FROM tasks WHERE human_code LIKE 'SEED-%'
+        """,
+        # Первый «круг» (g <= tasks) — по одному неархивному назначению
+        # на задание (ux_task_assignments_task_active), остальные —
+        # архивные отклонения прошлых выдач.
+        f"""
+        INSERT INTO task_assignments (
+            id, user_id, task_id, status, created_at, submitted_at,
+            processed_at, processed_by_admin_id, is_archived
+        )
+        SELECT
+            gen_random_uuid(),
+            u.id,
+            t.id,
+            x.status,
+            x.created_at,
+            CASE WHEN x.status <> 'ASSIGNED'
+                THEN x.created_at + interval '1 hour' END,
+            CASE WHEN x.status IN ('APPROVED', 'REJECTED')
+                THEN x.created_at + interval '3 hour' END,
+            CASE WHEN x.status IN ('APPROVED', 'REJECTED') THEN 1 END,
+            x.is_archived
+        FROM (
+            SELECT
+                1 + (g - 1) % {tasks} AS task_n,
+                1 + (g * 7919) % {users} AS user_n,
+                g > {tasks} AS is_archived,
+                CASE
+                    WHEN g > {tasks} THEN 'REJECTED'
+                    WHEN g % 100 < 3 THEN 'ASSIGNED'
+                    WHEN g % 100 < 7 THEN 'SUBMITTED'
+                    WHEN g % 100 < 15 THEN 'REJECTED'
+                    ELSE 'APPROVED'
+                END AS status,
+                now()
+                    - (g % 90) * interval '1 day'
+                    - (g % 1440) * interval '1 minute' AS created_at
+            FROM generate_series(1, {assignments}) g
+        ) x
+        JOIN seed_tasks t ON t.n = x.task_n
+        JOIN seed_users u ON u.n = x.user_n
+        """,
+        f"""
+        INSERT INTO user_stats (user_id)
+        SELECT id FROM users WHERE tg_id > {SEED_TG_ID_BASE}
+        """,
+        "ANALYZE cities",
+        "ANALYZE users",
+        "ANALYZE tasks",
+        "ANALYZE task_assignments",
+        "ANALYZE user_stats",
+    ]
+
+
+async def explain(conn: AsyncConnection, stmt, params: dict | None = None) -> dict:
+    """
+    Возвращает корневой узел плана для SQLAlchemy-запроса.
+
+    params — значения bindparam, переданные в execute отдельно
+    от запроса (заранее собранные *_STMT); IN-списки раскрываются
+    вместе с ними (construct_expanded_state).
+    """
+    compiled = stmt.compile(dialect=conn.dialect)
+    expanded = compiled.construct_expanded_state(params or None)
+
+    raw = await conn.get_raw_connection()
+    plan = await raw.driver_connection.fetchval(
+        "EXPLAIN (FORMAT JSON) " + expanded.statement,
+        *expanded.positional_parameters,
+    )
+    return json.loads(plan)[0]["Plan"]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    found = set()
+    if "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= used_indexes(child)
+    return found
+
+
+class _EmptyResult:
+    rowcount = 0
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def scalar(self):
+        return None
+
+    def scalar_one(self):
+        return 0
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class ExplainSession:
+    """
+    Подменяет AsyncSession в репозиторной функции:
+    вместо выполнения запроса снимает с него план.
+    """
+
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+        self.plans: list[dict] = []
+
+    async def execute(self, stmt, params=None, *args, **kwargs):
+        self.plans.append(await explain(self.conn, stmt, params))
+        return _EmptyResult()
+
+    async def scalar(self, stmt, params=None, *args, **kwargs):
+        await self.execute(stmt, params)
+        return None
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@dataclass(frozen=True)
+class Check:
+    name: str
+    call: Callable[..., Awaitable]
+    expected: frozenset[str]
+
+
+def build_checks(user_id) -> list[Check]:
+    today = datetime.now(MSC_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return [
+        Check(
+            "get_active_assignment",
+            lambda s: task.get_active_assignment.__wrapped__(user_id, session=s),
+            frozenset({"ix_task_assignments_user_archived_status"}),
+        ),
+        Check(
+            "get_submitted_count",
+            lambda s: task.get_submitted_count.__wrapped__(user_id, session=s),
+            frozenset({"user_stats_pkey"}),
+        ),
+        Check(
+            "archive_rejected_assignments",
+            lambda s: task.archive_rejected_assignments.__wrapped__(
+                session=s,
+                older_than=datetime.now(MSC_TZ) - timedelta(minutes=1),
+            ),
+            frozenset({"ix_task_assignments_unarchived_status_processed"}),
+        ),
+        Check(
+            "export_users_tasks_to_excel (day)",
+            lambda s: admin.export_users_tasks_to_excel.__wrapped__(
+                session=s,
+                date_from=today - timedelta(days=1),
+                date_to=today,
+            ),
+            frozenset({"ix_task_assignments_status_processed"}),
+        ),
+        Check(
+            "get_daily_completed_stats",
+            lambda s: admin.get_daily_completed_stats.__wrapped__(session=s),
+            frozenset({"ix_task_assignments_status_processed"}),
+        ),
+    ]
+
+
+async def collect_plans() -> dict[str, set[str]]:
+    """Индексы, использованные в планах каждой проверки."""
+    used: dict[str, set[str]] = {}
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            for sql in seed_statements(SEED_USERS, SEED_TASKS, SEED_ASSIGNMENTS):
+                await conn.execute(text(sql))
+
+            user_id = await conn.scalar(
+                text("SELECT id FROM users WHERE tg_id = :tg_id"),
+                {"tg_id": SEED_TG_ID_BASE + 1},
+            )
+
+            for check in build_checks(user_id):
+                session = ExplainSession(conn)
+                await check.call(session)
+                used[check.name] = set().union(
+                    *(used_indexes(plan) for plan in session.plans)
+                )
+        finally:
+            await trans.rollback()
+
+    return used
+
+
+@pytest.fixture(scope="module")
+def plans(run_db):
+    return run_db(collect_plans())
+
+
+@pytest.mark.parametrize("check", build_checks(None), ids=lambda check: check.name)
+def test_uses_expected_index(plans, check):
+    used = plans[check.name]
+    assert used & check.expected, (
+        f"{check.name}: used={sorted(used) or '-'} "
+        f"expected one of={sorted(check.expected)}"
+    )
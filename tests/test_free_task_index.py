@@ -0,0 +1,119 @@
+import uuid
+
+import pytest
+
+from app.db.free_task_index import Bucket, FreeTaskIndex
+
+CITY = uuid.UUID(int=1)
+OTHER_CITY = uuid.UUID(int=2)
+
+
+def ids(n):
+    return [uuid.UUID(int=100 + i) for i in range(n)]
+
+
+def assert_consistent(bucket):
+    assert len(bucket.items) == len(bucket.positions)
+    for pos, task_id in enumerate(bucket.items):
+        assert bucket.positions[task_id] == pos
+
+
+@pytest.mark.parametrize("removed", [0, 2, 4])
+def test_bucket_swap_remove(removed):
+    bucket = Bucket()
+    tasks = ids(5)
+    for task_id in tasks:
+        bucket.add(task_id)
+
+    bucket.remove(tasks[removed])
+
+    assert len(bucket) == 4
+    assert tasks[removed] not in bucket.positions
+    assert set(bucket.items) == set(tasks) - {tasks[removed]}
+    if removed != 4:
+        # на место удалённого встаёт последний элемент
+        assert bucket.items[removed] == tasks[4]
+    assert_consistent(bucket)
+
+
+def test_bucket_add_and_remove_are_idempotent():
+    bucket = Bucket()
+    task_id, missing = ids(2)
+    bucket.add(task_id)
+    bucket.add(task_id)
+    bucket.remove(missing)
+    assert bucket.items == [task_id]
+
+    bucket.remove(task_id)
+    bucket.remove(task_id)
+    assert len(bucket) == 0
+    assert_consistent(bucket)
+
+
+@pytest.fixture
+def index():
+    index = FreeTaskIndex()
+    index.add(uuid.UUID(int=1), "yandex", CITY, None)
+    index.add(uuid.UUID(int=2), "yandex", CITY, "M")
+    index.add(uuid.UUID(int=3), "yandex", CITY, "F")
+    index.add(uuid.UUID(int=4), "yandex", None, None)
+    index.add(uuid.UUID(int=5), "yandex", OTHER_CITY, None)
+    index.add(uuid.UUID(int=6), "2gis", CITY, None)
+    return index
+
+
+def candidates(index, source, city_id, gender):
+    buckets = index._candidate_buckets(source, city_id, gender)
+    return {task_id for bucket in buckets for task_id in bucket.items}
+
+
+@pytest.mark.parametrize(
+    ("city_id", "gender", "expected"),
+    [
+        (CITY, None, {1, 2, 3, 4}),
+        (CITY, "M", {1, 2, 4}),
+        (CITY, "F", {1, 3, 4}),
+        (OTHER_CITY, "M", {4, 5}),
+        (None, None, {4}),
+    ],
+)
+def test_candidate_buckets(index, city_id, gender, expected):
+    assert candidates(index, "yandex", city_id, gender) == {
+        uuid.UUID(int=i) for i in expected
+    }
+
+
+def test_pick_returns_only_candidates(index):
+    allowed = {uuid.UUID(int=i) for i in (1, 2, 4)}
+    picked = {index.pick("yandex", CITY, "M") for _ in range(200)}
+    assert picked == allowed
+
+
+def test_pick_respects_exclude(index):
+    exclude = {uuid.UUID(int=i) for i in (1, 4)}
+    for _ in range(50):
+        assert index.pick("yandex", CITY, "M", exclude=exclude, attempts=64) == (
+            uuid.UUID(int=2)
+        )
+
+
+def test_pick_without_candidates(index):
+    assert index.pick("zoon", CITY, None) is None
+    everything = {uuid.UUID(int=i) for i in (4, 5)}
+    assert index.pick("yandex", OTHER_CITY, None, exclude=everything) is None
+
+
+def test_discard_drops_empty_buckets(index):
+    assert index.has_any("2gis", CITY)
+    index.discard(uuid.UUID(int=6))
+    assert not index.has_any("2gis", CITY)
+    assert ("2gis", CITY) not in index._buckets
+    assert len(index) == 5
+
+
+def test_add_moves_task_between_buckets(index):
+    task_id = uuid.UUID(int=2)
+    index.add(task_id, "yandex", CITY, "F")
+    assert task_id not in candidates(index, "yandex", CITY, "M")
+    assert task_id in candidates(index, "yandex", CITY, "F")
+    assert len(index) == 6
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.bot.callbacks.admin import AdminReviewCB
+from app.bot.dialogs.tasks import choose_gender, choose_source, save_photo, tasks_getter
+from app.bot.handlers.admin_review import admin_review_handler
+from app.core.settings import settings
+from app.repository.task import get_current_assignment
+from app.repository.user import get_user_by_tg_id
+from tools.query_budget import (
+    BUDGET_TG_ID,
+    CLEANUP_SQL,
+    SEED_SQL,
+    SOURCE_KEY,
+    FakeBot,
+    FakeDialogManager,
+    execute,
+    fake_callback,
+)
+
+pytestmark = pytest.mark.db
+
+
+@pytest.fixture
+def manager(run_db):
+    """Засеянный пользователь с заданиями источника SOURCE_KEY."""
+    run_db(execute(SEED_SQL))
+    yield FakeDialogManager(BUDGET_TG_ID)
+    run_db(execute(CLEANUP_SQL))
+
+
+async def assign(manager):
+    """Выдаёт задание через диалог (вне замера)."""
+    await choose_source(
+        fake_callback(BUDGET_TG_ID), SimpleNamespace(widget_id=SOURCE_KEY), manager
+    )
+    await choose_gender(
+        fake_callback(BUDGET_TG_ID), SimpleNamespace(widget_id="any"), manager
+    )
+    user = await get_user_by_tg_id(BUDGET_TG_ID)
+    assignment = await get_current_assignment(user.id)
+    assert assignment is not None
+    manager.dialog_data.update(assignment_id=assignment.id, account_name="query_budget")
+    return assignment
+
+
+def photo_message():
+    return SimpleNamespace(
+        photo=[SimpleNamespace(file_id="budget-photo")],
+        bot=FakeBot(),
+        answer=fake_callback(BUDGET_TG_ID).answer,
+    )
+
+
+def test_tasks_window(run_db, manager, query_budget):
+    async def flow():
+        with query_budget(6):
+            await tasks_getter(manager)
+
+    run_db(flow())
+
+
+def test_choose_source(run_db, manager, query_budget):
+    async def flow():
+        with query_budget(4):
+            await choose_source(
+                fake_callback(BUDGET_TG_ID),
+                SimpleNamespace(widget_id=SOURCE_KEY),
+                manager,
+            )
+        assert manager.dialog_data["source"] == SOURCE_KEY
+
+    run_db(flow())
+
+
+def test_submit_report(run_db, manager, query_budget):
+    async def flow():
+        await assign(manager)
+        # отчёт пишет по строке на каждого администратора
+        with query_budget(12 + len(settings.admin_id_list)):
+            await save_photo(photo_message(), None, manager)
+
+    run_db(flow())
+
+
+def test_approve_review(run_db, manager, query_budget):
+    admin_tg_id = (settings.admin_id_list or [1])[0]
+
+    async def flow():
+        assignment = await assign(manager)
+        await save_photo(photo_message(), None, manager)
+        with query_budget(8):
+            await admin_review_handler(
+                fake_callback(admin_tg_id, "budget_admin"),
+                AdminReviewCB(action="approve", assignment_id=str(assignment.id)),
+                FakeBot(),
+                None,
+            )
+
+    run_db(flow())
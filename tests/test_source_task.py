@@ -0,0 +1,38 @@
+import pytest
+
+from app.consts.source_task import source_registry
+
+
+@pytest.mark.parametrize(
+    ("host", "value"),
+    [
+        ("browser.yandex.ru", "Яндекс Браузер"),
+        ("maps.yandex.ru", "Яндекс Карты"),
+        ("yandex.com.tr", "Яндекс Карты"),
+        ("ya.ru", "Яндекс Браузер"),
+        ("m.vk.com", "VK"),
+        ("2gis.ru", "2ГИС"),
+        ("2gis.uz", "2ГИС"),
+        ("2gis.ua", "2ГИС"),
+        ("2gis.cy", "2ГИС"),
+        ("go.2gis.com", "2ГИС"),
+        ("www.google.com", "Google Maps"),
+        ("www.google.com.tr", "Google Maps"),
+        ("maps.app.goo.gl", "Google Maps"),
+        ("zoon.ru", "Zoon"),
+        ("spb.yell.ru", "Yell"),
+        ("MAPS.YANDEX.RU.", "Яндекс Карты"),
+    ],
+)
+def test_match_host(host, value):
+    source = source_registry.match_host(host)
+    assert source is not None
+    assert source.value == value
+
+
+@pytest.mark.parametrize(
+    "host",
+    ["", "example.com", "notvk.com", "google.evil.com", "2gis.example.org"],
+)
+def test_match_host_unknown(host):
+    assert source_registry.match_host(host) is None
@@ -0,0 +1,49 @@
+"""
+Бюджет времени старта бота (см. tools/startup_time.py): импорт
+app.bot.main и время до первого обработанного апдейта, медиана
+из STARTUP_RUNS прогонов в отдельных процессах.
+"""
+
+import statistics
+import sys
+
+import pytest
+
+from tools.startup_time import (
+    FIRST_UPDATE_BUDGET_MS,
+    IMPORT_BUDGET_MS,
+    measure_first_update,
+    measure_import,
+)
+
+STARTUP_RUNS = 3
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 12),
+    reason="app.bot.main требует Python 3.12+ (образ — python:3.13)",
+)
+
+
+def test_import_budget():
+    runs = [measure_import(top=10) for _ in range(STARTUP_RUNS)]
+
+    loaded = set().union(*(packages for _, _, packages in runs))
+    assert not loaded, f"импортированы при старте: {', '.join(sorted(loaded))}"
+
+    import_ms = statistics.median(ms for ms, _, _ in runs)
+    assert import_ms <= IMPORT_BUDGET_MS, (
+        f"import app.bot.main: {import_ms:.0f}ms > {IMPORT_BUDGET_MS:.0f}ms"
+    )
+
+
+@pytest.mark.db
+def test_first_update_budget():
+    runs = [measure_first_update() for _ in range(STARTUP_RUNS)]
+
+    loaded = set().union(*(packages for _, packages in runs))
+    assert not loaded, f"импортированы до первого апдейта: {', '.join(sorted(loaded))}"
+
+    first_ms = statistics.median(ms for ms, _ in runs)
+    assert first_ms <= FIRST_UPDATE_BUDGET_MS, (
+        f"first handled update: {first_ms:.0f}ms > {FIRST_UPDATE_BUDGET_MS:.0f}ms"
+    )
@@ -0,0 +1,179 @@
+"""
+Бенчмарк ночных чисток (delete_unsubmitted_tasks, archive_rejected_assignments).
+
+Засевает --rows назначений (половина ASSIGNED, половина REJECTED
+за вчера, у каждого своё задание), прогоняет обе джобы и печатает
+общее время, пропускную способность и длительность пачек
+(≈ время удержания блокировок). В конце удаляет засеянные данные.
+
+Джобы работают по всей таблице, поэтому запускать только на пустой
+dev-БД (проверяется; --force отключает проверку).
+
+    python -m tools.bench_cleanup --rows 1000000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.repository.task import archive_rejected_assignments, delete_unsubmitted_tasks
+
+BENCH_TG_ID_BASE = 8_000_000_000
+BENCH_USERS = 1000
+
+
+def seed_statements(rows: int) -> list[str]:
+    return [
+        f"""
+        INSERT INTO users (id, tg_id, username, approval_status, is_blocked,
+                           is_channel_verified)
+        SELECT gen_random_uuid(), {BENCH_TG_ID_BASE} + g, 'bench_' || g,
+               'APPROVED', false, true
+        FROM generate_series(1, {BENCH_USERS}) g
+        """,
+        f"""
+        INSERT INTO tasks (id, text, source, link, human_code, created_at)
+        SELECT gen_random_uuid(), 'Bench task ' || g, 'Яндекс Карты',
+               'https://example.com/bench/' || g, 'BENCH-' || g,
+               now() - interval '2 day'
+        FROM generate_series(1, {rows}) g
+        """,
+        f"""
+        INSERT INTO task_assignments (
+            id, user_id, task_id, status, created_at, submitted_at,
+            processed_at, processed_by_admin_id, is_archived
+        )
+        SELECT
+            gen_random_uuid(),
+            u.id,
+            t.id,
+            CASE WHEN t.n % 2 = 0 THEN 'ASSIGNED' ELSE 'REJECTED' END,
+            now() - interval '1 day' - t.n * interval '1 millisecond',
+            CASE WHEN t.n % 2 = 1 THEN now() - interval '1 day' END,
+            CASE WHEN t.n % 2 = 1
+                THEN now() - interval '1 day' - t.n * interval '1 millisecond' END,
+            CASE WHEN t.n % 2 = 1 THEN 1 END,
+            false
+        FROM (
+            SELECT id, substr(human_code, 7)::bigint AS n
+            FROM tasks WHERE human_code LIKE 'BENCH-%'
+        ) t
+        JOIN (
+            SELECT id, row_number() OVER (ORDER BY tg_id) - 1 AS n
+            FROM users WHERE tg_id > {BENCH_TG_ID_BASE}
+        ) u ON u.n = t.n % {BENCH_USERS}
+        """,
+        "ANALYZE tasks",
+        "ANALYZE task_assignments",
+    ]
+
+
+FOREIGN_ROWS_SQL = """
+    SELECT count(*) FROM task_assignments ta
+    JOIN tasks t ON t.id = ta.task_id
+    WHERE ta.status IN ('ASSIGNED', 'REJECTED')
+      AND ta.is_archived = false
+      AND t.human_code NOT LIKE 'BENCH-%'
+"""
+
+CLEANUP_SQL = [
+    "DELETE FROM tasks WHERE human_code LIKE 'BENCH-%'",
+    f"DELETE FROM users WHERE tg_id > {BENCH_TG_ID_BASE}"
+    f" AND tg_id <= {BENCH_TG_ID_BASE + BENCH_USERS}",
+]
+
+
+class BatchTimer(logging.Handler):
+    """Засекает интервалы между логами пачек."""
+
+    def __init__(self, marker: str):
+        super().__init__()
+        self.marker = marker
+        self.marks: list[float] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.getMessage().startswith(self.marker):
+            self.marks.append(time.perf_counter())
+
+
+async def execute(statements: list[str]) -> None:
+    async with engine.begin() as conn:
+        for sql in statements:
+            await conn.execute(text(sql))
+
+
+async def measure(name: str, job, marker: str, batch_size: int) -> None:
+    timer = BatchTimer(marker)
+    repo_logger = logging.getLogger("app.repository.task")
+    repo_logger.addHandler(timer)
+    repo_logger.setLevel(logging.INFO)
+
+    started = time.perf_counter()
+    timer.marks.append(started)
+    count = await job(batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    repo_logger.removeHandler(timer)
+
+    batches = [b - a for a, b in zip(timer.marks, timer.marks[1:])] or [elapsed]
+    print(
+        f"{name}: rows={count} time={elapsed:.2f}s "
+        f"rate={count / elapsed if elapsed else 0:.0f} rows/s "
+        f"batches={len(batches)} "
+        f"batch p50={statistics.median(batches) * 1000:.1f}ms "
+        f"max={max(batches) * 1000:.1f}ms"
+    )
+
+
+async def run(rows: int, batch_size: int, force: bool) -> int:
+    async with engine.connect() as conn:
+        foreign = await conn.scalar(text(FOREIGN_ROWS_SQL))
+    if foreign and not force:
+        print(
+            f"В БД {foreign} чужих ASSIGNED/REJECTED назначений: "
+            "джобы затронут их. Используйте пустую БД или --force."
+        )
+        return 1
+
+    started = time.perf_counter()
+    await execute(seed_statements(rows))
+    print(f"seed: rows={rows} time={time.perf_counter() - started:.2f}s")
+
+    try:
+        await measure(
+            "delete_unsubmitted_tasks",
+            delete_unsubmitted_tasks,
+            "Deleted unsubmitted tasks: batch",
+            batch_size,
+        )
+        await measure(
+            "archive_rejected_assignments",
+            archive_rejected_assignments,
+            "Archived rejected assignments: batch",
+            batch_size,
+        )
+    finally:
+        await execute(CLEANUP_SQL)
+        await engine.dispose()
+
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.rows, args.batch_size, args.force)))
+
+
+if __name__ == "__main__":
+    main()
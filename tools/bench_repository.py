@@ -0,0 +1,475 @@
+"""
+Микробенчмарки репозиторных функций с регрессионными базовыми линиями.
+
+Покрывает публичные функции app/repository/task.py, user.py и admin.py
+на засеянном наборе данных (tools.seed_dataset): для каждой функции —
+p50/p95 латентности и число SQL-запросов (round-trip'ов) за вызов.
+Изменяющие функции выполняются от имени служебного пользователя,
+состояние которого восстанавливается между итерациями (вне замера).
+Глобальные чистки (archive/delete) меняют сам набор данных и
+запускаются только с --include-destructive.
+
+Результаты сравниваются с JSON-базовой линией набора данных
+(tools/baselines/repository-<dataset>.json): регрессия — рост p50 больше
+чем на --threshold (и не меньше --min-delta-ms) или рост числа запросов.
+Код возврата 1 при регрессии. В CI те же сценарии прогоняет pytest
+(tests/test_bench_repository.py, по тесту на функцию); этот инструмент
+сохраняет базовую линию.
+
+    python -m tools.seed_dataset --users 100000
+    python -m tools.bench_repository --dataset 100k --save   # базовая линия
+    python -m tools.bench_repository --dataset 100k          # сравнение
+    python -m tools.bench_repository --dataset 100k --only task.
+    python -m pytest tests/test_bench_repository.py --bench-dataset 100k
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.settings import settings
+from app.db.query_budget import install_query_tracer, trace_queries
+from app.db.session import engine
+from app.models.user import User
+from app.repository import admin, task, user
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+BENCH_TG_ID = 8_400_000_001
+BENCH_NEW_TG_ID = 8_400_000_002
+BENCH_TASKS = 20
+SOURCE = "Яндекс Карты"
+
+MSC_TZ = timezone(timedelta(hours=3))
+
+ITERATIONS = 20
+WARMUP = 3
+THRESHOLD = 0.25
+MIN_DELTA_MS = 1.0
+
+
+@dataclass
+class Fixtures:
+    heavy_user: User  # пользователь с наибольшим числом APPROVED
+    referrer_id: object
+    bench_user: User
+    admin_tg_id: int
+    day_from: datetime
+    day_to: datetime
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[Fixtures, dict], Awaitable]
+    # подготовка итерации (вне замера), возвращает состояние для call
+    setup: Callable[[Fixtures], Awaitable[dict]] | None = None
+    iterations: int | None = None
+    destructive: bool = False
+
+
+@dataclass
+class Result:
+    name: str
+    durations: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        values = sorted(self.durations)
+        return {
+            "p50_ms": round(statistics.median(values) * 1000, 3),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 3),
+            "queries": max(self.queries),
+            "iterations": len(values),
+        }
+
+
+# --- служебное состояние ---
+
+SETUP_SQL = [
+    f"""
+    INSERT INTO users (id, tg_id, username, full_name, gender, approval_status,
+                       is_blocked, is_channel_verified)
+    VALUES (gen_random_uuid(), {BENCH_TG_ID}, 'bench_repo', 'Bench Repository',
+            'M', 'APPROVED', false, true)
+    """,
+    f"INSERT INTO user_stats (user_id) SELECT id FROM users WHERE tg_id = {BENCH_TG_ID}",
+    f"""
+    INSERT INTO tasks (id, text, source, link, human_code, created_at)
+    SELECT gen_random_uuid(), 'Repository bench ' || g, '{SOURCE}',
+           'https://example.com/rbench/' || g, 'RBENCH-' || g, now()
+    FROM generate_series(1, {BENCH_TASKS}) g
+    """,
+]
+
+RESET_SQL = [
+    f"""
+    DELETE FROM task_assignments
+    WHERE user_id = (SELECT id FROM users WHERE tg_id = {BENCH_TG_ID})
+    """,
+    f"""
+    UPDATE user_stats SET approved_count = 0, submitted_count = 0,
+                          week_start = NULL, week_approved_count = 0
+    WHERE user_id = (SELECT id FROM users WHERE tg_id = {BENCH_TG_ID})
+    """,
+    f"""
+    UPDATE users SET approval_status = 'APPROVED', is_blocked = false
+    WHERE tg_id = {BENCH_TG_ID}
+    """,
+    f"""
+    DELETE FROM user_approval_admin_messages
+    WHERE user_id = (SELECT id FROM users WHERE tg_id = {BENCH_TG_ID})
+    """,
+    f"DELETE FROM users WHERE tg_id = {BENCH_NEW_TG_ID}",
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM tasks WHERE human_code LIKE 'RBENCH-%'",
+    *RESET_SQL,
+    f"DELETE FROM users WHERE tg_id = {BENCH_TG_ID}",
+]
+
+
+async def execute(statements: list[str]) -> None:
+    async with engine.begin() as conn:
+        for sql in statements:
+            await conn.execute(text(sql))
+
+
+async def reset(fx: Fixtures) -> dict:
+    await execute(RESET_SQL)
+    return {}
+
+
+async def assigned(fx: Fixtures) -> dict:
+    await reset(fx)
+    assignment = await task.assign_random_task(
+        fx.bench_user, source=SOURCE, required_gender=None
+    )
+    return {"assignment_id": assignment.id}
+
+
+async def submitted(fx: Fixtures) -> dict:
+    state = await assigned(fx)
+    await task.submit_report(
+        assignment_id=state["assignment_id"],
+        account_name="bench",
+        photo_file_id="bench-photo",
+    )
+    return state
+
+
+async def pending(fx: Fixtures) -> dict:
+    await execute(
+        [f"UPDATE users SET approval_status = 'PENDING' WHERE tg_id = {BENCH_TG_ID}"]
+    )
+    return {}
+
+
+async def load_fixtures() -> Fixtures:
+    async with engine.connect() as conn:
+        heavy_tg_id = await conn.scalar(
+            text(
+                """
+                SELECT u.tg_id FROM user_stats s JOIN users u ON u.id = s.user_id
+                ORDER BY s.approved_count DESC LIMIT 1
+                """
+            )
+        )
+        referrer_id = await conn.scalar(
+            text(
+                """
+                SELECT referrer_id FROM users WHERE referrer_id IS NOT NULL
+                GROUP BY referrer_id ORDER BY count(*) DESC LIMIT 1
+                """
+            )
+        )
+
+    heavy_user = await user.get_user_by_tg_id(heavy_tg_id)
+    bench_user = await user.get_user_by_tg_id(BENCH_TG_ID)
+    today = datetime.now(MSC_TZ).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return Fixtures(
+        heavy_user=heavy_user,
+        referrer_id=referrer_id or heavy_user.id,
+        bench_user=bench_user,
+        admin_tg_id=(settings.admin_id_list or [1])[0],
+        day_from=(today - timedelta(days=1)).astimezone(timezone.utc),
+        day_to=today.astimezone(timezone.utc),
+    )
+
+
+# --- сценарии ---
+
+
+def cases() -> list[Case]:
+    h = lambda fx: fx.heavy_user  # noqa: E731
+
+    return [
+        # task.py
+        Case("task.get_active_assignment",
+             lambda fx, s: task.get_active_assignment(h(fx).id)),
+        Case("task.get_current_assignment",
+             lambda fx, s: task.get_current_assignment(h(fx).id)),
+        Case("task.get_submitted_count",
+             lambda fx, s: task.get_submitted_count(h(fx).id)),
+        Case("task.has_available_tasks_for_source",
+             lambda fx, s: task.has_available_tasks_for_source(h(fx), source=SOURCE)),
+        Case("task.assign_random_task",
+             lambda fx, s: task.assign_random_task(
+                 fx.bench_user, source=SOURCE, required_gender=None),
+             setup=reset),
+        Case("task.submit_report",
+             lambda fx, s: task.submit_report(
+                 assignment_id=s["assignment_id"],
+                 account_name="bench",
+                 photo_file_id="bench-photo"),
+             setup=assigned),
+        Case("task.process_assignment",
+             lambda fx, s: task.process_assignment(
+                 s["assignment_id"], "approve", fx.admin_tg_id),
+             setup=submitted),
+        Case("task.review_assignment",
+             lambda fx, s: task.review_assignment(
+                 assignment_id=s["assignment_id"],
+                 admin_tg_id=fx.admin_tg_id,
+                 approve=True),
+             setup=submitted),
+        Case("task.save_assignment_report_message_id",
+             lambda fx, s: task.save_assignment_report_message_id(
+                 assignment_id=s["assignment_id"], message_id=1),
+             setup=assigned),
+        Case("task.archive_rejected_assignments",
+             lambda fx, s: task.archive_rejected_assignments(),
+             destructive=True),
+        Case("task.get_avg_execution_time",
+             lambda fx, s: task.get_avg_execution_time()),
+        Case("task.get_tasks_statistics",
+             lambda fx, s: task.get_tasks_statistics(), iterations=5),
+        Case("task.get_submitted_assignments",
+             lambda fx, s: task.get_submitted_assignments(h(fx).id)),
+        Case("task.delete_unsubmitted_tasks",
+             lambda fx, s: task.delete_unsubmitted_tasks(),
+             destructive=True),
+        Case("task.count_assigned_tasks",
+             lambda fx, s: task.count_assigned_tasks()),
+        Case("task.get_assigned_tasks_page",
+             lambda fx, s: task.get_assigned_tasks_page(direction="last", page_size=5)),
+        # user.py
+        Case("user.get_user_access",
+             lambda fx, s: user.get_user_access(h(fx).tg_id)),
+        Case("user.get_user_by_tg_id",
+             lambda fx, s: user.get_user_by_tg_id(h(fx).tg_id)),
+        Case("user.get_user_by_id",
+             lambda fx, s: user.get_user_by_id(h(fx).id)),
+        Case("user.is_user_blocked",
+             lambda fx, s: user.is_user_blocked(tg_id=h(fx).tg_id)),
+        Case("user.get_user_id_by_tg_id",
+             lambda fx, s: user.get_user_id_by_tg_id(h(fx).tg_id)),
+        Case("user.create_user",
+             lambda fx, s: user.create_user(
+                 tg_id=BENCH_NEW_TG_ID, username="bench_new",
+                 referrer_id=fx.bench_user.id),
+             setup=reset),
+        Case("user.update_user_profile",
+             lambda fx, s: user.update_user_profile(
+                 fx.bench_user.id, full_name="Bench Repository",
+                 phone="+70000000000", city_id=h(fx).city_id, gender="M"),
+             setup=reset),
+        Case("user.get_profile_data",
+             lambda fx, s: user.get_profile_data(h(fx).tg_id)),
+        Case("user.count_approved_tasks",
+             lambda fx, s: user.count_approved_tasks(h(fx).id)),
+        Case("user.get_approved_tasks_page",
+             lambda fx, s: user.get_approved_tasks_page(
+                 h(fx).id, direction="last", page_size=5)),
+        Case("user.count_referrals",
+             lambda fx, s: user.count_referrals(fx.referrer_id)),
+        Case("user.get_referrals_page",
+             lambda fx, s: user.get_referrals_page(
+                 fx.referrer_id, direction="last", page_size=5)),
+        Case("user.approve_user",
+             lambda fx, s: user.approve_user(
+                 tg_id=BENCH_TG_ID, admin_tg_id=fx.admin_tg_id),
+             setup=pending),
+        Case("user.reject_user",
+             lambda fx, s: user.reject_user(
+                 tg_id=BENCH_TG_ID, admin_tg_id=fx.admin_tg_id),
+             setup=pending),
+        Case("user.save_approval_admin_message",
+             lambda fx, s: user.save_approval_admin_message(
+                 user_id=fx.bench_user.id, admin_tg_id=fx.admin_tg_id, message_id=1)),
+        Case("user.get_approval_messages_by_user",
+             lambda fx, s: user.get_approval_messages_by_user(user_id=h(fx).id)),
+        Case("user.get_user_tg_id",
+             lambda fx, s: user.get_user_tg_id(user_id=h(fx).id)),
+        Case("user.mark_user_channel_verified",
+             lambda fx, s: user.mark_user_channel_verified(BENCH_TG_ID)),
+        # admin.py
+        Case("admin.export_users_to_excel",
+             lambda fx, s: admin.export_users_to_excel(), iterations=3),
+        Case("admin.collect_users_tasks_rows",
+             lambda fx, s: admin.collect_users_tasks_rows(
+                 date_from=fx.day_from, date_to=fx.day_to), iterations=5),
+        Case("admin.export_users_tasks_to_excel",
+             lambda fx, s: admin.export_users_tasks_to_excel(
+                 date_from=fx.day_from, date_to=fx.day_to), iterations=3),
+        Case("admin.get_user_by_tg_id",
+             lambda fx, s: admin.get_user_by_tg_id(tg_id=h(fx).tg_id)),
+        Case("admin.count_user_tasks",
+             lambda fx, s: admin.count_user_tasks(tg_id=h(fx).tg_id, period="all")),
+        Case("admin.get_user_tasks_page",
+             lambda fx, s: admin.get_user_tasks_page(
+                 tg_id=h(fx).tg_id, period="all", direction="last")),
+        Case("admin.export_single_user_tasks_to_excel",
+             lambda fx, s: admin.export_single_user_tasks_to_excel(
+                 tg_id=h(fx).tg_id, period="all"), iterations=5),
+        Case("admin.set_user_blocked",
+             lambda fx, s: admin.set_user_blocked(tg_id=BENCH_TG_ID, blocked=False)),
+        Case("admin.get_daily_completed_stats",
+             lambda fx, s: admin.get_daily_completed_stats()),
+        Case("admin.get_top_5_users",
+             lambda fx, s: admin.get_top_5_users()),
+        Case("admin.export_available_tasks_to_excel",
+             lambda fx, s: admin.export_available_tasks_to_excel(), iterations=3),
+        Case("admin.get_users_statistics",
+             lambda fx, s: admin.get_users_statistics()),
+        Case("admin.get_user_weekly_approved_count",
+             lambda fx, s: admin.get_user_weekly_approved_count(user_id=h(fx).id)),
+    ]
+
+
+async def measure(case: Case, fx: Fixtures, iterations: int, warmup: int) -> Result:
+    result = Result(case.name)
+    total = case.iterations or iterations
+    for i in range(warmup + total):
+        state = await case.setup(fx) if case.setup else {}
+        with trace_queries(case.name) as trace:
+            started = time.perf_counter()
+            await case.call(fx, state)
+            elapsed = time.perf_counter() - started
+        if i >= warmup:
+            result.durations.append(elapsed)
+            result.queries.append(trace.count)
+    return result
+
+
+def compare(
+    name: str,
+    current: dict,
+    base: dict | None,
+    threshold: float = THRESHOLD,
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> str | None:
+    """Описание регрессии относительно базовой линии или None."""
+    if base is None:
+        return None
+    problems = []
+    delta = current["p50_ms"] - base["p50_ms"]
+    if delta > min_delta_ms and current["p50_ms"] > base["p50_ms"] * (1 + threshold):
+        problems.append(f"p50 {base['p50_ms']:.2f} → {current['p50_ms']:.2f} ms")
+    if current["queries"] > base["queries"]:
+        problems.append(f"queries {base['queries']} → {current['queries']}")
+    return f"{name}: " + ", ".join(problems) if problems else None
+
+
+def baseline_path(dataset: str) -> Path:
+    return BASELINES_DIR / f"repository-{dataset}.json"
+
+
+def load_baseline(dataset: str) -> dict[str, dict]:
+    """Сохранённые результаты набора (пусто, если базовой линии нет)."""
+    path = baseline_path(dataset)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+async def run(args) -> int:
+    path = baseline_path(args.dataset)
+    baseline = load_baseline(args.dataset)
+
+    install_query_tracer()
+    await execute(SETUP_SQL)
+    results: dict[str, dict] = {}
+    regressions: list[str] = []
+
+    try:
+        fx = await load_fixtures()
+        print(f"{'':44} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'base p50':>9}")
+        for case in cases():
+            if args.only and args.only not in case.name:
+                continue
+            if case.destructive and not args.include_destructive:
+                continue
+
+            summary = (await measure(case, fx, args.iterations, args.warmup)).summary()
+            results[case.name] = summary
+            base = baseline.get(case.name)
+            base_p50 = f"{base['p50_ms']:9.2f}" if base else f"{'—':>9}"
+            print(
+                f"{case.name:44} {summary['p50_ms']:9.2f} {summary['p95_ms']:9.2f} "
+                f"{summary['queries']:8} {base_p50}"
+            )
+            problem = compare(
+                case.name, summary, base, args.threshold, args.min_delta_ms
+            )
+            if problem:
+                regressions.append(problem)
+    finally:
+        await execute(CLEANUP_SQL)
+        await engine.dispose()
+
+    if args.save:
+        BASELINES_DIR.mkdir(parents=True, exist_ok=True)
+        merged = {**baseline, **results}
+        path.write_text(
+            json.dumps(
+                {
+                    "dataset": args.dataset,
+                    "saved_at": datetime.now(timezone.utc).isoformat(),
+                    "results": merged,
+                },
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        print(f"\nbaseline saved: {path}")
+        return 0
+
+    if regressions:
+        print("\nРегрессии:")
+        for problem in regressions:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dataset", required=True, help="метка набора: 10k, 1m, …")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS)
+    parser.add_argument("--only", help="подстрока имени функции")
+    parser.add_argument("--include-destructive", action="store_true")
+    parser.add_argument("--save", action="store_true")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
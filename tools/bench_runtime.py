@@ -0,0 +1,70 @@
+"""
+Пропускная способность бота со стандартным asyncio/json и с uvloop/orjson.
+
+Запускает tools.replay --wire (апдейты и ответы Bot API проходят
+через JSON сессии, как в проде) в отдельных процессах для каждого
+режима — UVLOOP / FAST_JSON задаются переменными окружения — и
+сравнивает апдейты в секунду с режимом по умолчанию. Аргументы
+после -- передаются в tools.replay.
+
+    python -m tools.bench_runtime
+    python -m tools.bench_runtime --runs 3 -- --users 300 --api-latency-ms 0
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODES = {
+    "default": {"UVLOOP": "false", "FAST_JSON": "false"},
+    "orjson": {"UVLOOP": "false", "FAST_JSON": "true"},
+    "uvloop": {"UVLOOP": "true", "FAST_JSON": "false"},
+    "uvloop+orjson": {"UVLOOP": "true", "FAST_JSON": "true"},
+}
+
+SUMMARY_RE = re.compile(r"wall=([\d.]+)s updates=(\d+)")
+
+
+def run_replay(env: dict[str, str], replay_args: list[str]) -> float:
+    """Один прогон tools.replay: апдейтов в секунду."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "tools.replay", "--wire", *replay_args],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **env},
+    )
+    match = SUMMARY_RE.search(proc.stdout)
+    if proc.returncode != 0 or match is None:
+        output = proc.stdout[-2000:] + proc.stderr[-2000:]
+        raise RuntimeError(f"replay failed ({proc.returncode}):\n{output}")
+    wall, updates = float(match.group(1)), int(match.group(2))
+    return updates / wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("replay_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    replay_args = [a for a in args.replay_args if a != "--"]
+
+    results: dict[str, float] = {}
+    for mode in args.modes:
+        rates = [run_replay(MODES[mode], replay_args) for _ in range(args.runs)]
+        results[mode] = statistics.median(rates)
+        runs = " ".join(f"{rate:.1f}" for rate in rates)
+        print(f"{mode:16} {results[mode]:8.1f} updates/s  (runs: {runs})", flush=True)
+
+    base = results.get("default")
+    if base:
+        print()
+        for mode, rate in results.items():
+            print(f"{mode:16} {rate / base:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
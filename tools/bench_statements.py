@@ -0,0 +1,197 @@
+"""
+Накладные расходы Python на вызов горячих запросов репозитория.
+
+Для каждого горячего запроса сравнивается прежний вариант
+(select(...) строится на каждом вызове) с заранее собранным
+*_STMT из app.repository (bindparam, ключ кеша компиляции
+запоминается на объекте).
+
+Без --db измеряется только сторона Python, которая отличается
+у двух вариантов: построение конструкции и вычисление ключа кеша
+компиляции (то, что Session.execute делает до поиска в кеше).
+С --db — полный session.execute на локальной БД: разница между
+вариантами и есть экономия на вызове, а абсолютное время показывает
+её долю относительно самого индексного запроса.
+
+    python -m tools.bench_statements
+    python -m tools.bench_statements --iterations 50000
+    python -m tools.bench_statements --db --iterations 2000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
+
+from app.models.task_assignment import TaskAssignment, TaskAssignmentStatus
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.repository.task import (
+    ACTIVE_ASSIGNMENT_STMT,
+    CURRENT_ASSIGNMENT_STMT,
+    SUBMITTED_COUNT_STMT,
+)
+from app.repository.user import (
+    USER_ACCESS_STMT,
+    USER_BY_TG_ID_STMT,
+    USER_ID_BY_TG_ID_STMT,
+)
+
+
+# Прежние (построение на каждом вызове) варианты запросов.
+def inline_user_access(tg_id, user_id):
+    return select(
+        User.id,
+        User.full_name,
+        User.approval_status,
+        User.is_blocked,
+        User.is_channel_verified,
+    ).where(User.tg_id == tg_id)
+
+
+def inline_user_by_tg_id(tg_id, user_id):
+    return (
+        select(User)
+        .where(User.tg_id == tg_id)
+        .options(
+            selectinload(User.referrer),
+            selectinload(User.city),
+        )
+    )
+
+
+def inline_user_id_by_tg_id(tg_id, user_id):
+    return select(User.id).where(User.tg_id == tg_id)
+
+
+def inline_active_assignment(tg_id, user_id):
+    return (
+        select(TaskAssignment)
+        .where(
+            TaskAssignment.user_id == user_id,
+            TaskAssignment.is_archived.is_(False),
+            TaskAssignment.status.in_(
+                [
+                    TaskAssignmentStatus.ASSIGNED,
+                    TaskAssignmentStatus.SUBMITTED,
+                ]
+            ),
+        )
+        .options(selectinload(TaskAssignment.task))
+    )
+
+
+def inline_current_assignment(tg_id, user_id):
+    return (
+        select(TaskAssignment)
+        .where(
+            TaskAssignment.user_id == user_id,
+            TaskAssignment.is_archived.is_(False),
+            TaskAssignment.status == TaskAssignmentStatus.ASSIGNED,
+        )
+        .options(selectinload(TaskAssignment.task))
+    )
+
+
+def inline_submitted_count(tg_id, user_id):
+    return select(UserStats.submitted_count).where(UserStats.user_id == user_id)
+
+
+# имя → (прежний вариант, заранее собранный, параметры по tg_id/user_id)
+CASES = {
+    "user_access": (inline_user_access, USER_ACCESS_STMT, "tg_id"),
+    "user_by_tg_id": (inline_user_by_tg_id, USER_BY_TG_ID_STMT, "tg_id"),
+    "user_id_by_tg_id": (inline_user_id_by_tg_id, USER_ID_BY_TG_ID_STMT, "tg_id"),
+    "active_assignment": (inline_active_assignment, ACTIVE_ASSIGNMENT_STMT, "user_id"),
+    "current_assignment": (inline_current_assignment, CURRENT_ASSIGNMENT_STMT, "user_id"),
+    "submitted_count": (inline_submitted_count, SUBMITTED_COUNT_STMT, "user_id"),
+}
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def bench_python(iterations: int, tg_id: int, user_id: uuid.UUID) -> list[tuple]:
+    rows = []
+    for name, (inline, prebuilt, _) in CASES.items():
+        rows.append(
+            (
+                name,
+                per_call_us(
+                    lambda: inline(tg_id, user_id)._generate_cache_key(), iterations
+                ),
+                per_call_us(prebuilt._generate_cache_key, iterations),
+            )
+        )
+    return rows
+
+
+async def bench_db(iterations: int) -> list[tuple]:
+    from app.db.session import SessionLocal, engine
+
+    rows = []
+    try:
+        async with SessionLocal() as session:
+            row = (
+                await session.execute(text("SELECT tg_id, id FROM users LIMIT 1"))
+            ).first()
+            tg_id, user_id = row if row else (0, uuid.UUID(int=0))
+            params = {"tg_id": tg_id, "user_id": user_id}
+
+            for name, (inline, prebuilt, param) in CASES.items():
+                # первый вызов компилирует и готовит запрос — не в замер
+                await session.execute(inline(tg_id, user_id))
+                await session.execute(prebuilt, {param: params[param]})
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    (await session.execute(inline(tg_id, user_id))).all()
+                inline_us = (time.perf_counter() - started) / iterations * 1e6
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    (await session.execute(prebuilt, {param: params[param]})).all()
+                prebuilt_us = (time.perf_counter() - started) / iterations * 1e6
+
+                rows.append((name, inline_us, prebuilt_us))
+            await session.rollback()
+    finally:
+        await engine.dispose()
+    return rows
+
+
+def report(title: str, rows: list[tuple]) -> None:
+    print(f"\n{title}")
+    print(f"{'':22} {'inline us':>10} {'prebuilt us':>12} {'saved us':>9} {'x':>6}")
+    for name, inline_us, prebuilt_us in rows:
+        print(
+            f"{name:22} {inline_us:10.1f} {prebuilt_us:12.1f} "
+            f"{inline_us - prebuilt_us:9.1f} {inline_us / prebuilt_us:6.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument(
+        "--db", action="store_true", help="полный session.execute на локальной БД"
+    )
+    args = parser.parse_args()
+
+    report(
+        "build + compiled cache key (per call)",
+        bench_python(args.iterations, 1, uuid.UUID(int=1)),
+    )
+    if args.db:
+        report("session.execute (per call)", asyncio.run(bench_db(args.iterations)))
+
+
+if __name__ == "__main__":
+    main()
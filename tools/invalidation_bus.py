@@ -0,0 +1,140 @@
+"""
+Проверка шины инвалидации кешей между двумя процессами.
+
+Запускает дочерний процесс-подписчик на той же БД, публикует
+из текущего процесса --events событий CacheKind.USER (каждое —
+в своей транзакции, как это делают репозиторные функции) и ждёт,
+пока подписчик подтвердит получение всех. Также проверяет, что
+событие из откаченной транзакции не доставляется. Печатает задержку
+доставки (commit → callback подписчика) p50/p95/max.
+
+Код возврата 1, если события потеряны или пришло лишнее.
+
+    python -m tools.invalidation_bus
+    python -m tools.invalidation_bus --events 500
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.db.invalidation import CacheKind, invalidation_bus
+from app.db.session import SessionLocal, engine
+
+# ключи событий не пересекаются с реальными tg_id
+KEY_BASE = 8_500_000_000
+ROLLBACK_KEY = KEY_BASE - 1
+
+
+async def subscriber(events: int, timeout: float) -> int:
+    """Дочерний процесс: печатает JSON-строку на каждое полученное событие."""
+    received = 0
+    done = asyncio.Event()
+
+    def on_event(key: str | None) -> None:
+        nonlocal received
+        if key is None:  # сброс при (пере)подключении шины
+            return
+        print(json.dumps({"key": key, "at": time.time()}), flush=True)
+        if key != str(ROLLBACK_KEY):
+            received += 1
+        if received >= events:
+            done.set()
+
+    invalidation_bus.subscribe(CacheKind.USER, on_event)
+    await invalidation_bus.start()
+    print(json.dumps({"ready": True}), flush=True)
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+        # даём шанс прийти событию из откаченной транзакции
+        await asyncio.sleep(1.0)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await invalidation_bus.stop()
+    return 0
+
+
+async def publisher(events: int, timeout: float) -> int:
+    child = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "tools.invalidation_bus",
+        "--role",
+        "subscriber",
+        "--events",
+        str(events),
+        "--timeout",
+        str(timeout),
+        stdout=asyncio.subprocess.PIPE,
+    )
+
+    async def read_line() -> dict | None:
+        line = await child.stdout.readline()
+        return json.loads(line) if line else None
+
+    first = await asyncio.wait_for(read_line(), timeout)
+    if not first or not first.get("ready"):
+        print("subscriber failed to start")
+        return 1
+
+    committed_at: dict[str, float] = {}
+    try:
+        async with SessionLocal() as session:
+            await invalidation_bus.publish(CacheKind.USER, ROLLBACK_KEY, session=session)
+            await session.rollback()
+
+        for n in range(events):
+            key = str(KEY_BASE + n)
+            async with SessionLocal() as session:
+                await invalidation_bus.publish(CacheKind.USER, key, session=session)
+                await session.commit()
+            committed_at[key] = time.time()
+
+        delays: list[float] = []
+        unexpected: list[str] = []
+        while True:
+            event = await asyncio.wait_for(read_line(), timeout + 5)
+            if event is None:
+                break
+            key = event["key"]
+            if key not in committed_at:
+                unexpected.append(key)
+                continue
+            delays.append(event["at"] - committed_at.pop(key))
+    finally:
+        await child.wait()
+        await engine.dispose()
+
+    delays.sort()
+    if delays:
+        print(
+            f"delivered={len(delays)}/{events} "
+            f"p50={delays[len(delays) // 2] * 1000:.1f}ms "
+            f"p95={delays[int(len(delays) * 0.95)] * 1000:.1f}ms "
+            f"max={delays[-1] * 1000:.1f}ms"
+        )
+    if committed_at:
+        print(f"lost: {len(committed_at)} events")
+    if unexpected:
+        print(f"unexpected: {unexpected}")
+    return 1 if committed_at or unexpected else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--role", choices=["publisher", "subscriber"], default="publisher"
+    )
+    args = parser.parse_args()
+
+    run = subscriber if args.role == "subscriber" else publisher
+    sys.exit(asyncio.run(run(args.events, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
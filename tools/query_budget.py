@@ -0,0 +1,219 @@
+"""
+Проверка бюджета SQL-запросов ключевых сценариев бота.
+
+Прогоняет реальные хендлеры и геттеры диалогов (Telegram заменён
+заглушками, БД — настоящая dev-БД) под assert_max_queries:
+открытие окна заданий, выбор источника, получение задания, отправка
+отчёта, одобрение проверки и топ исполнителей в аналитике. Засеянные
+пользователь и задания удаляются в конце.
+
+В CI бюджеты проверяют тесты tests/test_query_budget.py (маркер db);
+этот инструмент — ручной прогон всех сценариев подряд с выводом
+выполненных запросов. Код возврата 1, если сценарий вышел за бюджет.
+
+    python -m tools.query_budget
+    python -m tools.query_budget --verbose   # все запросы сценариев
+"""
+
+import argparse
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from sqlalchemy import text
+
+from app.bot.callbacks.admin import AdminReviewCB
+from app.bot.dialogs.admin import analytics_top_getter
+from app.bot.dialogs.tasks import choose_gender, choose_source, save_photo, tasks_getter
+from app.bot.handlers.admin_review import admin_review_handler
+from app.core.settings import settings
+from app.db.query_budget import QueryBudgetExceeded, assert_max_queries
+from app.db.session import engine
+from app.repository.task import get_current_assignment
+from app.repository.user import get_user_by_tg_id
+
+BUDGET_TG_ID = 8_100_000_001
+BUDGET_TASKS = 5
+SOURCE_KEY = "yandex"
+SOURCE_VALUE = "Яндекс Карты"
+
+
+def budgets() -> dict[str, int]:
+    # верхние границы числа запросов на сценарий;
+    # отправка отчёта пишет по строке на каждого администратора
+    return {
+        "tasks_window": 6,
+        "choose_source": 4,
+        "choose_gender": 8,
+        "submit_report": 12 + len(settings.admin_id_list),
+        "approve_review": 8,
+        "analytics_top": 9,
+    }
+
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, tg_id, username, full_name, approval_status,
+                       is_blocked, is_channel_verified)
+    VALUES (gen_random_uuid(), {BUDGET_TG_ID}, 'query_budget', 'Query Budget',
+            'APPROVED', false, true)
+    """,
+    """
+    INSERT INTO user_stats (user_id)
+    SELECT id FROM users WHERE tg_id = :tg_id
+    ON CONFLICT DO NOTHING
+    """,
+    f"""
+    INSERT INTO tasks (id, text, source, link, human_code, created_at)
+    SELECT gen_random_uuid(), 'Budget task ' || g, :source,
+           'https://example.com/budget/' || g, 'QBUD-' || g, now()
+    FROM generate_series(1, {BUDGET_TASKS}) g
+    """,
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM tasks WHERE human_code LIKE 'QBUD-%'",
+    "DELETE FROM users WHERE tg_id = :tg_id",
+]
+
+
+class FakeBot:
+    """Bot без сети: любой метод Bot API возвращает заглушку сообщения."""
+
+    def __getattr__(self, name):
+        async def method(*args, **kwargs):
+            return SimpleNamespace(message_id=1)
+
+        return method
+
+
+class FakeDialogManager:
+    def __init__(self, tg_id: int):
+        self.event = SimpleNamespace(from_user=SimpleNamespace(id=tg_id))
+        self.dialog_data: dict = {}
+
+    async def switch_to(self, *args, **kwargs):
+        pass
+
+    async def start(self, *args, **kwargs):
+        pass
+
+    async def done(self, *args, **kwargs):
+        pass
+
+
+async def _answer(*args, **kwargs):
+    pass
+
+
+def fake_callback(tg_id: int, username: str | None = None):
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=tg_id, username=username),
+        message=SimpleNamespace(html_text="📤 <b>Новый отчёт</b>"),
+        answer=_answer,
+    )
+
+
+async def execute(statements: list[str]) -> None:
+    params = {"tg_id": BUDGET_TG_ID, "source": SOURCE_VALUE}
+    async with engine.begin() as conn:
+        for sql in statements:
+            await conn.execute(text(sql), params)
+
+
+async def run_flows(verbose: bool) -> list[str]:
+    bot = FakeBot()
+    manager = FakeDialogManager(BUDGET_TG_ID)
+    admin_tg_id = (settings.admin_id_list or [1])[0]
+    limits = budgets()
+    failures: list[str] = []
+
+    async def flow(name: str, coro_factory):
+        try:
+            with assert_max_queries(limits[name], name) as trace:
+                await coro_factory()
+        except QueryBudgetExceeded as e:
+            failures.append(str(e))
+            print(f"FAIL {name}: {trace.count} > {limits[name]}")
+        else:
+            print(f"ok   {name}: {trace.count}/{limits[name]} queries")
+        if verbose:
+            print(trace.summary())
+            for statement, duration in trace.statements:
+                print(f"    {duration * 1000:7.2f}ms {' '.join(statement.split())[:140]}")
+
+    await flow("tasks_window", lambda: tasks_getter(manager))
+    await flow(
+        "choose_source",
+        lambda: choose_source(
+            fake_callback(BUDGET_TG_ID),
+            SimpleNamespace(widget_id=SOURCE_KEY),
+            manager,
+        ),
+    )
+    await flow(
+        "choose_gender",
+        lambda: choose_gender(
+            fake_callback(BUDGET_TG_ID),
+            SimpleNamespace(widget_id="any"),
+            manager,
+        ),
+    )
+
+    user = await get_user_by_tg_id(BUDGET_TG_ID)
+    assignment = await get_current_assignment(user.id)
+    if assignment is None:
+        raise RuntimeError("Сценарий choose_gender не выдал задание")
+
+    manager.dialog_data.update(
+        assignment_id=assignment.id,
+        account_name="query_budget",
+    )
+    photo_message = SimpleNamespace(
+        photo=[SimpleNamespace(file_id="budget-photo")],
+        bot=bot,
+        answer=_answer,
+    )
+    await flow("submit_report", lambda: save_photo(photo_message, None, manager))
+    await flow(
+        "approve_review",
+        lambda: admin_review_handler(
+            fake_callback(admin_tg_id, "budget_admin"),
+            AdminReviewCB(action="approve", assignment_id=str(assignment.id)),
+            bot,
+            None,
+        ),
+    )
+    await flow("analytics_top", lambda: analytics_top_getter(manager))
+
+    return failures
+
+
+async def run(verbose: bool) -> int:
+    await execute(SEED_SQL)
+    try:
+        # первое соединение пула выполняет служебные запросы диалекта —
+        # прогреваем его до начала замеров
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        failures = await run_flows(verbose)
+    finally:
+        await execute(CLEANUP_SQL)
+        await engine.dispose()
+
+    for failure in failures:
+        print(f"\n{failure}")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args.verbose)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,558 @@
+"""
+Нагрузочный прогон бота: апдейты идут через настоящий Dispatcher.
+
+Dispatcher собирается app.bot.main.create_dispatcher() — те же роутеры,
+диалоги и middleware, что в проде. Bot API заменён FakeTelegramSession:
+ответы строятся локально с настраиваемой задержкой, клавиатуры
+отправленных сообщений запоминаются, и виртуальные пользователи
+«нажимают» кнопки по их настоящему callback_data. БД — локальный
+Postgres, заранее заполненный до реалистичных объёмов; свои
+пользователи и задания засеваются перед прогоном и удаляются после.
+
+Синтетический сценарий: регистрация → (взятие задания → отчёт) × rounds
+для каждого пользователя → проверка всех отчётов администратором →
+выгрузки. Печатает пропускную способность и p50/p95/p99 по сценариям
+и по отдельным апдейтам. В длительность входят UX-паузы хендлеров
+(asyncio.sleep) — они одинаковы от прогона к прогону.
+
+    python -m tools.replay --users 200 --rounds 3 --concurrency 50
+    python -m tools.replay --replay updates.jsonl   # записанный поток
+    python -m tools.replay --wire   # JSON апдейтов и Bot API, как в проде
+
+Формат --replay: строка на апдейт, JSON объекта Update или
+{"flow": "<метка>", "update": {...}}; апдейты одного чата идут
+по порядку, разные чаты — параллельно.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import get_args
+
+from aiogram.client.session.base import BaseSession
+from aiogram.types import (
+    Chat,
+    ChatMemberMember,
+    Document,
+    InlineKeyboardMarkup,
+    Message,
+    PhotoSize,
+    TelegramObject,
+    Update,
+    User,
+)
+from aiogram_dialog.utils import CB_SEP
+from sqlalchemy import text
+
+from app.bot.main import create_bot, create_dispatcher
+from app.core import runtime
+from app.core.runtime import json_codecs
+from app.core.settings import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+REPLAY_TG_ID_BASE = 8_200_000_000
+REPLAY_REG_TG_ID_BASE = 8_300_000_000
+REVIEW_PREFIX = "review:approve:"
+
+
+class FlowError(Exception):
+    """Сценарий не смог продолжиться (нет ожидаемой кнопки и т.п.)."""
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Сессия Bot API без сети: каждый вызов ждёт latency (upload_latency
+    для отправки файлов) и возвращает правдоподобный объект ответа.
+    """
+
+    UPLOAD_METHODS = {"sendDocument", "sendPhoto"}
+
+    def __init__(
+        self, latency: float = 0.0, upload_latency: float = 0.0, wire: bool = False
+    ):
+        json_loads, json_dumps = json_codecs()
+        super().__init__(json_loads=json_loads, json_dumps=json_dumps)
+        self.latency = latency
+        self.upload_latency = upload_latency
+        # как AiohttpSession: параметры через prepare_value (json_dumps),
+        # ответ — JSON через json_loads и check_response
+        self.wire = wire
+        self.calls: dict[str, int] = defaultdict(int)
+        self.keyboards: dict[int, deque] = defaultdict(lambda: deque(maxlen=50))
+        self.reviews: asyncio.Queue[str] = asyncio.Queue()
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        pass
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536,
+                             raise_for_status=True):
+        yield b""
+
+    async def make_request(self, bot, method, timeout=None):
+        name = method.__api_method__
+        self.calls[name] += 1
+        delay = self.upload_latency if name in self.UPLOAD_METHODS else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+
+        result = self._result(bot, method)
+        if not self.wire:
+            return result
+
+        files = {}
+        for value in method.model_dump(warnings=False).values():
+            self.prepare_value(value, bot=bot, files=files)
+        # ответ сервера кодируется stdlib json в обоих режимах,
+        # разбирает его json_loads сессии
+        if isinstance(result, TelegramObject):
+            result = result.model_dump(mode="json", exclude_none=True, by_alias=True)
+        content = json.dumps({"ok": True, "result": result})
+        return self.check_response(
+            bot=bot, method=method, status_code=200, content=content
+        ).result
+
+    def _result(self, bot, method):
+        name = method.__api_method__
+        returning = get_args(method.__returning__) or (method.__returning__,)
+        if Message in returning:
+            return self._message(bot, method)
+        if name == "getMe":
+            return User(id=bot.id, is_bot=True, first_name="replay")
+        if name == "getChatMember":
+            return ChatMemberMember(
+                user=User(id=method.user_id, is_bot=False, first_name="replay")
+            )
+        if bool in returning:
+            return True
+        return None
+
+    def _message(self, bot, method) -> Message:
+        chat_id = int(method.chat_id)
+        message_id = getattr(method, "message_id", None) or next(self._message_ids)
+        extra = {}
+
+        if method.__api_method__ == "sendDocument":
+            n = next(self._file_ids)
+            extra["document"] = Document(file_id=f"doc-{n}", file_unique_id=f"u{n}")
+        elif method.__api_method__ == "sendPhoto":
+            n = next(self._file_ids)
+            extra["photo"] = [
+                PhotoSize(file_id=f"photo-{n}", file_unique_id=f"u{n}", width=1, height=1)
+            ]
+
+        markup = getattr(method, "reply_markup", None)
+        if isinstance(markup, InlineKeyboardMarkup):
+            self._remember(chat_id, message_id, markup)
+            extra["reply_markup"] = markup
+
+        return Message(
+            message_id=message_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=User(id=bot.id, is_bot=True, first_name="replay"),
+            text=getattr(method, "text", None),
+            caption=getattr(method, "caption", None),
+            **extra,
+        ).as_(bot)
+
+    def _remember(self, chat_id: int, message_id: int, markup) -> None:
+        self.keyboards[chat_id].append((message_id, markup))
+        for row in markup.inline_keyboard:
+            for button in row:
+                data = button.callback_data or ""
+                if data.startswith(REVIEW_PREFIX):
+                    self.reviews.put_nowait(data)
+
+    def find_button(self, chat_id: int, match) -> tuple[int, str] | None:
+        """Самая свежая кнопка чата, чей callback_data подходит под match."""
+        for message_id, markup in reversed(self.keyboards[chat_id]):
+            for row in markup.inline_keyboard:
+                for button in row:
+                    if button.callback_data and match(button.callback_data):
+                        return message_id, button.callback_data
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name].append(seconds)
+
+    def report(self, title: str, names, wall: float) -> None:
+        print(f"\n{title}")
+        print(
+            f"{'':24} {'count':>7} {'err':>5} {'rps':>8} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        )
+        for name in names:
+            values = sorted(self.durations.get(name, [])) or [0.0]
+            p50, p95, p99 = (percentile(values, q) * 1000 for q in (50, 95, 99))
+            count = len(self.durations.get(name, []))
+            print(
+                f"{name:24} {count:7} {self.errors.get(name, 0):5} "
+                f"{count / wall if wall else 0:8.1f} "
+                f"{p50:9.1f} {p95:9.1f} {p99:9.1f} {values[-1] * 1000:9.1f}"
+            )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу (values отсортирован)."""
+    rank = max(0, min(len(values) - 1, round(q / 100 * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+class Harness:
+    def __init__(self, bot, dp, session: FakeTelegramSession):
+        self.bot = bot
+        self.dp = dp
+        self.session = session
+        self.flows = Stats()
+        self.updates = Stats()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1_000_000)
+
+    async def feed(self, payload: dict, kind: str) -> None:
+        payload = {"update_id": next(self._update_ids), **payload}
+        if self.session.wire:
+            # getUpdates: апдейт приходит JSON-строкой, разбор — часть обработки
+            raw = json.dumps(payload)
+            started = time.perf_counter()
+            payload = self.session.json_loads(raw)
+        update = Update.model_validate(payload, context={"bot": self.bot})
+        if not self.session.wire:
+            started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception:
+            self.updates.errors[kind] += 1
+            raise
+        finally:
+            self.updates.add(kind, time.perf_counter() - started)
+
+    async def flow(self, name: str, coro) -> None:
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            self.flows.errors[name] += 1
+            logger.warning("Flow %s failed: %r", name, e)
+            return
+        self.flows.add(name, time.perf_counter() - started)
+
+    def user(self, tg_id: int) -> "VirtualUser":
+        return VirtualUser(self, tg_id)
+
+
+class VirtualUser:
+    """Пользователь Telegram, который пишет боту и нажимает кнопки."""
+
+    def __init__(self, harness: Harness, tg_id: int):
+        self.harness = harness
+        self.tg_id = tg_id
+        self.from_user = {
+            "id": tg_id,
+            "is_bot": False,
+            "first_name": "Replay",
+            "username": f"replay_{tg_id}",
+        }
+        self.chat = {"id": tg_id, "type": "private"}
+
+    def _message(self, **fields) -> dict:
+        return {
+            "message_id": next(self.harness._message_ids),
+            "date": int(time.time()),
+            "chat": self.chat,
+            "from": self.from_user,
+            **fields,
+        }
+
+    async def text(self, value: str) -> None:
+        await self.harness.feed({"message": self._message(text=value)}, "message:text")
+
+    async def contact(self, phone: str) -> None:
+        contact = {"phone_number": phone, "first_name": "Replay", "user_id": self.tg_id}
+        await self.harness.feed(
+            {"message": self._message(contact=contact)}, "message:contact"
+        )
+
+    async def photo(self, file_id: str) -> None:
+        photo = [{"file_id": file_id, "file_unique_id": file_id, "width": 1, "height": 1}]
+        await self.harness.feed({"message": self._message(photo=photo)}, "message:photo")
+
+    async def callback(self, data: str, message_id: int = 1) -> None:
+        query = {
+            "id": str(next(self.harness._update_ids)),
+            "from": self.from_user,
+            "chat_instance": "replay",
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": self.chat,
+                "text": "replay",
+            },
+        }
+        await self.harness.feed({"callback_query": query}, "callback")
+
+    async def click(self, widget_id: str) -> None:
+        """Нажимает кнопку диалога с данным id в последних клавиатурах чата."""
+        await self._click(
+            lambda data: data == widget_id or data.endswith(CB_SEP + widget_id),
+            widget_id,
+        )
+
+    async def click_prefix(self, prefix: str) -> None:
+        """Нажимает первую кнопку, чей id виджета начинается с prefix (Select)."""
+        await self._click(lambda data: data.split(CB_SEP)[-1].startswith(prefix), prefix)
+
+    async def _click(self, match, label: str) -> None:
+        found = self.harness.session.find_button(self.tg_id, match)
+        if found is None:
+            raise FlowError(f"tg_id={self.tg_id}: нет кнопки {label!r}")
+        message_id, data = found
+        await self.callback(data, message_id)
+
+
+# --- сценарии ---
+
+
+async def registration(user: VirtualUser) -> None:
+    await user.text("/start")
+    await user.text("Нагрузочный Тест Реплей")
+    await user.contact(f"+7900{user.tg_id % 10_000_000:07d}")
+    await user.click_prefix("city:")
+    await user.click("male")
+    await user.click("confirm")
+
+
+async def task_take(user: VirtualUser) -> None:
+    await user.text("/start")
+    await user.click("tasks")
+    await user.click("get")
+    await user.click("yandex")
+    await user.click("any")
+
+
+async def report_submit(user: VirtualUser) -> None:
+    await user.click("report")
+    await user.text("replay_account")
+    await user.photo(f"replay-{user.tg_id}-{time.monotonic_ns()}")
+
+
+async def admin_review(admin: VirtualUser, data: str) -> None:
+    await admin.callback(data)
+
+
+async def exports(admin: VirtualUser) -> None:
+    await admin.callback("go_main_menu")
+    await admin.click("admin")
+    await admin.click("go_reports")
+    await admin.click("tasks_today")
+    await admin.click("tasks_week")
+
+
+# --- засев ---
+
+
+def seed_sql(users: int, tasks: int) -> list[str]:
+    return [
+        "INSERT INTO cities (id, name) VALUES (gen_random_uuid(), 'Replay City')"
+        " ON CONFLICT DO NOTHING",
+        f"""
+        INSERT INTO users (id, tg_id, username, full_name, gender, approval_status,
+                           is_blocked, is_channel_verified)
+        SELECT gen_random_uuid(), {REPLAY_TG_ID_BASE} + g, 'replay_' || g,
+               'Replay User ' || g, 'M', 'APPROVED', false, true
+        FROM generate_series(1, {users}) g
+        """,
+        f"""
+        INSERT INTO user_stats (user_id)
+        SELECT id FROM users
+        WHERE tg_id > {REPLAY_TG_ID_BASE} AND tg_id <= {REPLAY_TG_ID_BASE + users}
+        ON CONFLICT DO NOTHING
+        """,
+        f"""
+        INSERT INTO tasks (id, text, source, link, human_code, created_at)
+        SELECT gen_random_uuid(), 'Replay task ' || g, 'Яндекс Карты',
+               'https://example.com/replay/' || g, 'REPLAY-' || g, now()
+        FROM generate_series(1, {tasks}) g
+        """,
+        "ANALYZE users",
+        "ANALYZE tasks",
+    ]
+
+
+CLEANUP_SQL = [
+    "DELETE FROM tasks WHERE human_code LIKE 'REPLAY-%'",
+    f"DELETE FROM users WHERE tg_id > {REPLAY_TG_ID_BASE}"
+    f" AND tg_id < {REPLAY_REG_TG_ID_BASE + 10_000_000}",
+    "DELETE FROM cities c WHERE name = 'Replay City'"
+    " AND NOT EXISTS (SELECT 1 FROM users u WHERE u.city_id = c.id)",
+]
+
+
+async def execute(statements: list[str]) -> None:
+    async with engine.begin() as conn:
+        for sql in statements:
+            await conn.execute(text(sql))
+
+
+# --- прогоны ---
+
+
+async def gather_limited(limit: int, coros) -> None:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            await coro
+
+    await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def run_synthetic(harness: Harness, args) -> None:
+    admin_id = (settings.admin_id_list or [None])[0]
+
+    await gather_limited(
+        args.concurrency,
+        (
+            harness.flow(
+                "registration",
+                registration(harness.user(REPLAY_REG_TG_ID_BASE + i)),
+            )
+            for i in range(1, args.registrations + 1)
+        ),
+    )
+
+    async def worker(user: VirtualUser) -> None:
+        for _ in range(args.rounds):
+            await harness.flow("task_take", task_take(user))
+            await harness.flow("report_submit", report_submit(user))
+
+    await gather_limited(
+        args.concurrency,
+        (worker(harness.user(REPLAY_TG_ID_BASE + i)) for i in range(1, args.users + 1)),
+    )
+
+    if admin_id is None:
+        print("ADMIN_IDS пуст — сценарии администратора пропущены")
+        return
+
+    # один администратор — один стек диалогов, поэтому последовательно
+    admin = harness.user(admin_id)
+    while not harness.session.reviews.empty():
+        data = harness.session.reviews.get_nowait()
+        await harness.flow("admin_review", admin_review(admin, data))
+
+    for _ in range(args.exports):
+        await harness.flow("exports", exports(admin))
+
+
+def load_replay(path: str) -> dict[int, list[tuple[str, dict]]]:
+    """Апдейты из JSONL, сгруппированные по чату (порядок внутри чата сохраняется)."""
+    by_chat: dict[int, list[tuple[str, dict]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            flow = record.get("flow", "replay") if "update" in record else "replay"
+            payload = record.get("update", record)
+            payload.pop("update_id", None)
+            event = payload.get("message") or payload.get("callback_query") or {}
+            sender = event.get("from") or {}
+            by_chat[sender.get("id", 0)].append((flow, payload))
+    return by_chat
+
+
+async def run_replay(harness: Harness, args) -> None:
+    by_chat = load_replay(args.replay)
+
+    async def chat_stream(items) -> None:
+        for flow, payload in items:
+            await harness.flow(flow, harness.feed(payload, flow))
+
+    await gather_limited(args.concurrency, (chat_stream(items) for items in by_chat.values()))
+
+
+async def run(args) -> int:
+    session = FakeTelegramSession(
+        latency=args.api_latency_ms / 1000,
+        upload_latency=args.upload_latency_ms / 1000,
+        wire=args.wire,
+    )
+    bot = create_bot(session=session)
+    dp = create_dispatcher()
+    harness = Harness(bot, dp, session)
+
+    if not args.replay:
+        tasks = args.users * args.rounds + args.users
+        started = time.perf_counter()
+        await execute(seed_sql(args.users, tasks))
+        print(
+            f"seed: users={args.users} tasks={tasks} "
+            f"time={time.perf_counter() - started:.2f}s"
+        )
+
+    started = time.perf_counter()
+    try:
+        if args.replay:
+            await run_replay(harness, args)
+        else:
+            await run_synthetic(harness, args)
+    finally:
+        wall = time.perf_counter() - started
+        if not args.replay:
+            await execute(CLEANUP_SQL)
+        await engine.dispose()
+
+    flow_names = sorted(harness.flows.durations.keys() | harness.flows.errors.keys())
+    update_names = sorted(harness.updates.durations.keys() | harness.updates.errors.keys())
+    updates = sum(len(d) for d in harness.updates.durations.values())
+    print(
+        f"\nwall={wall:.2f}s updates={updates} "
+        f"api_calls={sum(session.calls.values())}"
+    )
+    harness.flows.report("Сценарии", flow_names, wall)
+    harness.updates.report("Апдейты", update_names, wall)
+
+    failed = sum(harness.flows.errors.values())
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--registrations", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--exports", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--api-latency-ms", type=float, default=30)
+    parser.add_argument("--upload-latency-ms", type=float, default=150)
+    parser.add_argument("--replay", help="JSONL с записанными апдейтами")
+    parser.add_argument(
+        "--wire",
+        action="store_true",
+        help="апдейты и ответы Bot API через JSON, как в настоящей сессии",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(runtime.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+"""
+Генератор синтетического набора данных для бенчмарков и EXPLAIN-проверок.
+
+Заполняет схему app/models правдоподобными распределениями:
+- пользователи: статусы одобрения, пол, города по закону Ципфа,
+  реферальные деревья (чаще приглашают ранние пользователи);
+- задания по источникам source_registry (с весами) и городам, часть без
+  города, с требуемым полом и датами за --days дней (к концу периода гуще);
+- история назначений во всех статусах TaskAssignmentStatus: свободные
+  задания, архивные отклонения, выполненные «активными» исполнителями,
+  свежие ASSIGNED/SUBMITTED с учётом лимитов пользователя;
+- отчёты, сообщения администраторам по SUBMITTED и заявкам PENDING;
+- user_stats пересчитывается reconcile_user_stats().
+
+Загрузка идёт через COPY (asyncpg copy_records_to_table) пачками, память
+не растёт с объёмом: идентификаторы вычисляются из порядкового номера.
+Генерация детерминирована (--seed), так что фикстуры стабильны.
+
+    python -m tools.seed_dataset --users 10000
+    python -m tools.seed_dataset --users 1000000 --tasks 10000000
+    python -m tools.seed_dataset --drop      # удалить засеянные данные
+
+Засеянные строки помечены: tg_id от SEED_TG_ID_BASE, human_code 'SD-…',
+города 'Seed City …'.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import text
+
+from app.consts.source_task import source_registry
+from app.core.settings import settings
+from app.db.session import engine
+from app.models.task_assignment import TaskAssignmentStatus
+from app.models.user import UserApprovalStatus
+from app.repository.user_stats import reconcile_user_stats
+
+SEED_TG_ID_BASE = 7_000_000_000
+SEED_TG_ID_END = 8_000_000_000  # выше — диапазоны tools.bench_cleanup/replay
+HUMAN_CODE_PREFIX = "SD-"
+CITY_PREFIX = "Seed City "
+
+# старшие 32 бита UUID — «пространство» таблицы, младшие — номер строки
+NS_USER = 0x5EED0001
+NS_TASK = 0x5EED0002
+NS_ASSIGNMENT = 0x5EED0003
+NS_REPORT = 0x5EED0004
+NS_ADMIN_MESSAGE = 0x5EED0005
+NS_APPROVAL_MESSAGE = 0x5EED0006
+NS_CITY = 0x5EED0007
+
+# доля источников среди заданий
+SOURCE_WEIGHTS = {
+    "yandex": 40,
+    "2gis": 25,
+    "google": 15,
+    "yandex_browser": 8,
+    "vk": 7,
+}
+DEFAULT_SOURCE_WEIGHT = 3
+
+# итоговый статус задания, у которого есть назначения
+FINAL_STATUS_WEIGHTS = [
+    (TaskAssignmentStatus.APPROVED, 72),
+    (TaskAssignmentStatus.SUBMITTED, 10),
+    (TaskAssignmentStatus.ASSIGNED, 8),
+    (TaskAssignmentStatus.REJECTED, 10),
+]
+FREE_TASK_SHARE = 0.25
+EXTRA_REJECTION_SHARE = 0.15
+
+USER_COLUMNS = [
+    "id", "tg_id", "username", "full_name", "phone", "gender", "city_id",
+    "referrer_id", "is_blocked", "blocked_at", "approval_status", "approval_at",
+    "approved_by_admin_id", "approval_comment", "is_channel_verified",
+]
+TASK_COLUMNS = [
+    "id", "text", "example_text", "comment", "source", "created_at", "link",
+    "required_gender", "city_id", "human_code",
+]
+ASSIGNMENT_COLUMNS = [
+    "id", "user_id", "task_id", "status", "created_at", "submitted_at",
+    "approved_at", "processed_by_admin_id", "processed_at", "report_message_id",
+    "is_archived",
+]
+REPORT_COLUMNS = ["id", "assignment_id", "account_name", "photo_file_id", "created_at"]
+ADMIN_MESSAGE_COLUMNS = ["id", "assignment_id", "admin_tg_id", "message_id"]
+APPROVAL_MESSAGE_COLUMNS = ["id", "user_id", "admin_tg_id", "message_id"]
+
+
+def seed_uuid(namespace: int, n: int) -> uuid.UUID:
+    return uuid.UUID(int=(namespace << 96) | n)
+
+
+def base36(n: int) -> str:
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+class Dataset:
+    """Детерминированная генерация строк по номеру (без хранения id)."""
+
+    def __init__(self, users: int, tasks: int, cities: int, days: int, seed: int):
+        self.users = users
+        self.tasks = tasks
+        self.cities = cities
+        self.days = days
+        self.rng = random.Random(seed)
+        self.now = datetime.now(timezone.utc)
+        self.admins = settings.admin_id_list or [1]
+
+        self.sources = [source.value for source in source_registry.sources]
+        self.source_weights = list(
+            accumulate(
+                SOURCE_WEIGHTS.get(source.key, DEFAULT_SOURCE_WEIGHT)
+                for source in source_registry.sources
+            )
+        )
+        self.final_statuses = [status for status, _ in FINAL_STATUS_WEIGHTS]
+        self.final_weights = list(accumulate(w for _, w in FINAL_STATUS_WEIGHTS))
+
+        # одобрено 17 из каждых 20 пользователей (85%)
+        self.approved_users = users // 20 * 17 + min(users % 20, 17)
+        self._next_assigned = 0  # по одному ASSIGNED на пользователя
+        self._next_submitted = 0  # до max_active_assignments SUBMITTED
+
+    # --- пользователи ---
+
+    @staticmethod
+    def user_status(i: int) -> str:
+        r = i % 20
+        if r < 17:
+            return UserApprovalStatus.APPROVED
+        return UserApprovalStatus.PENDING if r < 19 else UserApprovalStatus.REJECTED
+
+    @staticmethod
+    def approved_user_index(a: int) -> int:
+        """a-й одобренный пользователь."""
+        return a // 17 * 20 + a % 17
+
+    def zipf_index(self, n: int, skew: float = 3.0) -> int:
+        return min(n - 1, int(n * self.rng.random() ** skew))
+
+    def city_id(self) -> uuid.UUID:
+        return seed_uuid(NS_CITY, self.zipf_index(self.cities, 2.0))
+
+    def user_rows(self, start: int, stop: int):
+        rng = self.rng
+        for i in range(start, stop):
+            status = self.user_status(i)
+            registered = status != UserApprovalStatus.PENDING or rng.random() < 0.7
+            referrer = (
+                seed_uuid(NS_USER, int(i * rng.random() ** 2))
+                if i and rng.random() < 0.3
+                else None
+            )
+            blocked = status == UserApprovalStatus.APPROVED and rng.random() < 0.01
+            approval_at = (
+                self.now - timedelta(days=self.days * rng.random())
+                if status != UserApprovalStatus.PENDING
+                else None
+            )
+            yield (
+                seed_uuid(NS_USER, i),
+                SEED_TG_ID_BASE + i,
+                f"seed_user_{i}" if rng.random() < 0.8 else None,
+                f"Сид Пользователь {i}" if registered else None,
+                f"+7999{i % 10_000_000:07d}" if registered else None,
+                rng.choice(("M", "F")) if registered else None,
+                self.city_id() if registered else None,
+                referrer,
+                blocked,
+                self.now - timedelta(days=rng.random() * 30) if blocked else None,
+                status,
+                approval_at,
+                self.admins[i % len(self.admins)] if approval_at else None,
+                "seed" if status == UserApprovalStatus.REJECTED else None,
+                status == UserApprovalStatus.APPROVED and rng.random() < 0.95,
+            )
+
+    def approval_message_rows(self, start: int, stop: int):
+        for i in range(start, stop):
+            if self.user_status(i) != UserApprovalStatus.PENDING:
+                continue
+            for k, admin_id in enumerate(self.admins):
+                yield (
+                    seed_uuid(NS_APPROVAL_MESSAGE, i * len(self.admins) + k),
+                    seed_uuid(NS_USER, i),
+                    admin_id,
+                    i,
+                )
+
+    # --- задания и история ---
+
+    def _pick(self, values, cum_weights):
+        return self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def _active_user(self) -> uuid.UUID:
+        # «активные» исполнители делают большую часть работы
+        return seed_uuid(
+            NS_USER, self.approved_user_index(self.zipf_index(self.approved_users))
+        )
+
+    def _final_status(self) -> str:
+        status = self._pick(self.final_statuses, self.final_weights)
+        if status == TaskAssignmentStatus.ASSIGNED:
+            if self._next_assigned >= self.approved_users:
+                return TaskAssignmentStatus.APPROVED
+        elif status == TaskAssignmentStatus.SUBMITTED:
+            if self._next_submitted >= self.approved_users * settings.max_active_assignments:
+                return TaskAssignmentStatus.APPROVED
+        return status
+
+    def _final_user(self, status: str) -> uuid.UUID:
+        if status == TaskAssignmentStatus.ASSIGNED:
+            a = self._next_assigned
+            self._next_assigned += 1
+        elif status == TaskAssignmentStatus.SUBMITTED:
+            a = self._next_submitted % self.approved_users
+            self._next_submitted += 1
+        else:
+            return self._active_user()
+        return seed_uuid(NS_USER, self.approved_user_index(a))
+
+    def _after(self, moment: datetime, **delta) -> datetime:
+        return min(self.now, moment + timedelta(**delta))
+
+    def task_rows(self, start: int, stop: int):
+        """Кортеж (tasks, assignments, reports, admin_messages) для пачки заданий."""
+        rng = self.rng
+        tasks, assignments, reports, admin_messages = [], [], [], []
+        history_cap = self.now - timedelta(hours=1)
+
+        for i in range(start, stop):
+            task_id = seed_uuid(NS_TASK, i)
+            created_at = self.now - timedelta(days=self.days * (1 - rng.random() ** 0.5))
+            source = self._pick(self.sources, self.source_weights)
+            tasks.append(
+                (
+                    task_id,
+                    f"Оставьте отзыв #{i}",
+                    f"Отличное место, рекомендую! ({i})" if rng.random() < 0.8 else None,
+                    None,
+                    source,
+                    created_at,
+                    f"https://example.com/seed/{i}",
+                    rng.choice(("M", "F", None, None)),
+                    self.city_id() if rng.random() < 0.6 else None,
+                    f"{HUMAN_CODE_PREFIX}{base36(i)}",
+                )
+            )
+
+            if rng.random() < FREE_TASK_SHARE:
+                continue
+
+            a = i * 2
+            if rng.random() < EXTRA_REJECTION_SHARE:
+                taken = min(history_cap, created_at + timedelta(hours=rng.expovariate(1 / 6)))
+                submitted = self._after(taken, minutes=rng.lognormvariate(3.5, 0.8))
+                processed = self._after(submitted, hours=rng.expovariate(1 / 3))
+                self._append_assignment(
+                    assignments, reports, admin_messages, a, task_id,
+                    self._active_user(), TaskAssignmentStatus.REJECTED,
+                    taken, submitted, processed, archived=True,
+                )
+                created_at = processed
+                a += 1
+
+            status = self._final_status()
+            user_id = self._final_user(status)
+
+            if status == TaskAssignmentStatus.ASSIGNED:
+                taken = self.now - timedelta(hours=24 * rng.random())
+                submitted = processed = None
+            elif status == TaskAssignmentStatus.SUBMITTED:
+                submitted = self.now - timedelta(hours=72 * rng.random())
+                taken = submitted - timedelta(minutes=rng.lognormvariate(3.5, 0.8))
+                processed = None
+            else:
+                taken = min(history_cap, created_at + timedelta(hours=rng.expovariate(1 / 6)))
+                submitted = self._after(taken, minutes=rng.lognormvariate(3.5, 0.8))
+                processed = self._after(submitted, hours=rng.expovariate(1 / 3))
+
+            archived = (
+                status == TaskAssignmentStatus.REJECTED
+                and processed < self.now - timedelta(
+                    seconds=settings.rejected_archive_delay_seconds
+                )
+            )
+            self._append_assignment(
+                assignments, reports, admin_messages, a, task_id, user_id, status,
+                taken, submitted, processed, archived=archived,
+            )
+
+        return tasks, assignments, reports, admin_messages
+
+    def _append_assignment(
+        self, assignments, reports, admin_messages, n, task_id, user_id, status,
+        taken, submitted, processed, *, archived,
+    ) -> None:
+        assignment_id = seed_uuid(NS_ASSIGNMENT, n)
+        admin_id = self.admins[n % len(self.admins)] if processed else None
+        assignments.append(
+            (
+                assignment_id,
+                user_id,
+                task_id,
+                status,
+                taken,
+                submitted,
+                processed if status == TaskAssignmentStatus.APPROVED else None,
+                admin_id,
+                processed,
+                None,
+                archived,
+            )
+        )
+        if submitted is None:
+            return
+
+        reports.append(
+            (
+                seed_uuid(NS_REPORT, n),
+                assignment_id,
+                f"seed_account_{n % 100_000}",
+                f"seed-photo-{n}",
+                submitted,
+            )
+        )
+        if status == TaskAssignmentStatus.SUBMITTED:
+            for k, admin_tg_id in enumerate(self.admins):
+                admin_messages.append(
+                    (
+                        seed_uuid(NS_ADMIN_MESSAGE, n * len(self.admins) + k),
+                        assignment_id,
+                        admin_tg_id,
+                        n,
+                    )
+                )
+
+
+async def copy(conn, table: str, columns: list[str], rows: list, counts: dict) -> None:
+    if not rows:
+        return
+    await conn.copy_records_to_table(table, records=rows, columns=columns)
+    counts[table] = counts.get(table, 0) + len(rows)
+
+
+async def load(dataset: Dataset, batch: int) -> dict[str, int]:
+    counts: dict[str, int] = {}
+
+    async with engine.connect() as sa_conn:
+        raw = await sa_conn.get_raw_connection()
+        conn = raw.driver_connection
+        # без построчных NOTIFY для индекса свободных заданий —
+        # по окончании загрузки шлём один "reload"
+        await conn.execute("SET app.free_task_notify = 'off'")
+
+        existing = await conn.fetchval(
+            "SELECT count(*) FROM users WHERE tg_id >= $1 AND tg_id < $2",
+            SEED_TG_ID_BASE,
+            SEED_TG_ID_END,
+        )
+        if existing:
+            raise SystemExit(
+                f"В БД уже {existing} засеянных пользователей — сначала --drop"
+            )
+
+        await copy(
+            conn,
+            "cities",
+            ["id", "name"],
+            [(seed_uuid(NS_CITY, c), f"{CITY_PREFIX}{c}") for c in range(dataset.cities)],
+            counts,
+        )
+
+        for start in range(0, dataset.users, batch):
+            stop = min(dataset.users, start + batch)
+            async with conn.transaction():
+                await copy(conn, "users", USER_COLUMNS, list(dataset.user_rows(start, stop)), counts)
+                await copy(
+                    conn,
+                    "user_approval_admin_messages",
+                    APPROVAL_MESSAGE_COLUMNS,
+                    list(dataset.approval_message_rows(start, stop)),
+                    counts,
+                )
+            progress("users", stop, dataset.users)
+
+        for start in range(0, dataset.tasks, batch):
+            stop = min(dataset.tasks, start + batch)
+            tasks, assignments, reports, admin_messages = dataset.task_rows(start, stop)
+            async with conn.transaction():
+                await copy(conn, "tasks", TASK_COLUMNS, tasks, counts)
+                await copy(conn, "task_assignments", ASSIGNMENT_COLUMNS, assignments, counts)
+                await copy(conn, "task_reports", REPORT_COLUMNS, reports, counts)
+                await copy(
+                    conn,
+                    "task_assignment_admin_messages",
+                    ADMIN_MESSAGE_COLUMNS,
+                    admin_messages,
+                    counts,
+                )
+            progress("tasks", stop, dataset.tasks)
+
+        await conn.execute("RESET app.free_task_notify")
+        await conn.execute("SELECT pg_notify('free_tasks', 'reload')")
+
+    return counts
+
+
+def progress(name: str, done: int, total: int) -> None:
+    print(f"\r{name}: {done}/{total}", end="\n" if done == total else "", flush=True)
+
+
+ANALYZE_SQL = [
+    "ANALYZE cities",
+    "ANALYZE users",
+    "ANALYZE tasks",
+    "ANALYZE task_assignments",
+    "ANALYZE task_reports",
+    "ANALYZE task_assignment_admin_messages",
+    "ANALYZE user_approval_admin_messages",
+    "ANALYZE user_stats",
+]
+
+DROP_SQL = [
+    "SET LOCAL app.free_task_notify = 'off'",
+    f"DELETE FROM tasks WHERE human_code LIKE '{HUMAN_CODE_PREFIX}%'",
+    # сначала назначения засеянных пользователей на чужих заданиях
+    f"""
+    DELETE FROM task_assignments ta USING users u
+    WHERE u.id = ta.user_id
+      AND u.tg_id >= {SEED_TG_ID_BASE} AND u.tg_id < {SEED_TG_ID_END}
+    """,
+    f"DELETE FROM users WHERE tg_id >= {SEED_TG_ID_BASE} AND tg_id < {SEED_TG_ID_END}",
+    f"""
+    DELETE FROM cities c WHERE c.name LIKE '{CITY_PREFIX}%'
+      AND NOT EXISTS (SELECT 1 FROM users u WHERE u.city_id = c.id)
+      AND NOT EXISTS (SELECT 1 FROM tasks t WHERE t.city_id = c.id)
+    """,
+    "SELECT pg_notify('free_tasks', 'reload')",
+]
+
+
+async def execute(statements: list[str]) -> None:
+    async with engine.begin() as conn:
+        for sql in statements:
+            await conn.execute(text(sql))
+
+
+async def run(args) -> int:
+    try:
+        if args.drop:
+            started = time.perf_counter()
+            await execute(DROP_SQL)
+            print(f"drop: time={time.perf_counter() - started:.2f}s")
+            return 0
+
+        dataset = Dataset(args.users, args.tasks, args.cities, args.days, args.seed)
+
+        started = time.perf_counter()
+        counts = await load(dataset, args.batch)
+        loaded = time.perf_counter() - started
+
+        stats_started = time.perf_counter()
+        fixed = await reconcile_user_stats()
+        await execute(ANALYZE_SQL)
+
+        total = sum(counts.values())
+        for table, rows in counts.items():
+            print(f"{table:32} {rows:>12}")
+        print(
+            f"copy: rows={total} time={loaded:.2f}s rate={total / loaded:.0f} rows/s; "
+            f"user_stats={fixed} rows, analyze {time.perf_counter() - stats_started:.2f}s"
+        )
+    finally:
+        await engine.dispose()
+
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument(
+        "--tasks", type=int, default=None, help="по умолчанию 3 × --users"
+    )
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true")
+    args = parser.parse_args()
+    if args.tasks is None:
+        args.tasks = args.users * 3
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
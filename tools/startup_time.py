@@ -0,0 +1,199 @@
+"""
+Бюджет времени старта бота: импорт и первый обработанный апдейт.
+
+1. python -X importtime -c "import app.bot.main" в отдельном процессе:
+   суммарное время импорта, самые тяжёлые пакеты и проверка, что
+   pandas, openpyxl и apscheduler не импортируются при старте
+   (они нужны только выгрузкам, импорту заданий и планировщику).
+2. Время от запуска процесса до первого обработанного апдейта:
+   дочерний процесс выполняет start_services() (как main()) и прогоняет
+   /start нового пользователя через настоящий Dispatcher, Bot API
+   заменён FakeTelegramSession (tools.replay). Нужна локальная БД;
+   созданный пользователь удаляется.
+
+Каждый замер повторяется --runs раз, берётся медиана. Код возврата 1,
+если медиана превышает бюджет или тяжёлый пакет импортирован при старте.
+
+    python -m tools.startup_time
+    python -m tools.startup_time --import-budget-ms 1200 --first-update-budget-ms 3000
+    python -m tools.startup_time --skip-first-update   # без БД
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# не должны импортироваться при старте бота
+LAZY_PACKAGES = ("pandas", "openpyxl", "apscheduler")
+
+# бюджеты по умолчанию (медиана, мс); их же проверяет tests/test_startup_time.py
+IMPORT_BUDGET_MS = 1500.0
+FIRST_UPDATE_BUDGET_MS = 4000.0
+
+# пользователь первого апдейта, вне диапазонов seed/bench/replay
+STARTUP_TG_ID = 8_600_000_001
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_import(top: int) -> tuple[float, list[tuple[str, float]], set[str]]:
+    """
+    Один прогон -X importtime: (время импорта app.bot.main в мс,
+    самые тяжёлые пакеты по собственному времени, ленивые пакеты,
+    оказавшиеся в импорте).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.bot.main"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app.bot.main failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    by_package: dict[str, int] = defaultdict(int)
+    loaded: set[str] = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        package = name.split(".")[0]
+        by_package[package] += int(self_us)
+        if package in LAZY_PACKAGES:
+            loaded.add(package)
+        if name == "app.bot.main":
+            total_us = int(cumulative_us)
+
+    heaviest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    return total_us / 1000, [(p, us / 1000) for p, us in heaviest[:top]], loaded
+
+
+def measure_first_update() -> tuple[float, set[str]]:
+    """
+    Один дочерний процесс: (мс от запуска до обработки первого
+    апдейта, ленивые пакеты, загруженные к этому моменту).
+    """
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-m", "tools.startup_time", "--role", "child"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"first update failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return (result["handled_at"] - started) * 1000, set(result["loaded"])
+
+
+async def child() -> int:
+    """start_services() и один /start; печатает JSON с отметкой времени."""
+    from aiogram.types import Update
+    from sqlalchemy import text
+
+    from app.bot.main import (
+        create_bot,
+        create_dispatcher,
+        start_services,
+        stop_services,
+    )
+    from app.db.session import engine
+    from tools.replay import FakeTelegramSession
+
+    bot = create_bot(session=FakeTelegramSession())
+    dp = create_dispatcher()
+    try:
+        await start_services()
+
+        update = Update.model_validate(
+            {
+                "update_id": 1,
+                "message": {
+                    "message_id": 1,
+                    "date": int(time.time()),
+                    "chat": {"id": STARTUP_TG_ID, "type": "private"},
+                    "from": {
+                        "id": STARTUP_TG_ID,
+                        "is_bot": False,
+                        "first_name": "Startup",
+                    },
+                    "text": "/start",
+                },
+            },
+            context={"bot": bot},
+        )
+        await dp.feed_update(bot, update)
+        handled_at = time.time()
+        loaded = [p for p in LAZY_PACKAGES if p in sys.modules]
+    finally:
+        await stop_services()
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM users WHERE tg_id = :tg_id"), {"tg_id": STARTUP_TG_ID}
+            )
+        await engine.dispose()
+
+    print(json.dumps({"handled_at": handled_at, "loaded": loaded}), flush=True)
+    return 0
+
+
+def run(args) -> int:
+    failed = False
+
+    imports = [measure_import(args.top) for _ in range(args.runs)]
+    import_ms = statistics.median(ms for ms, _, _ in imports)
+    _, heaviest, loaded = imports[-1]
+    print(f"import app.bot.main: median {import_ms:.0f}ms (budget {args.import_budget_ms:.0f}ms)")
+    print("heaviest packages (self time):")
+    for package, ms in heaviest:
+        print(f"  {package:24} {ms:8.1f}ms")
+    if import_ms > args.import_budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported at startup: {', '.join(sorted(loaded))}")
+        failed = True
+
+    if not args.skip_first_update:
+        firsts = [measure_first_update() for _ in range(args.runs)]
+        first_ms = statistics.median(ms for ms, _ in firsts)
+        print(
+            f"first handled update: median {first_ms:.0f}ms "
+            f"(budget {args.first_update_budget_ms:.0f}ms)"
+        )
+        if first_ms > args.first_update_budget_ms:
+            print("FAIL: time to first update over budget")
+            failed = True
+        loaded = set().union(*(modules for _, modules in firsts))
+        if loaded:
+            print(f"FAIL: imported before first update: {', '.join(sorted(loaded))}")
+            failed = True
+
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument(
+        "--first-update-budget-ms", type=float, default=FIRST_UPDATE_BUDGET_MS
+    )
+    parser.add_argument("--skip-first-update", action="store_true")
+    parser.add_argument("--role", choices=["parent", "child"], default="parent")
+    args = parser.parse_args()
+
+    if args.role == "child":
+        sys.exit(asyncio.run(child()))
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()